@@ -0,0 +1,318 @@
+"""
+Benchmark Fakes
+Deterministic stand-ins for the PRAW client and the Gemini chat model, plus a
+synthetic user generator, so the pipeline can be measured without any network.
+"""
+
+import hashlib
+import json
+import random
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from langchain_core.messages import AIMessage
+
+from src.utils import estimate_tokens
+
+
+SUBREDDITS = [
+    'python', 'learnprogramming', 'gaming', 'pcgaming', 'AskReddit', 'news', 'worldnews',
+    'movies', 'television', 'fitness', 'cooking', 'personalfinance', 'investing', 'science',
+    'technology', 'music', 'books', 'travel', 'photography', 'NewYorkCity'
+]
+
+WORDS = [
+    'the', 'a', 'and', 'to', 'of', 'I', 'you', 'it', 'is', 'that', 'this', 'for', 'with',
+    'code', 'game', 'movie', 'recipe', 'market', 'workout', 'city', 'book', 'song', 'trip',
+    'however', 'therefore', 'furthermore', 'lol', 'tbh', 'imo', 'really', 'great', 'think',
+    'work', 'student', 'college', 'kids', 'weekend', 'budget', 'project', 'learning'
+]
+
+ENDINGS = ['.', '.', '.', '!', '?', ' 😀']
+
+
+def _sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    """Build a random sentence from the benchmark vocabulary."""
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return ' '.join(words).capitalize() + rng.choice(ENDINGS)
+
+
+def make_user_data(username: str, items: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a synthetic user in the scraper's user_data format.
+
+    Args:
+        username: Username of the synthetic user
+        items: Total number of posts and comments (about one post per three comments)
+        seed: Random seed; the same arguments always produce the same user
+
+    Returns:
+        Dictionary containing user data with posts and comments, newest first
+    """
+    rng = random.Random(f"{username}:{seed}")
+    subreddits = rng.sample(SUBREDDITS, k=rng.randint(3, 10))
+    n_posts = items // 4
+    newest = 1_700_000_000.0
+
+    posts = []
+    for i in range(n_posts):
+        body = ' '.join(_sentence(rng, 4, 20) for _ in range(rng.randint(0, 8)))
+        posts.append({
+            'id': f"p{seed}_{i}",
+            'title': _sentence(rng, 3, 12),
+            'content': body,
+            'subreddit': rng.choice(subreddits),
+            'created_utc': newest - i * 7200 - rng.randint(0, 3600),
+            'score': rng.randint(-5, 500),
+            'upvote_ratio': round(rng.uniform(0.5, 1.0), 2),
+            'num_comments': rng.randint(0, 50),
+            'url': f"https://www.reddit.com/r/x/comments/p{seed}_{i}/",
+            'is_self': bool(body)
+        })
+
+    comments = []
+    for i in range(items - n_posts):
+        comments.append({
+            'id': f"c{seed}_{i}",
+            'body': ' '.join(_sentence(rng, 3, 25) for _ in range(rng.randint(1, 4))),
+            'subreddit': rng.choice(subreddits),
+            'created_utc': newest - i * 2400 - rng.randint(0, 1200),
+            'score': rng.randint(-5, 100),
+            'parent_id': rng.choice(['t1_', 't3_']) + 'parent',
+            'link_id': 't3_link',
+            'is_submitter': rng.random() < 0.1
+        })
+
+    return {
+        'username': username,
+        'posts': posts,
+        'comments': comments,
+        'metadata': {
+            'scraped_at': 'synthetic',
+            'total_posts': len(posts),
+            'total_comments': len(comments)
+        }
+    }
+
+
+class FakeListing:
+    """PRAW-style listing that yields model-like objects, sleeping once per 100-item page."""
+
+    def __init__(self, items: List[Dict[str, Any]], to_model, latency: float):
+        self.items = items
+        self.to_model = to_model
+        self.latency = latency
+
+    def new(self, limit: Optional[int] = None,
+            params: Optional[Dict[str, Any]] = None) -> Iterator[SimpleNamespace]:
+        items = self.items
+        after = (params or {}).get('after')
+        if after:
+            ids = [item['id'] for item in items]
+            items = items[ids.index(after.split('_', 1)[1]) + 1:]
+        for i, item in enumerate(items[:limit]):
+            if i % 100 == 0:
+                time.sleep(self.latency)
+            yield self.to_model(item)
+
+
+class FakeRedditSession(requests.Session):
+    """
+    Stand-in for the HTTP session under PRAW's requestor, serving Reddit's OAuth and
+    listing endpoints for synthetic users.
+
+    Real praw.Reddit clients built by CredentialPool.from_config run on top of it,
+    so RateLimitedRequestor and the pool's rate limiters are exercised as in production.
+    """
+
+    def __init__(self, users: Dict[str, Dict[str, Any]], latency: float = 0.0):
+        """
+        Args:
+            users: Mapping of username to user_data (e.g. from make_user_data)
+            latency: Seconds slept per HTTP request
+        """
+        super().__init__()
+        self.users = users
+        self.latency = latency
+        self.requests = 0
+        self._listings: Dict[Tuple[str, str], Tuple[List[Dict[str, Any]], Dict[str, int]]] = {}
+
+    def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                **kwargs) -> requests.Response:
+        time.sleep(self.latency)
+        self.requests += 1
+        path = urlparse(url).path.strip('/').split('/')
+        if path == ['api', 'v1', 'access_token']:
+            return self._response({'access_token': 'benchmark-token', 'token_type': 'bearer',
+                                   'expires_in': 86400, 'scope': '*'})
+
+        # user/<name>/<submitted|comments|overview>
+        children, positions = self._listing(path[1], path[2])
+        params = params or {}
+        start = positions[params['after']] + 1 if params.get('after') else 0
+        # Like Reddit, never serve more than 100 items per page
+        page = children[start:start + min(int(params.get('limit', 100)), 100)]
+        more = start + len(page) < len(children)
+        return self._response({'kind': 'Listing', 'data': {
+            'children': page, 'after': page[-1]['data']['name'] if page and more else None,
+            'before': None, 'dist': len(page)
+        }})
+
+    def _listing(self, username: str, kind: str) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Build (once) a user's newest-first listing and the position of each fullname."""
+        if (username, kind) not in self._listings:
+            user_data = self.users.get(username) or make_user_data(username, 0)
+            children = []
+            if kind in ('submitted', 'overview'):
+                children += [{'kind': 't3', 'data': self._raw_post(username, p)} for p in user_data['posts']]
+            if kind in ('comments', 'overview'):
+                children += [{'kind': 't1', 'data': self._raw_comment(username, c)} for c in user_data['comments']]
+            children.sort(key=lambda child: child['data']['created_utc'], reverse=True)
+            positions = {child['data']['name']: i for i, child in enumerate(children)}
+            self._listings[(username, kind)] = (children, positions)
+        return self._listings[(username, kind)]
+
+    def _raw_post(self, username: str, post: Dict[str, Any]) -> Dict[str, Any]:
+        raw = {key: value for key, value in post.items() if key != 'content'}
+        raw.update(selftext=post['content'], name=f"t3_{post['id']}", author=username)
+        return raw
+
+    def _raw_comment(self, username: str, comment: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(comment, name=f"t1_{comment['id']}", author=username)
+
+    def _response(self, body: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update({
+            'Content-Type': 'application/json',
+            'x-ratelimit-remaining': '1000',
+            'x-ratelimit-reset': '600',
+            'x-ratelimit-used': '0'
+        })
+        response._content = json.dumps(body).encode('utf-8')
+        response.encoding = 'utf-8'
+        return response
+
+
+class FakeReddit:
+    """Stand-in for praw.Reddit serving synthetic users through listings and raw requests."""
+
+    def __init__(self, users: Dict[str, Dict[str, Any]], latency: float = 0.0):
+        """
+        Args:
+            users: Mapping of username to user_data (e.g. from make_user_data)
+            latency: Seconds slept per simulated HTTP request (100 items)
+        """
+        self.users = users
+        self.latency = latency
+        self._overviews: Dict[str, List[Dict[str, Any]]] = {}
+
+    def redditor(self, username: str) -> SimpleNamespace:
+        user_data = self.users.get(username) or make_user_data(username, 0)
+        return SimpleNamespace(
+            name=username,
+            submissions=FakeListing(user_data['posts'], self._post_model, self.latency),
+            comments=FakeListing(user_data['comments'], self._comment_model, self.latency)
+        )
+
+    def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Serve a user overview listing page as raw JSON."""
+        time.sleep(self.latency)
+        params = params or {}
+        children = self._overview(path.split('/')[1])
+
+        start = int(params['after']) if params.get('after') else 0
+        end = start + int(params.get('limit', 100))
+        return {
+            'kind': 'Listing',
+            'data': {
+                'children': children[start:end],
+                'after': str(end) if end < len(children) else None
+            }
+        }
+
+    def _overview(self, username: str) -> List[Dict[str, Any]]:
+        """Build (once) the newest-first overview children of a user."""
+        if username not in self._overviews:
+            user_data = self.users.get(username) or make_user_data(username, 0)
+            children = [{'kind': 't3', 'data': self._raw_post(p)} for p in user_data['posts']]
+            children += [{'kind': 't1', 'data': c} for c in user_data['comments']]
+            children.sort(key=lambda child: child['data']['created_utc'], reverse=True)
+            self._overviews[username] = children
+        return self._overviews[username]
+
+    def _post_model(self, post: Dict[str, Any]) -> SimpleNamespace:
+        return SimpleNamespace(
+            selftext=post['content'],
+            subreddit=SimpleNamespace(display_name=post['subreddit']),
+            **{key: value for key, value in post.items() if key not in ('content', 'subreddit')}
+        )
+
+    def _comment_model(self, comment: Dict[str, Any]) -> SimpleNamespace:
+        return SimpleNamespace(
+            subreddit=SimpleNamespace(display_name=comment['subreddit']),
+            **{key: value for key, value in comment.items() if key != 'subreddit'}
+        )
+
+    def _raw_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        raw = {key: value for key, value in post.items() if key != 'content'}
+        raw['selftext'] = post['content']
+        return raw
+
+
+class FakeLLM:
+    """
+    Stand-in for ChatGoogleGenerativeAI with fixed latency and deterministic output.
+
+    Whether a prompt fails is decided by its hash, so runs are reproducible.
+    Failures are raised as non-retryable errors, exercising the degraded paths
+    without waiting on retry backoff.
+    """
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0,
+                 output_tokens: int = 200, sections: Optional[List[str]] = None,
+                 model: str = 'fake-llm', temperature: float = 0.3):
+        """
+        Args:
+            latency: Seconds slept per call
+            failure_rate: Fraction of prompts (0-1) that raise an error
+            output_tokens: Approximate tokens per response
+            sections: If given, respond with a JSON object with these string fields
+                (structured-output mode)
+            model: Model name reported to the response cache
+            temperature: Temperature reported to the response cache
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.output_tokens = output_tokens
+        self.sections = sections
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, prompt: str, **kwargs) -> AIMessage:
+        time.sleep(self.latency)
+        digest = hashlib.sha256(str(prompt).encode('utf-8')).digest()
+        if int.from_bytes(digest[:4], 'big') / 2 ** 32 < self.failure_rate:
+            raise RuntimeError("Simulated LLM failure")
+
+        rng = random.Random(digest)
+        if self.sections:
+            per_section = max(self.output_tokens // len(self.sections), 1)
+            content = json.dumps({name: self._text(rng, per_section) for name in self.sections})
+        else:
+            content = self._text(rng, self.output_tokens)
+
+        return AIMessage(content=content, usage_metadata={
+            'input_tokens': estimate_tokens(str(prompt)),
+            'output_tokens': estimate_tokens(content),
+            'total_tokens': estimate_tokens(str(prompt)) + estimate_tokens(content)
+        })
+
+    def _text(self, rng: random.Random, tokens: int) -> str:
+        text = ''
+        while estimate_tokens(text) < tokens:
+            text += _sentence(rng, 5, 15) + ' '
+        return text.strip()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmarks
+Measures latency, throughput and peak memory of the scrape, analyze and generate
+stages, of fast (LLM-free) persona building and of the end-to-end pipeline
+against fake Reddit and LLM backends.
+
+Run from the repository root:
+    python -m benchmarks.run_benchmarks --sizes 10,1000,100000
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Any, Callable, Optional
+
+from benchmarks.fakes import FakeLLM, FakeRedditSession, make_user_data
+from config import REDDIT_BURST
+from src.checkpoint import CheckpointStore
+from src.credential_pool import CredentialPool
+from src.llm_cache import LLMCache
+from src.metrics import REGISTRY
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator, PERSONA_SECTIONS
+from src.pipeline import PersonaPipeline
+from src.rate_limiter import get_rate_limiter
+from src.reddit_scraper import RedditScraper
+from src.single_flight import SingleFlight
+from src.storage import JsonStore
+
+
+STAGES = ('scrape', 'analyze', 'generate', 'fast', 'end_to_end')
+
+
+def measure(setup: Callable[[], Any], func: Callable[[Any], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Run a function repeatedly, recording wall time, peak traced memory and LLM usage.
+
+    Args:
+        setup: Builds the components for one run; not timed
+        func: Timed run, called with the result of setup
+        repeat: Number of runs
+
+    Returns:
+        Median/min/max seconds, peak memory in MB and LLM usage per run
+    """
+    seconds = []
+    peak = 0
+    before = REGISTRY.totals()
+    for _ in range(repeat):
+        components = setup()
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(components)
+        seconds.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    after = REGISTRY.totals()
+
+    def per_run(*counters: str) -> int:
+        return int(sum(after.get(c, 0) - before.get(c, 0) for c in counters) / repeat)
+
+    return {
+        'seconds': statistics.median(seconds),
+        'min_seconds': min(seconds),
+        'max_seconds': max(seconds),
+        'peak_memory_mb': peak / (1024 * 1024),
+        'llm_calls': per_run('llm_calls'),
+        'llm_tokens': per_run('llm_input_tokens', 'llm_output_tokens')
+    }
+
+
+def benchmark_size(items: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark every stage for one synthetic user with the given number of items."""
+    username = f"bench_user_{items}"
+    user_data = make_user_data(username, items, seed=args.seed)
+
+    # Real praw.Reddit clients over a fake HTTP session, so every request goes through
+    # RateLimitedRequestor and the credential's shared limiter (registered here first
+    # so the benchmark controls its rate)
+    client_id = f"benchmark_{items}"
+    get_rate_limiter(f"reddit:{client_id}", rate=args.reddit_rate, capacity=REDDIT_BURST)
+    pool = CredentialPool.from_config(
+        credentials=[(client_id, 'benchmark-secret')],
+        requestor_kwargs={'session': FakeRedditSession({username: user_data}, latency=args.reddit_latency)}
+    )
+
+    def make_llm(sections: Optional[List[str]] = None) -> FakeLLM:
+        return FakeLLM(latency=args.llm_latency, failure_rate=args.failure_rate, sections=sections)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        def fresh_cache() -> LLMCache:
+            # A new cache per run, so repeats measure real (fake) LLM calls
+            return LLMCache(os.path.join(tempfile.mkdtemp(dir=workdir), 'llm_cache.sqlite'))
+
+        def make_scraper() -> RedditScraper:
+            return RedditScraper(
+                snapshot_store=JsonStore(tempfile.mkdtemp(dir=workdir)), pool=pool,
+                max_posts=items, max_comments=items
+            )
+
+        def make_analyzer() -> PersonaAnalyzer:
+            return PersonaAnalyzer(
+                cache=fresh_cache(), analysis_store=JsonStore(tempfile.mkdtemp(dir=workdir)),
+                llm=make_llm()
+            )
+
+        def make_generator() -> PersonaGenerator:
+            return PersonaGenerator(
+                cache=fresh_cache(), llm=make_llm(), structured_llm=make_llm(list(PERSONA_SECTIONS))
+            )
+
+        analysis = make_analyzer().analyze_user_content(user_data, incremental=False)
+
+        def make_pipeline() -> PersonaPipeline:
+            return PersonaPipeline(
+                tempfile.mkdtemp(dir=workdir), scraper=make_scraper(),
+                analyzer=make_analyzer(), generator=make_generator(),
+                checkpoints=CheckpointStore(JsonStore(tempfile.mkdtemp(dir=workdir))),
+                single_flight=SingleFlight(directory=None)
+            )
+
+        # Stage -> (untimed setup building fresh components, timed run using them)
+        cases = {
+            'scrape': (make_scraper, lambda scraper: scraper.scrape_user_data(
+                username, incremental=False, overview=args.overview
+            )),
+            'analyze': (make_analyzer, lambda analyzer: analyzer.analyze_user_content(
+                user_data, incremental=False
+            )),
+            'generate': (make_generator, lambda generator: generator.generate_persona(
+                analysis, user_data, single_call=args.single_call
+            )),
+            'fast': (lambda: (make_analyzer(), make_generator()), lambda components: (
+                components[1].generate_fast_persona(components[0].analyze_user_activity(user_data), user_data)
+            )),
+            'end_to_end': (make_pipeline, lambda pipeline: pipeline.process_user(username))
+        }
+
+        results = {}
+        for stage in args.stages:
+            result = measure(*cases[stage], args.repeat)
+            result['items_per_second'] = items / result['seconds'] if result['seconds'] else 0.0
+            results[stage] = result
+
+    return {'items': items, 'stages': results}
+
+
+def find_regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+                     threshold: float) -> List[str]:
+    """Compare median stage times with a baseline run; return descriptions of regressions."""
+    baseline_by_size = {entry['items']: entry['stages'] for entry in baseline}
+    regressions = []
+    for entry in results:
+        for stage, result in entry['stages'].items():
+            previous = baseline_by_size.get(entry['items'], {}).get(stage)
+            if previous and result['seconds'] > previous['seconds'] * (1 + threshold):
+                regressions.append(
+                    f"{stage} @ {entry['items']} items: {result['seconds']:.3f}s "
+                    f"vs baseline {previous['seconds']:.3f}s"
+                )
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    """Print the results as a plain-text table."""
+    header = f"{'items':>8}  {'stage':<10}  {'median s':>9}  {'items/s':>10}  {'peak MB':>8}  {'LLM calls':>9}"
+    print(header)
+    print('-' * len(header))
+    for entry in results:
+        for stage, result in entry['stages'].items():
+            print(
+                f"{entry['items']:>8}  {stage:<10}  {result['seconds']:>9.3f}  "
+                f"{result['items_per_second']:>10.0f}  {result['peak_memory_mb']:>8.1f}  "
+                f"{result['llm_calls']:>9}"
+            )
+
+
+def main():
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description='Benchmark the persona pipeline against fake backends')
+    parser.add_argument('--sizes', default='10,1000,10000',
+                        help='Comma-separated synthetic user sizes in items (posts + comments)')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to run ({', '.join(STAGES)})")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; the median is reported')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='Seconds per fake LLM call')
+    parser.add_argument('--reddit-latency', type=float, default=0.01,
+                        help='Seconds per fake Reddit request (100 items)')
+    parser.add_argument('--reddit-rate', type=float, default=100.0,
+                        help='Requests per second allowed by the rate limiter '
+                             '(Reddit\'s own quota is about 1.67)')
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='Fraction of fake LLM calls that fail')
+    parser.add_argument('--overview', action='store_true', help='Scrape through the overview listing')
+    parser.add_argument('--single-call', action='store_true', help='Generate personas with one structured call')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic users')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Results JSON of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown versus the baseline before failing (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    args.stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    # The fake Reddit must not trigger PRAW's PyPI update check
+    os.environ.setdefault('praw_check_for_updates', 'False')
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('src').setLevel(logging.CRITICAL)
+
+    results = [benchmark_size(int(size), args) for size in args.sizes.split(',')]
+    print_table(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmarks
+Times CLI startup paths in fresh interpreters and checks that heavy SDKs are
+only imported when a client is actually used.
+
+Run from the repository root:
+    python -m benchmarks.startup --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Any
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be loaded until the first LLM call, Reddit request or analysis of new items
+DEFERRED_MODULES = ['langchain_core', 'langchain_google_genai', 'google.ai.generativelanguage', 'praw', 'numpy']
+
+CASES = {
+    'help': [sys.executable, 'main.py', '--help'],
+    'invalid_url': [sys.executable, 'main.py', 'not-a-reddit-url'],
+    'pipeline_ready': [
+        sys.executable, '-c',
+        "import json, sys\n"
+        "from src.pipeline import PersonaPipeline\n"
+        "PersonaPipeline()\n"
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    ]
+}
+
+
+def time_case(command: List[str], repeat: int) -> Dict[str, Any]:
+    """Run a command in fresh interpreters and report its median wall time."""
+    seconds = []
+    output = ''
+    returncode = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        seconds.append(time.perf_counter() - start)
+        output = result.stdout
+        returncode = returncode or result.returncode
+    return {
+        'seconds': statistics.median(seconds),
+        'min_seconds': min(seconds),
+        'max_seconds': max(seconds),
+        'returncode': returncode,
+        'output': output
+    }
+
+
+def main():
+    """Run the startup benchmarks."""
+    parser = argparse.ArgumentParser(description='Benchmark CLI startup time')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case; the median is reported')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {}
+    for name, command in CASES.items():
+        result = time_case(command, args.repeat)
+        results[name] = {key: value for key, value in result.items() if key != 'output'}
+        print(f"{name:<16} {result['seconds']:.3f}s (min {result['min_seconds']:.3f}s)")
+
+    # Constructing the pipeline must succeed without building (or importing) any client yet
+    if results['pipeline_ready']['returncode']:
+        print("WARNING: constructing the default pipeline failed")
+    loaded = json.loads(time_case(CASES['pipeline_ready'], 1)['output'] or '[]')
+    results['pipeline_ready']['deferred_modules_loaded'] = loaded
+    if loaded:
+        print(f"WARNING: loaded before first use: {', '.join(loaded)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if loaded or results['pipeline_ready']['returncode']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,89 @@ REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
 REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
 REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT', 'PersonaGenerator/1.0')
 
+# Credential pool: comma-separated client_id:client_secret pairs, one per registered Reddit app.
+# Requests are spread across them; when empty, REDDIT_CLIENT_ID/REDDIT_CLIENT_SECRET are used.
+REDDIT_CREDENTIALS = os.getenv('REDDIT_CREDENTIALS', '')
+
 # Configuration
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+GOOGLE_API_KEYS = os.getenv('GOOGLE_API_KEYS', '')  # comma-separated keys to rotate across; overrides GOOGLE_API_KEY
 
 # Scraping Configuration
 MAX_POSTS = 100
 MAX_COMMENTS = 200
-REQUEST_DELAY = 1  # seconds between requests
\ No newline at end of file
+CONCURRENT_SCRAPING = True  # fetch posts and comments in parallel
+INCREMENTAL_SCRAPING = True  # only fetch items newer than the stored snapshot
+SNAPSHOT_DIR = 'data/scraped_data'
+USE_OVERVIEW_LISTING = False  # fetch posts and comments together as raw JSON
+OVERVIEW_PAGE_SIZE = 100  # maximum items per listing request
+
+# Rate Limiting (per Reddit app credential)
+REDDIT_REQUESTS_PER_MINUTE = 100  # Reddit OAuth quota
+REDDIT_BURST = 10  # requests allowed back-to-back before throttling
+REDDIT_QUARANTINE_SECONDS = 300  # how long a client rejected with 401/429 is skipped
+
+# Batch Configuration
+BATCH_WORKERS = 4  # users processed concurrently
+REDDIT_CONCURRENCY = 2  # users scraped at once
+LLM_CONCURRENCY = 2  # users in the analysis/generation stages at once
+
+# LLM Configuration
+LLM_MAX_IN_FLIGHT = 4  # concurrent Gemini calls per analyzer/generator
+LLM_MAX_RETRIES = 6  # retries on quota (429/503) errors
+LLM_RETRY_BASE_DELAY = 2  # seconds, doubled on each retry (with jitter)
+LLM_RETRY_MAX_DELAY = 60  # cap on a single retry delay in seconds
+LLM_GATEWAY_INITIAL_CONCURRENCY = 4  # starting limit on Gemini calls in flight across the process
+LLM_GATEWAY_MAX_CONCURRENCY = 32  # the limit grows up to this while calls are fast and unthrottled
+LLM_GATEWAY_LATENCY_TARGET = 30  # seconds; slower calls stop the limit from growing
+
+# Model Tiering
+LLM_MODELS = {  # chat model per tier
+    'fast': os.getenv('LLM_FAST_MODEL', 'models/gemini-1.5-flash'),
+    'pro': os.getenv('LLM_PRO_MODEL', 'models/gemini-1.5-pro')
+}
+LLM_MODEL_ROUTES = {  # tier per prompt; prompts not listed use LLM_DEFAULT_TIER
+    'analysis.interests_chunk': 'fast',
+    'analysis.interests_merge': 'fast',
+    'analysis.personality': 'fast',
+    'analysis.demographics': 'fast'
+}
+LLM_DEFAULT_TIER = 'pro'  # persona synthesis prompts
+LLM_ESCALATION_TIER = 'pro'  # re-asks prompts whose cheaper-tier response fails validation; None to disable
+LLM_MIN_RESPONSE_CHARS = 40  # shorter responses fail validation
+INTEREST_CHUNK_TOKEN_BUDGET = 8000  # content tokens per interest-analysis prompt
+PROMPT_CONTEXT_TOKEN_BUDGET = 6000  # analysis-context tokens per persona-section prompt
+SINGLE_CALL_GENERATION = False  # request all persona sections in one structured-output call
+FAST_PERSONA_MODE = False  # build personas from the deterministic analyzers only, without LLM calls
+
+# Incremental Analysis
+INCREMENTAL_ANALYSIS = True  # reuse persisted analysis, re-running only changed sections
+ANALYSIS_DIR = 'data/analysis'
+
+# Checkpoints
+RESUME_FROM_CHECKPOINT = True  # resume interrupted runs from the last completed stage/section
+CHECKPOINT_DIR = 'data/checkpoints'
+CHECKPOINT_MAX_AGE = 24 * 3600  # seconds; older checkpoints are ignored
+
+# Single-Flight Deduplication
+SINGLE_FLIGHT_DIR = 'data/single_flight'  # lock files and shared results, for dedup across processes
+SINGLE_FLIGHT_RESULT_TTL = 60  # seconds a finished result is served to duplicate requests
+
+# LLM Response Cache
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = 'data/llm_cache.sqlite'
+LLM_CACHE_TTL = 30 * 24 * 3600  # seconds
+LLM_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Archive Ingestion
+ARCHIVE_MAX_WINDOW_SIZE = 2 ** 31  # Reddit dumps are compressed with --long=31
+ARCHIVE_INDEX_PATH = 'data/archive_index.sqlite'
+
+# Metrics
+PROMETHEUS_METRICS_FILE = 'metrics.prom'  # cumulative counters, written to the output directory
+
+# Service Mode
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8080
+SERVICE_WORKERS = 4  # persona jobs processed at once
+SERVICE_MAX_JOBS = 1000  # finished jobs kept for polling
@@ -7,12 +7,12 @@ Main execution script for generating user personas from Reddit profiles.
 import argparse
 import sys
 import os
-from typing import Optional
+from typing import Dict, List, Any, Optional
 
-from src.reddit_scraper import RedditScraper
-from src.persona_analyzer import PersonaAnalyzer
-from src.persona_generator import PersonaGenerator
-from src.utils import setup_logging, validate_reddit_url, create_output_directories
+# Only lightweight modules are imported at startup; config (which loads .env)
+# and the pipeline (PRAW, numpy) are imported once arguments and the URL have
+# been validated.
+from src.utils import setup_logging, validate_reddit_url, create_output_directories, parse_user_list
 
 
 def main():
@@ -22,8 +22,88 @@ def main():
     )
     parser.add_argument(
         'reddit_url',
+        nargs='?',
         help='Reddit user profile URL (e.g., https://www.reddit.com/user/username/)'
     )
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        help="File with one username or profile URL per line ('-' for stdin)"
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run as a long-lived HTTP service that accepts persona jobs'
+    )
+    parser.add_argument(
+        '--host',
+        help='Address the service listens on (default: SERVICE_HOST in config.py)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        help='Port the service listens on (default: SERVICE_PORT in config.py)'
+    )
+    parser.add_argument(
+        '--archive',
+        metavar='DUMP',
+        action='append',
+        help='Read user data from a Reddit NDJSON dump (.zst or plain) instead of the API; repeatable'
+    )
+    parser.add_argument(
+        '--build-index',
+        action='store_true',
+        help='Index the archive dumps by author before ingesting, for faster later runs'
+    )
+    parser.add_argument(
+        '--record',
+        metavar='ARCHIVE',
+        help='Record all Reddit and LLM traffic of this run into a traffic archive'
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='ARCHIVE',
+        help='Replay Reddit and LLM traffic from a recorded archive instead of the network'
+    )
+    parser.add_argument(
+        '--latency-scale',
+        type=float,
+        default=1.0,
+        help='Multiplier for recorded latencies when replaying (0 = no delay)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='Number of users processed concurrently (default: BATCH_WORKERS in batch mode, '
+             'SERVICE_WORKERS in service mode, from config.py)'
+    )
+    parser.add_argument(
+        '--reddit-concurrency',
+        type=int,
+        help='Maximum users scraped from Reddit at once (default: REDDIT_CONCURRENCY in config.py)'
+    )
+    parser.add_argument(
+        '--llm-concurrency',
+        type=int,
+        help='Maximum users in the LLM analysis/generation stages at once '
+             '(default: LLM_CONCURRENCY in config.py)'
+    )
+    parser.add_argument(
+        '--fast',
+        action='store_true',
+        help='Build personas from activity statistics only, without LLM calls '
+             '(default: FAST_PERSONA_MODE in config.py)'
+    )
+    parser.add_argument(
+        '--promote',
+        metavar='FILE',
+        help='File with usernames or profile URLs that still get the full LLM persona in fast mode'
+    )
+    parser.add_argument(
+        '--no-resume',
+        action='store_true',
+        help='Discard checkpoints of earlier interrupted runs instead of resuming from them'
+    )
     parser.add_argument(
         '--output-dir',
         default='output',
@@ -34,55 +114,210 @@ def main():
         action='store_true',
         help='Enable verbose logging'
     )
-    
+
     args = parser.parse_args()
-    
+
+    if sum(map(bool, (args.reddit_url, args.batch, args.serve))) != 1:
+        parser.error('provide exactly one of reddit_url, --batch FILE or --serve')
+    if args.record and args.replay:
+        parser.error('--record and --replay cannot be combined')
+
     # Setup logging
     logger = setup_logging(args.verbose)
-    
+
     # Validate input
-    if not validate_reddit_url(args.reddit_url):
+    if args.reddit_url and not validate_reddit_url(args.reddit_url):
         logger.error("Invalid Reddit URL format")
         sys.exit(1)
-    
+
+    apply_config_defaults(args)
+    if args.promote and not args.fast:
+        parser.error('--promote requires --fast')
+
+    if args.batch:
+        run_batch(args, logger)
+        return
+
+    if args.serve:
+        run_service(args, logger)
+        return
+
     # Create output directories
     create_output_directories(args.output_dir)
-    
+
     try:
         # Extract username from URL
         username = args.reddit_url.split('/')[-2] if args.reddit_url.endswith('/') else args.reddit_url.split('/')[-1]
         logger.info(f"Processing user: {username}")
-        
-        # Step 1: Scrape Reddit data
-        logger.info("Step 1: Scraping Reddit data...")
-        scraper = RedditScraper()
-        user_data = scraper.scrape_user_data(username)
-        
-        if not user_data['posts'] and not user_data['comments']:
-            logger.error("No data found for user. User might be private or non-existent.")
-            sys.exit(1)
-        
-        # Step 2: Analyze content
-        logger.info("Step 2: Analyzing content...")
-        analyzer = PersonaAnalyzer()
-        analysis_results = analyzer.analyze_user_content(user_data)
-        
-        # Step 3: Generate persona
-        logger.info("Step 3: Generating persona...")
-        generator = PersonaGenerator()
-        persona = generator.generate_persona(analysis_results, user_data)
-        
-        # Step 4: Save output
-        output_file = os.path.join(args.output_dir, f"{username}_persona.txt")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(persona)
-        
-        logger.info(f"Persona generated successfully: {output_file}")
-        
+
+        from src.pipeline import PersonaPipeline
+
+        traffic = create_traffic_components(args)
+        pipeline = PersonaPipeline(
+            args.output_dir,
+            scraper=create_archive_source(args) or traffic.get('scraper'),
+            analyzer=traffic.get('analyzer'),
+            generator=traffic.get('generator'),
+            checkpoints=traffic.get('checkpoints'),
+            single_flight=traffic.get('single_flight'),
+            resume=not args.no_resume,
+            fast=args.fast,
+            promoted=load_promoted(args)
+        )
+        try:
+            result = pipeline.process_user(username)
+        finally:
+            save_traffic(traffic)
+        pipeline.export_metrics()
+
+        logger.info(f"Persona generated successfully: {result['output_file']}")
+
     except Exception as e:
         logger.error(f"Error generating persona: {str(e)}")
         sys.exit(1)
 
 
+def apply_config_defaults(args: argparse.Namespace) -> None:
+    """Fill the options left unset on the command line from config.py."""
+    from config import (
+        BATCH_WORKERS, REDDIT_CONCURRENCY, LLM_CONCURRENCY,
+        SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, FAST_PERSONA_MODE
+    )
+
+    if args.host is None:
+        args.host = SERVICE_HOST
+    if args.port is None:
+        args.port = SERVICE_PORT
+    if args.workers is None:
+        args.workers = SERVICE_WORKERS if args.serve else BATCH_WORKERS
+    if args.reddit_concurrency is None:
+        args.reddit_concurrency = REDDIT_CONCURRENCY
+    if args.llm_concurrency is None:
+        args.llm_concurrency = LLM_CONCURRENCY
+    args.fast = args.fast or FAST_PERSONA_MODE
+
+
+def create_archive_source(args: argparse.Namespace):
+    """Create an archive data source if dumps were given, otherwise None."""
+    if not args.archive:
+        return None
+
+    from config import ARCHIVE_INDEX_PATH
+    from src.archive_source import ArchiveIndex, ArchiveSource
+
+    index = ArchiveIndex(ARCHIVE_INDEX_PATH) if args.build_index or os.path.exists(ARCHIVE_INDEX_PATH) else None
+    source = ArchiveSource(args.archive, index=index)
+    if args.build_index:
+        source.build_index(index)
+    return source
+
+
+def load_promoted(args: argparse.Namespace) -> List[str]:
+    """Read the users promoted to the full LLM pipeline in fast mode."""
+    if not args.promote:
+        return []
+    with open(args.promote, encoding='utf-8') as f:
+        return parse_user_list(f)
+
+
+def create_traffic_components(args: argparse.Namespace) -> Dict[str, Any]:
+    """Create recording or replaying pipeline components if requested, otherwise an empty dict."""
+    if not (args.record or args.replay):
+        return {}
+
+    from src.traffic import TrafficArchive, create_traffic_components as create_components
+
+    archive = TrafficArchive(args.replay or args.record)
+    components = create_components(archive, replay=bool(args.replay), latency_scale=args.latency_scale)
+    if args.record:
+        components['archive'] = archive
+    return components
+
+
+def save_traffic(traffic: Dict[str, Any]) -> None:
+    """Save the traffic archive of a recording run and remove the run's temporary state."""
+    try:
+        if 'archive' in traffic:
+            traffic['archive'].save()
+    finally:
+        if 'state_dir' in traffic:
+            traffic['state_dir'].cleanup()
+
+
+def run_batch(args: argparse.Namespace, logger) -> None:
+    """Generate personas for every user listed in the batch input."""
+    if args.batch == '-':
+        usernames = parse_user_list(sys.stdin)
+    else:
+        with open(args.batch, encoding='utf-8') as f:
+            usernames = parse_user_list(f)
+
+    if not usernames:
+        logger.error("No usernames found in batch input")
+        sys.exit(1)
+
+    create_output_directories(args.output_dir)
+    logger.info(f"Processing batch of {len(usernames)} users with {args.workers} workers")
+
+    from src.pipeline import PersonaPipeline
+
+    archive_source = create_archive_source(args)
+    if archive_source:
+        # One pass over the dumps for the whole cohort
+        archive_source.preload(usernames)
+
+    traffic = create_traffic_components(args)
+    pipeline = PersonaPipeline(
+        args.output_dir,
+        reddit_concurrency=args.reddit_concurrency,
+        llm_concurrency=args.llm_concurrency,
+        scraper=archive_source or traffic.get('scraper'),
+        analyzer=traffic.get('analyzer'),
+        generator=traffic.get('generator'),
+        checkpoints=traffic.get('checkpoints'),
+        single_flight=traffic.get('single_flight'),
+        resume=not args.no_resume,
+        fast=args.fast,
+        promoted=load_promoted(args)
+    )
+    try:
+        summary = pipeline.run_batch(usernames, workers=args.workers)
+    finally:
+        save_traffic(traffic)
+
+    if summary['failed']:
+        sys.exit(1)
+
+
+def run_service(args: argparse.Namespace, logger) -> None:
+    """Serve persona jobs over HTTP with one warm pipeline shared by all jobs."""
+    create_output_directories(args.output_dir)
+
+    from src.pipeline import PersonaPipeline
+    from src.service import PersonaService, serve
+
+    traffic = create_traffic_components(args)
+    pipeline = PersonaPipeline(
+        args.output_dir,
+        reddit_concurrency=args.reddit_concurrency,
+        llm_concurrency=args.llm_concurrency,
+        scraper=create_archive_source(args) or traffic.get('scraper'),
+        analyzer=traffic.get('analyzer'),
+        generator=traffic.get('generator'),
+        checkpoints=traffic.get('checkpoints'),
+        single_flight=traffic.get('single_flight'),
+        resume=not args.no_resume,
+        fast=args.fast,
+        promoted=load_promoted(args)
+    )
+    service = PersonaService(pipeline, workers=args.workers)
+    try:
+        serve(service, args.host, args.port)
+    finally:
+        save_traffic(traffic)
+        pipeline.export_metrics()
+    logger.info("Persona service stopped")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,134 @@
+"""
+Aggregates Module
+Mergeable running aggregates behind the deterministic (non-LLM) analysis statistics.
+"""
+
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Any, Iterable
+
+from src.columnar import UserColumns, KIND_POST, PARENT_COMMENT, PARENT_POST
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+COUNTER_FIELDS = ('subreddit_counts', 'hour_counts', 'day_counts')
+SCALAR_FIELDS = (
+    'post_count', 'comment_count', 'post_score_sum', 'comment_score_sum',
+    'question_posts', 'long_posts', 'text_posts', 'caps_titles',
+    'reply_comments', 'post_replies',
+    'post_length_sum', 'nonempty_posts', 'comment_length_sum',
+    'word_count', 'sentence_count', 'emoji_count', 'exclamation_count',
+    'question_count', 'formal_count', 'informal_count'
+)
+
+
+class ActivityAggregate:
+    """Running counters over a user's posts and comments that can be updated and merged."""
+
+    def __init__(self):
+        self.subreddit_counts: Counter = Counter()
+        self.hour_counts: Counter = Counter()
+        self.day_counts: Counter = Counter()
+        self.vocabulary: set = set()
+        for field in SCALAR_FIELDS:
+            setattr(self, field, 0)
+
+    @classmethod
+    def from_user_data(cls, user_data: Dict[str, Any]) -> 'ActivityAggregate':
+        """Build an aggregate from all posts and comments of a user."""
+        return cls.from_columns(UserColumns.from_user_data(user_data))
+
+    @classmethod
+    def from_columns(cls, columns: UserColumns) -> 'ActivityAggregate':
+        """Build an aggregate with vectorized reductions over column arrays."""
+        import numpy as np
+
+        aggregate = cls()
+        is_post = columns.kind == KIND_POST
+        is_comment = ~is_post
+
+        aggregate.post_count = int(is_post.sum())
+        aggregate.comment_count = int(is_comment.sum())
+        aggregate.post_score_sum = int(columns.score[is_post].sum())
+        aggregate.comment_score_sum = int(columns.score[is_comment].sum())
+
+        aggregate.question_posts = int((is_post & columns.question_title).sum())
+        aggregate.caps_titles = int((is_post & columns.caps_title).sum())
+        aggregate.text_posts = int((is_post & columns.is_self).sum())
+        aggregate.long_posts = int((is_post & (columns.length > 500)).sum())
+        aggregate.post_length_sum = int(columns.length[is_post].sum())
+        aggregate.nonempty_posts = int((is_post & (columns.length > 0)).sum())
+
+        aggregate.reply_comments = int((columns.parent_type == PARENT_COMMENT).sum())
+        aggregate.post_replies = int((columns.parent_type == PARENT_POST).sum())
+        aggregate.comment_length_sum = int(columns.length[is_comment].sum())
+
+        aggregate.word_count = int(columns.words.sum())
+        aggregate.sentence_count = int(columns.sentences.sum())
+        aggregate.emoji_count = int(columns.emojis.sum())
+        aggregate.exclamation_count = int(columns.exclamations.sum())
+        aggregate.question_count = int(columns.questions.sum())
+        aggregate.formal_count = int(columns.formal.sum())
+        aggregate.informal_count = int(columns.informal.sum())
+        aggregate.vocabulary = columns.vocabulary
+
+        # Subreddit ids are interned in first-seen order, matching Counter insertion order
+        subreddit_counts = np.bincount(columns.subreddit_id, minlength=len(columns.subreddit_names))
+        aggregate.subreddit_counts = Counter(
+            {name: int(count) for name, count in zip(columns.subreddit_names, subreddit_counts)}
+        )
+
+        hours, weekdays = columns.local_hours_and_weekdays()
+        aggregate.hour_counts = _first_seen_counts(hours)
+        aggregate.day_counts = _first_seen_counts(weekdays)
+
+        return aggregate
+
+    def add_items(self, posts: Iterable[Dict[str, Any]], comments: Iterable[Dict[str, Any]]) -> None:
+        """Add posts and comments to the running totals."""
+        posts = list(posts)
+        comments = list(comments)
+        if not (posts or comments):
+            return
+        self.merge(ActivityAggregate.from_columns(UserColumns.from_items(posts, comments)))
+
+    def merge(self, other: 'ActivityAggregate') -> None:
+        """Fold another aggregate (over disjoint items) into this one."""
+        for field in COUNTER_FIELDS:
+            getattr(self, field).update(getattr(other, field))
+        for field in SCALAR_FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        self.vocabulary |= other.vocabulary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a JSON-compatible dict."""
+        data = {field: getattr(self, field) for field in SCALAR_FIELDS}
+        for field in COUNTER_FIELDS:
+            data[field] = [[key, count] for key, count in getattr(self, field).items()]
+        data['vocabulary'] = sorted(self.vocabulary)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ActivityAggregate':
+        """Restore an aggregate serialized with to_dict."""
+        aggregate = cls()
+        for field in SCALAR_FIELDS:
+            setattr(aggregate, field, data[field])
+        for field in COUNTER_FIELDS:
+            setattr(aggregate, field, Counter({key: count for key, count in data[field]}))
+        aggregate.vocabulary = set(data['vocabulary'])
+        return aggregate
+
+    def subreddits(self) -> List[str]:
+        """Return the distinct subreddits in first-seen order."""
+        return list(self.subreddit_counts.keys())
+
+
+def _first_seen_counts(values: 'np.ndarray') -> Counter:
+    """Count values, keeping keys in first-occurrence order so most_common breaks ties as before."""
+    import numpy as np
+
+    unique, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.argsort(first_index)
+    return Counter({int(unique[i]): int(counts[i]) for i in order})
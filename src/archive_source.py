@@ -0,0 +1,290 @@
+"""
+Archive Source Module
+Builds user data from zstd-compressed (or plain) NDJSON Reddit dumps instead of the live API.
+"""
+
+import io
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
+
+import zstandard
+
+from config import ARCHIVE_MAX_WINDOW_SIZE
+
+
+# Bump when the index layout or author normalization changes so stale indexes are rebuilt
+ARCHIVE_INDEX_VERSION = 1
+
+
+class ArchiveIndex:
+    """
+    SQLite index mapping lowercased author -> decompressed byte offsets of their records in each dump.
+
+    One connection is shared by all threads (e.g. service workers), serialized by a lock.
+    """
+
+    def __init__(self, path: str):
+        """Open (or create) the index database."""
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != ARCHIVE_INDEX_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS records")
+            self._conn.execute("DROP TABLE IF EXISTS dumps")
+            self._conn.execute(f"PRAGMA user_version = {ARCHIVE_INDEX_VERSION}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records (dump TEXT, author TEXT, offset INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_records_author ON records (dump, author)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS dumps (dump TEXT PRIMARY KEY, size INTEGER)")
+        self._conn.commit()
+
+    def is_indexed(self, dump: str) -> bool:
+        """Check whether a dump is indexed and unchanged since indexing."""
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM dumps WHERE dump = ?", (dump,)).fetchone()
+        return row is not None and row[0] == os.path.getsize(dump)
+
+    def replace(self, dump: str, entries: Iterable[Tuple[str, int]]) -> None:
+        """Replace the index entries of a dump with (author, offset) pairs."""
+        with self._lock:
+            self._conn.execute("DELETE FROM records WHERE dump = ?", (dump,))
+            self._conn.executemany(
+                "INSERT INTO records (dump, author, offset) VALUES (?, ?, ?)",
+                ((dump, author, offset) for author, offset in entries)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dumps (dump, size) VALUES (?, ?)", (dump, os.path.getsize(dump))
+            )
+            self._conn.commit()
+
+    def offsets(self, dump: str, authors: Iterable[str]) -> List[int]:
+        """Return the sorted record offsets for the given (lowercased) authors in a dump."""
+        authors = list(authors)
+        offsets = []
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(authors), 500):
+            batch = authors[i:i + 500]
+            placeholders = ','.join('?' * len(batch))
+            with self._lock:
+                offsets.extend(row[0] for row in self._conn.execute(
+                    f"SELECT offset FROM records WHERE dump = ? AND author IN ({placeholders})",
+                    (dump, *batch)
+                ))
+        return sorted(offsets)
+
+
+class ArchiveSource:
+    """Streams Reddit dumps and emits the same user_data structure as RedditScraper."""
+
+    def __init__(self, dump_paths: List[str], index: Optional[ArchiveIndex] = None):
+        """
+        Initialize the archive source.
+
+        Args:
+            dump_paths: Submission and/or comment dumps (.zst or plain NDJSON)
+            index: Optional author index used to skip unrelated records
+        """
+        self.logger = logging.getLogger(__name__)
+        self.dump_paths = dump_paths
+        self.index = index
+        self._preloaded: Dict[str, Dict[str, Any]] = {}
+
+    def scrape_user_data(self, username: str) -> Dict[str, Any]:
+        """
+        Build user data for one user from the dumps (authors match case-insensitively).
+
+        Args:
+            username: Reddit username
+
+        Returns:
+            Dictionary containing user data with posts and comments
+        """
+        if username.lower() in self._preloaded:
+            return self._preloaded[username.lower()]
+        return self.ingest_users([username])[username]
+
+    def preload(self, usernames: Iterable[str]) -> None:
+        """Ingest a whole cohort in one pass so later scrape_user_data calls are served from memory."""
+        self._preloaded.update(
+            (username.lower(), user_data) for username, user_data in self.ingest_users(usernames).items()
+        )
+
+    def ingest_users(self, usernames: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Filter every dump by author in a single pass.
+
+        Reddit usernames are case-insensitive, so authors are matched by their lowercased name.
+
+        Args:
+            usernames: Authors to collect
+
+        Returns:
+            Dictionary mapping username to user data
+        """
+        names = {username.lower(): username for username in usernames}
+        users = {author: self._empty_user_data(name) for author, name in names.items()}
+
+        for dump in self.dump_paths:
+            self.logger.info(f"Scanning archive {dump} for {len(names)} authors")
+            for record in self._iter_author_records(dump, set(names)):
+                user_data = users[record['author'].lower()]
+                try:
+                    if 'title' in record:
+                        user_data['posts'].append(self._parse_post(record))
+                    elif 'body' in record:
+                        user_data['comments'].append(self._parse_comment(record))
+                except (KeyError, TypeError, ValueError) as e:
+                    self.logger.debug(f"Skipping archive record without a valid id or timestamp: {str(e)}")
+
+        for user_data in users.values():
+            # Match the live listings: newest first
+            user_data['posts'].sort(key=lambda p: p['created_utc'], reverse=True)
+            user_data['comments'].sort(key=lambda c: c['created_utc'], reverse=True)
+            user_data['metadata']['total_posts'] = len(user_data['posts'])
+            user_data['metadata']['total_comments'] = len(user_data['comments'])
+
+        return {names[author]: user_data for author, user_data in users.items()}
+
+    def build_index(self, index: ArchiveIndex) -> None:
+        """Index every dump by author so later ingests can skip unrelated records."""
+        for dump in self.dump_paths:
+            if index.is_indexed(dump):
+                continue
+            self.logger.info(f"Indexing archive {dump}")
+            index.replace(dump, (
+                (record['author'].lower(), offset) for offset, record in self._iter_records(dump)
+                if isinstance(record.get('author'), str)
+            ))
+        self.index = index
+
+    def _iter_author_records(self, dump: str, authors: Set[str]) -> Iterator[Dict[str, Any]]:
+        """Yield the records of the given lowercased authors from one dump."""
+        if self.index and self.index.is_indexed(dump):
+            yield from self._iter_indexed_records(dump, self.index.offsets(dump, authors))
+            return
+
+        # Cheap byte-level prefilter before paying for JSON parsing
+        needles = [author.encode('utf-8') for author in authors]
+        for line in self._iter_lines(dump):
+            if len(needles) < 50 and not any(needle in line.lower() for needle in needles):
+                continue
+            record = self._parse_line(line)
+            author = record.get('author') if record else None
+            if isinstance(author, str) and author.lower() in authors:
+                yield record
+
+    def _iter_indexed_records(self, dump: str, offsets: List[int]) -> Iterator[Dict[str, Any]]:
+        """Yield records at known offsets, stopping after the last one."""
+        if not offsets:
+            return
+
+        if not dump.endswith('.zst'):
+            # Plain NDJSON supports true random access
+            with open(dump, 'rb') as f:
+                for offset in offsets:
+                    f.seek(offset)
+                    record = self._parse_line(f.readline())
+                    if record:
+                        yield record
+            return
+
+        # zstd streams cannot seek: decompress sequentially, but only parse indexed
+        # lines and stop as soon as the last one has been read
+        wanted = iter(offsets)
+        target = next(wanted)
+        offset = 0
+        for line in self._iter_lines(dump):
+            if offset == target:
+                record = self._parse_line(line)
+                if record:
+                    yield record
+                target = next(wanted, None)
+                if target is None:
+                    return
+            offset += len(line)
+
+    def _iter_records(self, dump: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (decompressed byte offset, record) for every record in a dump."""
+        offset = 0
+        for line in self._iter_lines(dump):
+            record = self._parse_line(line)
+            if record:
+                yield offset, record
+            offset += len(line)
+
+    def _iter_lines(self, dump: str) -> Iterator[bytes]:
+        """Stream raw lines from a .zst or plain NDJSON dump."""
+        with open(dump, 'rb') as f:
+            if dump.endswith('.zst'):
+                decompressor = zstandard.ZstdDecompressor(max_window_size=ARCHIVE_MAX_WINDOW_SIZE)
+                with decompressor.stream_reader(f) as reader:
+                    yield from io.BufferedReader(reader, buffer_size=1 << 20)
+            else:
+                yield from f
+
+    def _parse_line(self, line: bytes) -> Optional[Dict[str, Any]]:
+        """Parse one NDJSON line, skipping malformed records and non-object values."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            self.logger.debug("Skipping malformed archive record")
+            return None
+        if not isinstance(record, dict):
+            self.logger.debug("Skipping non-object archive record")
+            return None
+        return record
+
+    def _empty_user_data(self, username: str) -> Dict[str, Any]:
+        """Create an empty user_data dict in the scraper's format."""
+        return {
+            'username': username,
+            'posts': [],
+            'comments': [],
+            'metadata': {
+                'scraped_at': datetime.now().isoformat(),
+                'source': 'archive',
+                'total_posts': 0,
+                'total_comments': 0
+            }
+        }
+
+    def _parse_post(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a submission record into a post dict."""
+        return {
+            'id': record['id'],
+            'title': record.get('title', ''),
+            'content': record.get('selftext') or '',
+            'subreddit': record.get('subreddit', ''),
+            'created_utc': float(record['created_utc']),
+            'score': int(record.get('score') or 0),
+            'upvote_ratio': record.get('upvote_ratio'),
+            'num_comments': record.get('num_comments', 0),
+            'url': record.get('url'),
+            'is_self': bool(record.get('is_self', False))
+        }
+
+    def _parse_comment(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a comment record into a comment dict."""
+        link_id = record.get('link_id', '')
+        return {
+            'id': record['id'],
+            'body': record.get('body') or '',
+            'subreddit': record.get('subreddit', ''),
+            'created_utc': float(record['created_utc']),
+            'score': int(record.get('score') or 0),
+            'parent_id': record.get('parent_id') or link_id,
+            'link_id': link_id,
+            'is_submitter': bool(record.get('is_submitter', False))
+        }
@@ -0,0 +1,82 @@
+"""
+Checkpoint Module
+Persists the output of each pipeline stage and persona section, keyed by
+username and input hash, so an interrupted run resumes where it stopped.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config import CHECKPOINT_DIR, CHECKPOINT_MAX_AGE
+from src.storage import JsonStore
+
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_STAGES = ('scrape', 'analyze', 'generate')
+
+
+def content_hash(data: Any) -> str:
+    """
+    Hash JSON-serializable data independently of dict ordering.
+
+    The data is normalized through a JSON round trip first, so it hashes the
+    same as its checkpointed copy (e.g. int dict keys come back as strings).
+    """
+    normalized = json.loads(json.dumps(data, default=str))
+    return hashlib.sha256(
+        json.dumps(normalized, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+
+
+class CheckpointStore:
+    """One JSON document per user and stage, valid only for the input it was computed from."""
+
+    def __init__(self, store: Optional[JsonStore] = None, max_age: float = CHECKPOINT_MAX_AGE):
+        """
+        Initialize the checkpoint store.
+
+        Args:
+            store: Underlying JSON store (defaults to CHECKPOINT_DIR)
+            max_age: Seconds after which a checkpoint is ignored
+        """
+        self.logger = logging.getLogger(__name__)
+        self.store = store or JsonStore(CHECKPOINT_DIR)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def load(self, username: str, stage: str, input_hash: str) -> Optional[Any]:
+        """Return a stage's checkpointed output if it is current for this input, else None."""
+        document = self.store.load(self._key(username, stage))
+        if (not document or document.get('version') != CHECKPOINT_VERSION
+                or document.get('input_hash') != input_hash
+                or time.time() - document.get('saved_at', 0) > self.max_age):
+            return None
+        return document['data']
+
+    def save(self, username: str, stage: str, input_hash: str, data: Any) -> None:
+        """Checkpoint a stage's output."""
+        self.store.save(self._key(username, stage), {
+            'version': CHECKPOINT_VERSION,
+            'input_hash': input_hash,
+            'saved_at': time.time(),
+            'data': data
+        })
+
+    def save_section(self, username: str, input_hash: str, name: str, section: Dict[str, Any]) -> None:
+        """Add one completed persona section to the generate checkpoint."""
+        with self._lock:
+            sections = self.load(username, 'generate', input_hash) or {}
+            sections[name] = section
+            self.save(username, 'generate', input_hash, sections)
+
+    def clear(self, username: str) -> None:
+        """Remove every checkpoint of a user."""
+        for stage in CHECKPOINT_STAGES:
+            self.store.delete(self._key(username, stage))
+
+    def _key(self, username: str, stage: str) -> str:
+        return f"{username}.{stage}"
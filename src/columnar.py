@@ -0,0 +1,136 @@
+"""
+Columnar Module
+Compact column arrays over a user's posts and comments, built in a single pass,
+for vectorized computation of the deterministic analysis statistics.
+"""
+
+import re
+import time
+from typing import TYPE_CHECKING, Dict, List, Any, Iterable, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+EMOJI_PATTERN = re.compile(r'[😀-🿿]')
+SENTENCE_PATTERN = re.compile(r'[.!?]+')
+FORMAL_WORDS = ['therefore', 'however', 'furthermore', 'nevertheless', 'consequently']
+INFORMAL_WORDS = ['lol', 'haha', 'omg', 'btw', 'tbh', 'ngl', 'fr']
+
+KIND_POST = 0
+KIND_COMMENT = 1
+
+PARENT_NONE = 0
+PARENT_COMMENT = 1  # parent_id starts with t1_
+PARENT_POST = 2  # parent_id starts with t3_
+
+TEXT_METRICS = ('words', 'sentences', 'emojis', 'exclamations', 'questions', 'formal', 'informal')
+
+
+class UserColumns:
+    """Column arrays (one row per post or comment) plus interned subreddit names."""
+
+    def __init__(self, size: int):
+        # numpy is imported on first use, so runs with no new items never load it
+        import numpy as np
+
+        self.size = size
+        self.kind = np.zeros(size, dtype=np.int8)
+        self.created_utc = np.zeros(size, dtype=np.float64)
+        self.score = np.zeros(size, dtype=np.int64)
+        self.length = np.zeros(size, dtype=np.int64)  # post content / comment body length
+        self.subreddit_id = np.zeros(size, dtype=np.int32)
+        self.parent_type = np.zeros(size, dtype=np.int8)
+        self.question_title = np.zeros(size, dtype=bool)
+        self.caps_title = np.zeros(size, dtype=bool)
+        self.is_self = np.zeros(size, dtype=bool)
+        for metric in TEXT_METRICS:
+            setattr(self, metric, np.zeros(size, dtype=np.int64))
+
+        self.subreddit_names: List[str] = []
+        self.vocabulary: set = set()
+        self._subreddit_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_user_data(cls, user_data: Dict[str, Any]) -> 'UserColumns':
+        """Build columns from all posts and comments of a user."""
+        return cls.from_items(user_data['posts'], user_data['comments'])
+
+    @classmethod
+    def from_items(cls, posts: Iterable[Dict[str, Any]],
+                   comments: Iterable[Dict[str, Any]]) -> 'UserColumns':
+        """Build columns from posts and comments in one pass over the items."""
+        posts = list(posts)
+        comments = list(comments)
+        columns = cls(len(posts) + len(comments))
+
+        row = 0
+        for post in posts:
+            title, content = post['title'], post['content']
+            columns._fill_common(row, KIND_POST, post, len(content))
+            columns.question_title[row] = '?' in title
+            columns.caps_title[row] = title.isupper()
+            columns.is_self[row] = post['is_self']
+            columns._fill_text(row, title + " " + content)
+            row += 1
+
+        for comment in comments:
+            columns._fill_common(row, KIND_COMMENT, comment, len(comment['body']))
+            parent_id = comment['parent_id']
+            if parent_id.startswith('t1_'):
+                columns.parent_type[row] = PARENT_COMMENT
+            elif parent_id.startswith('t3_'):
+                columns.parent_type[row] = PARENT_POST
+            columns._fill_text(row, comment['body'])
+            row += 1
+
+        return columns
+
+    def local_hours_and_weekdays(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Return local-time hour (0-23) and weekday (Monday=0) for every row."""
+        import numpy as np
+
+        if not self.size:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # UTC offsets only change on hour boundaries, so look them up once per distinct hour
+        hour_buckets = np.floor_divide(self.created_utc, 3600).astype(np.int64)
+        unique_buckets, inverse = np.unique(hour_buckets, return_inverse=True)
+        offsets = np.array(
+            [time.localtime(int(bucket) * 3600).tm_gmtoff for bucket in unique_buckets],
+            dtype=np.int64
+        )
+
+        local_seconds = np.floor(self.created_utc).astype(np.int64) + offsets[inverse]
+        hours = (local_seconds // 3600) % 24
+        weekdays = (local_seconds // 86400 + 3) % 7  # 1970-01-01 was a Thursday
+        return hours, weekdays
+
+    def _fill_common(self, row: int, kind: int, item: Dict[str, Any], length: int) -> None:
+        """Fill the columns shared by posts and comments."""
+        self.kind[row] = kind
+        self.created_utc[row] = item['created_utc']
+        self.score[row] = item['score']
+        self.length[row] = length
+
+        subreddit = item['subreddit']
+        subreddit_id = self._subreddit_index.get(subreddit)
+        if subreddit_id is None:
+            subreddit_id = len(self.subreddit_names)
+            self._subreddit_index[subreddit] = subreddit_id
+            self.subreddit_names.append(subreddit)
+        self.subreddit_id[row] = subreddit_id
+
+    def _fill_text(self, row: int, text: str) -> None:
+        """Fill the per-row text metrics and extend the vocabulary."""
+        words = text.split()
+        self.vocabulary.update(words)
+        lowered = text.lower()
+
+        self.words[row] = len(words)
+        self.sentences[row] = len(SENTENCE_PATTERN.findall(text))
+        self.emojis[row] = len(EMOJI_PATTERN.findall(text))
+        self.exclamations[row] = text.count('!')
+        self.questions[row] = text.count('?')
+        self.formal[row] = sum(lowered.count(word) for word in FORMAL_WORDS)
+        self.informal[row] = sum(lowered.count(word) for word in INFORMAL_WORDS)
@@ -0,0 +1,215 @@
+"""
+Credential Pool Module
+Holds one authenticated Reddit client per registered app, routes requests to
+the least-loaded client and quarantines clients rejected with 401/429.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+
+from prawcore import Requestor
+
+from config import (
+    REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_CREDENTIALS, REDDIT_USER_AGENT,
+    REDDIT_REQUESTS_PER_MINUTE, REDDIT_BURST, REDDIT_QUARANTINE_SECONDS
+)
+from src.metrics import record
+from src.rate_limiter import RateLimiter, get_rate_limiter
+
+
+QUARANTINE_STATUSES = (401, 429)
+
+
+class CredentialPoolExhaustedError(RuntimeError):
+    """Raised when every client in the pool is quarantined."""
+
+
+class RateLimitedRequestor(Requestor):
+    """PRAW requestor that passes every HTTP request through a shared rate limiter."""
+
+    def __init__(self, *args, rate_limiter: RateLimiter,
+                 on_response: Optional[Callable[[Any], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.on_response = on_response
+
+    def request(self, *args, **kwargs):
+        record('reddit_requests')
+        record('rate_limit_wait_seconds', self.rate_limiter.acquire())
+        response = super().request(*args, **kwargs)
+        self.rate_limiter.update_from_headers(response.headers)
+        if self.on_response:
+            self.on_response(response)
+        return response
+
+
+class PooledClient:
+    """A Reddit client with its own credential, rate limiter and load counters."""
+
+    def __init__(self, name: str, reddit: Any = None, rate_limiter: Optional[RateLimiter] = None,
+                 factory: Optional[Callable[['PooledClient'], Any]] = None):
+        """
+        Args:
+            name: Identifier used in logs and stats
+            reddit: Ready Reddit client
+            rate_limiter: Limiter shared by the client's requests
+            factory: Builds the Reddit client for this PooledClient on first use when none is given
+        """
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self.in_flight = 0
+        self.quarantined_until = 0.0
+        self.quarantines = 0
+        self._reddit = reddit
+        self._factory = factory
+        self._lock = threading.Lock()
+
+    @property
+    def reddit(self) -> Any:
+        """The Reddit client, built by the factory on first access."""
+        if self._reddit is None and self._factory is not None:
+            with self._lock:
+                if self._reddit is None:
+                    self._reddit = self._factory(self)
+        return self._reddit
+
+    @property
+    def quarantined(self) -> bool:
+        return time.monotonic() < self.quarantined_until
+
+
+def load_credentials(value: str = REDDIT_CREDENTIALS) -> List[Tuple[str, str]]:
+    """
+    Parse 'client_id:client_secret' pairs separated by commas.
+
+    Falls back to REDDIT_CLIENT_ID/REDDIT_CLIENT_SECRET when no pool is configured.
+    """
+    credentials = []
+    for pair in value.split(','):
+        if pair.strip():
+            client_id, _, client_secret = pair.strip().partition(':')
+            credentials.append((client_id, client_secret))
+    return credentials or [(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET)]
+
+
+class CredentialPool:
+    """Routes Reddit requests across several authenticated clients."""
+
+    def __init__(self, quarantine_seconds: float = REDDIT_QUARANTINE_SECONDS):
+        """
+        Initialize an empty pool.
+
+        Args:
+            quarantine_seconds: How long a client rejected with 401/429 is skipped
+                (a 429 with an X-Ratelimit-Reset header is skipped until the reset)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.quarantine_seconds = quarantine_seconds
+        self.clients: List[PooledClient] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, credentials: Optional[List[Tuple[str, str]]] = None,
+                    requestor_class: Optional[type] = None,
+                    requestor_kwargs: Optional[Dict[str, Any]] = None) -> 'CredentialPool':
+        """
+        Register a rate-limited praw.Reddit client for every configured credential.
+
+        The clients (and PRAW itself) are only built when first borrowed, so a
+        pipeline that never talks to Reddit does not pay for them.
+
+        Args:
+            credentials: (client_id, client_secret) pairs (defaults to load_credentials())
+            requestor_class: RateLimitedRequestor subclass used by each client
+            requestor_kwargs: Extra keyword arguments for the requestors
+        """
+        pool = cls()
+        secrets: Dict[str, str] = {}
+
+        def build_client(client: PooledClient) -> Any:
+            # Imported here so runs that never build a live client (archive dumps, benchmarks) skip PRAW
+            import praw
+
+            return praw.Reddit(
+                client_id=client.name,
+                client_secret=secrets[client.name],
+                user_agent=REDDIT_USER_AGENT,
+                requestor_class=requestor_class or RateLimitedRequestor,
+                requestor_kwargs={
+                    'rate_limiter': client.rate_limiter,
+                    'on_response': lambda response: pool.observe(client, response),
+                    **(requestor_kwargs or {})
+                }
+            )
+
+        for client_id, client_secret in credentials or load_credentials():
+            secrets[client_id] = client_secret
+            pool.clients.append(PooledClient(client_id, factory=build_client, rate_limiter=get_rate_limiter(
+                f"reddit:{client_id}",
+                rate=REDDIT_REQUESTS_PER_MINUTE / 60,
+                capacity=REDDIT_BURST
+            )))
+        pool.logger.info(f"Reddit credential pool with {len(pool.clients)} clients")
+        return pool
+
+    @classmethod
+    def from_clients(cls, clients: List[Any]) -> 'CredentialPool':
+        """Wrap existing Reddit clients (e.g. fakes or replaying clients) in a pool."""
+        pool = cls()
+        pool.clients = [PooledClient(f"client{i}", reddit) for i, reddit in enumerate(clients)]
+        return pool
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    @contextmanager
+    def client(self) -> Iterator[PooledClient]:
+        """Borrow the least-loaded client that is not quarantined."""
+        with self._lock:
+            available = [client for client in self.clients if not client.quarantined]
+            if not available:
+                raise CredentialPoolExhaustedError("All Reddit clients are quarantined")
+            client = min(available, key=lambda c: (
+                c.in_flight, -(c.rate_limiter.available() if c.rate_limiter else 0)
+            ))
+            client.in_flight += 1
+        try:
+            yield client
+        finally:
+            with self._lock:
+                client.in_flight -= 1
+
+    def observe(self, client: PooledClient, response: Any) -> None:
+        """Quarantine a client whose request was rejected with 401 or 429."""
+        if response.status_code not in QUARANTINE_STATUSES:
+            return
+
+        duration = self.quarantine_seconds
+        if response.status_code == 429:
+            try:
+                duration = float(response.headers.get('x-ratelimit-reset'))
+            except (TypeError, ValueError):
+                pass
+
+        with self._lock:
+            client.quarantined_until = max(client.quarantined_until, time.monotonic() + duration)
+            client.quarantines += 1
+        record('reddit_client_quarantines')
+        self.logger.warning(
+            f"Quarantining Reddit client {client.name} for {duration:.0f}s "
+            f"after HTTP {response.status_code}"
+        )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return the load and quota of every client."""
+        with self._lock:
+            return [{
+                **(client.rate_limiter.stats() if client.rate_limiter else {}),
+                'name': client.name,
+                'in_flight': client.in_flight,
+                'quarantined': client.quarantined,
+                'quarantines': client.quarantines
+            } for client in self.clients]
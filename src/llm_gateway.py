@@ -0,0 +1,208 @@
+"""
+LLM Gateway Module
+Process-wide gateway for Gemini calls: adaptive (AIMD) concurrency, retries with
+exponential backoff and jitter, and rotation across several API keys.
+"""
+
+import contextvars
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from config import (
+    GOOGLE_API_KEY, GOOGLE_API_KEYS, LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY,
+    LLM_GATEWAY_INITIAL_CONCURRENCY, LLM_GATEWAY_MAX_CONCURRENCY, LLM_GATEWAY_LATENCY_TARGET
+)
+from src.metrics import record
+
+
+QUOTA_ERROR_MARKERS = ('429', '503', 'quota', 'resource exhausted', 'resourceexhausted',
+                       'rate limit', 'too many requests', 'unavailable')
+
+# API key chosen by the gateway for the call in progress; read by LazyChatModel
+current_api_key: contextvars.ContextVar = contextvars.ContextVar('llm_api_key', default=None)
+
+
+def is_quota_error(error: Exception) -> bool:
+    """Check whether an exception is a retryable quota/overload error."""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in QUOTA_ERROR_MARKERS)
+
+
+def load_api_keys(value: str = GOOGLE_API_KEYS) -> List[str]:
+    """Parse comma-separated API keys, falling back to GOOGLE_API_KEY."""
+    keys = [key.strip() for key in value.split(',') if key.strip()]
+    return keys or [GOOGLE_API_KEY]
+
+
+class _ApiKey:
+    """Usage and cooldown state of one API key."""
+
+    def __init__(self, value: Optional[str], index: int):
+        self.value = value
+        self.name = f"key{index}"
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.throttled = 0
+
+
+class LLMGateway:
+    """
+    Shared entry point for LLM calls.
+
+    Concurrency follows AIMD: the in-flight limit grows by about one per round
+    of calls that succeed within the latency target, and halves when the
+    provider throttles (at most once per round, so a burst of concurrent 429s
+    counts as one signal). A throttled key cools down for the retry delay while
+    the retry goes to another key if one is free.
+    """
+
+    def __init__(self, api_keys: Optional[List[Optional[str]]] = None,
+                 initial_concurrency: int = LLM_GATEWAY_INITIAL_CONCURRENCY,
+                 max_concurrency: int = LLM_GATEWAY_MAX_CONCURRENCY,
+                 latency_target: float = LLM_GATEWAY_LATENCY_TARGET,
+                 max_retries: int = LLM_MAX_RETRIES,
+                 base_delay: float = LLM_RETRY_BASE_DELAY,
+                 max_delay: float = LLM_RETRY_MAX_DELAY):
+        """
+        Initialize the gateway.
+
+        Args:
+            api_keys: Keys to rotate across (defaults to load_api_keys())
+            initial_concurrency: Starting in-flight call limit
+            max_concurrency: Upper bound for the in-flight limit
+            latency_target: Calls slower than this (seconds) do not grow the limit
+            max_retries: Retries of quota errors after the first attempt
+            base_delay: Delay before the first retry in seconds, doubled on each retry
+            max_delay: Cap on a single retry delay in seconds
+        """
+        self.logger = logging.getLogger(__name__)
+        self.keys = [_ApiKey(key, i) for i, key in enumerate(api_keys or load_api_keys())]
+        self.limit = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._changed = threading.Condition()
+
+    def invoke(self, llm: Any, prompt: Any, max_retries: Optional[int] = None,
+               base_delay: Optional[float] = None) -> Any:
+        """
+        Invoke an LLM within the concurrency limit, retrying quota errors.
+
+        Args:
+            llm: Chat model with an invoke(prompt) method
+            prompt: Rendered prompt
+            max_retries: Override of the gateway's retry count
+            base_delay: Override of the gateway's first retry delay
+
+        Returns:
+            The model response
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        base_delay = self.base_delay if base_delay is None else base_delay
+        attempt = 0
+
+        while True:
+            key = self._acquire()
+            record('llm_calls')
+            token = current_api_key.set(key.value)
+            start = time.monotonic()
+            try:
+                response = llm.invoke(prompt)
+            except Exception as e:
+                elapsed = time.monotonic() - start
+                record('llm_seconds', elapsed)
+                throttled = is_quota_error(e)
+                self._release(key, start, elapsed, throttled=throttled)
+                if not throttled or attempt >= max_retries:
+                    raise
+
+                delay = min(self.max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                attempt += 1
+                wait = self._cool_down(key, delay)
+                self.logger.warning(
+                    f"LLM quota error on {key.name}, retrying in {wait:.1f}s "
+                    f"({attempt}/{max_retries}, concurrency limit {int(self.limit)}): {str(e)}"
+                )
+                record('llm_retries')
+                record('llm_backoff_seconds', wait)
+                time.sleep(wait)
+                continue
+            finally:
+                current_api_key.reset(token)
+
+            elapsed = time.monotonic() - start
+            record('llm_seconds', elapsed)
+            self._release(key, start, elapsed, throttled=False)
+            return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, load and per-key counters."""
+        with self._changed:
+            return {
+                'concurrency_limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'keys': [{
+                    'name': key.name,
+                    'in_flight': key.in_flight,
+                    'calls': key.calls,
+                    'throttled': key.throttled,
+                    'cooling_down': key.cooldown_until > time.monotonic()
+                } for key in self.keys]
+            }
+
+    def _acquire(self) -> _ApiKey:
+        """Wait for a free slot, then pick the least-busy key that is not cooling down."""
+        start = time.monotonic()
+        with self._changed:
+            self._changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            now = time.monotonic()
+            key = min(self.keys, key=lambda k: (max(k.cooldown_until - now, 0), k.in_flight, k.calls))
+            key.in_flight += 1
+            key.calls += 1
+        record('llm_gateway_wait_seconds', time.monotonic() - start)
+        return key
+
+    def _release(self, key: _ApiKey, started: float, elapsed: float, throttled: bool) -> None:
+        """Free a slot and adapt the limit to the call's outcome."""
+        with self._changed:
+            self.in_flight -= 1
+            key.in_flight -= 1
+            if throttled:
+                key.throttled += 1
+                record('llm_throttled')
+                # Calls started before the last decrease saw the old limit; ignore them
+                if started > self._last_decrease:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._last_decrease = time.monotonic()
+            elif elapsed <= self.latency_target:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._changed.notify_all()
+
+    def _cool_down(self, key: _ApiKey, delay: float) -> float:
+        """Rest a throttled key; return how long to wait before a key is available."""
+        with self._changed:
+            now = time.monotonic()
+            key.cooldown_until = max(key.cooldown_until, now + delay)
+            return max(min(k.cooldown_until for k in self.keys) - now, 0.0)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Return the process-wide LLM gateway, creating it on first use."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
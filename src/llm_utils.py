@@ -0,0 +1,131 @@
+"""
+LLM utility functions shared by the analyzer and generator.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from config import GOOGLE_API_KEY, LLM_MODELS
+from src.llm_cache import LLMCache
+from src.llm_gateway import current_api_key, get_llm_gateway
+from src.metrics import record
+from src.utils import estimate_tokens
+
+
+class PromptTemplate:
+    """
+    f-string prompt template, rendered like LangChain's PromptTemplate.
+
+    The prompts only need variable substitution, so rendering them (which every
+    cache lookup does) does not import LangChain and its pydantic models.
+    """
+
+    def __init__(self, input_variables: List[str], template: str):
+        self.input_variables = input_variables
+        self.template = template
+
+    def format(self, **kwargs) -> str:
+        missing = [name for name in self.input_variables if name not in kwargs]
+        if missing:
+            raise KeyError(f"Missing prompt variables: {', '.join(missing)}")
+        return self.template.format(**kwargs)
+
+
+class LazyChatModel:
+    """
+    Gemini chat model that imports the SDK and builds the client on first invoke.
+
+    model and temperature are available up front, so cache lookups never pay
+    for constructing the client. One client is built per API key, using the
+    key the LLM gateway picked for the current call.
+    """
+
+    def __init__(self, model: str = LLM_MODELS['pro'], temperature: float = 0.3, **kwargs):
+        self.model = model
+        self.temperature = temperature
+        self.kwargs = kwargs
+        self._clients: Dict[Optional[str], Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        """The ChatGoogleGenerativeAI client for the current API key, created on first access."""
+        api_key = current_api_key.get() or GOOGLE_API_KEY
+        if api_key not in self._clients:
+            with self._lock:
+                if api_key not in self._clients:
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+                    self._clients[api_key] = ChatGoogleGenerativeAI(
+                        google_api_key=api_key,
+                        model=self.model,
+                        temperature=self.temperature,
+                        **self.kwargs
+                    )
+        return self._clients[api_key]
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        return self.client.invoke(prompt, **kwargs)
+
+
+def message_text(message: Any) -> str:
+    """Return the text of an LLM response, whether a message object or a plain string."""
+    return str(getattr(message, 'content', message))
+
+
+def invoke_with_retry(llm: Any, prompt: str, max_retries: Optional[int] = None,
+                      base_delay: Optional[float] = None) -> Any:
+    """
+    Invoke an LLM through the shared gateway, retrying quota errors with backoff.
+
+    Args:
+        llm: LangChain chat model
+        prompt: Rendered prompt text
+        max_retries: Number of retries after the first attempt (defaults to LLM_MAX_RETRIES)
+        base_delay: Delay before the first retry in seconds (defaults to LLM_RETRY_BASE_DELAY)
+
+    Returns:
+        The model response
+    """
+    response = get_llm_gateway().invoke(llm, prompt, max_retries, base_delay)
+    _record_token_usage(prompt, response)
+    return response
+
+
+def _record_token_usage(prompt: str, response: Any) -> None:
+    """Record token usage as reported by the API, estimating it when absent."""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    record('llm_input_tokens', usage.get('input_tokens') or estimate_tokens(prompt))
+    record('llm_output_tokens', usage.get('output_tokens') or estimate_tokens(message_text(response)))
+
+
+def invoke_cached(llm: Any, prompt: PromptTemplate, cache: Optional[LLMCache] = None,
+                  validate: Optional[Callable[[str], bool]] = None, **kwargs) -> str:
+    """
+    Render a prompt template and invoke the LLM, serving repeated prompts from the cache.
+
+    Args:
+        llm: LangChain chat model
+        prompt: Prompt template to render
+        cache: Response cache, or None to always call the model
+        validate: Optional check; responses failing it are returned but not cached
+        **kwargs: Template variables
+
+    Returns:
+        The response text
+    """
+    content = prompt.format(**kwargs)
+    if cache is None:
+        return message_text(invoke_with_retry(llm, content))
+
+    key = cache.make_key(
+        getattr(llm, 'model', ''), getattr(llm, 'temperature', None), prompt.template, content
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        record('llm_cache_hits')
+        return cached
+
+    response = message_text(invoke_with_retry(llm, content))
+    if validate is None or validate(response):
+        cache.put(key, response)
+    return response
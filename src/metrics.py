@@ -0,0 +1,179 @@
+"""
+Metrics Module
+Records wall time, LLM usage and Reddit requests per pipeline stage and section,
+as a per-run report and as cumulative counters exportable in Prometheus text format.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Callable, Iterator, Tuple
+
+
+COUNTERS = {
+    'wall_seconds': 'Wall-clock time spent in the stage or section',
+    'llm_calls': 'LLM invocations, including failed attempts',
+    'llm_seconds': 'Time spent waiting on LLM responses',
+    'llm_input_tokens': 'LLM prompt tokens (reported by the API, else estimated)',
+    'llm_output_tokens': 'LLM response tokens (reported by the API, else estimated)',
+    'llm_retries': 'LLM calls retried after quota errors',
+    'llm_backoff_seconds': 'Time slept between LLM retries',
+    'llm_cache_hits': 'LLM responses served from the response cache',
+    'llm_throttled': 'LLM calls rejected with quota/overload errors',
+    'llm_gateway_wait_seconds': 'Time LLM calls waited for an adaptive-concurrency slot',
+    'llm_escalations': 'Prompts re-asked on a larger model after the routed model failed',
+    'reddit_requests': 'HTTP requests sent to the Reddit API',
+    'rate_limit_wait_seconds': 'Time slept by the Reddit rate limiter',
+    'reddit_client_quarantines': 'Reddit clients quarantined after 401/429 responses',
+    'single_flight_shared': 'Results shared from an identical in-flight computation'
+}
+
+# (stage, section); section is '' for work outside any section
+Scope = Tuple[str, str]
+
+_current_run: contextvars.ContextVar = contextvars.ContextVar('metrics_run', default=None)
+_current_scope: contextvars.ContextVar = contextvars.ContextVar('metrics_scope', default=('other', ''))
+
+
+class RunMetrics:
+    """Counters for one pipeline run, broken down by stage and section."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = datetime.now().isoformat()
+        self.scopes: Dict[Scope, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, scope: Scope, counter: str, value: float) -> None:
+        """Add a value to a counter of one scope."""
+        with self._lock:
+            counters = self.scopes.setdefault(scope, {})
+            counters[counter] = counters.get(counter, 0) + value
+
+    def seconds(self, stage: str) -> float:
+        """Return the wall time of a stage."""
+        return self.scopes.get((stage, ''), {}).get('wall_seconds', 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Build the run report.
+
+        Stage counters include the work done in their sections; section wall
+        times overlap when sections run concurrently, so only stage wall times
+        are summed into the totals.
+        """
+        with self._lock:
+            scopes = {scope: dict(counters) for scope, counters in self.scopes.items()}
+
+        stages: Dict[str, Dict[str, Any]] = {}
+        totals: Dict[str, float] = {}
+        for (stage, section), counters in sorted(scopes.items()):
+            entry = stages.setdefault(stage, {'sections': {}})
+            if section:
+                entry['sections'][section] = counters
+            for counter, value in counters.items():
+                if section and counter == 'wall_seconds':
+                    continue
+                entry[counter] = entry.get(counter, 0) + value
+                totals[counter] = totals.get(counter, 0) + value
+
+        return {
+            'label': self.label,
+            'started_at': self.started_at,
+            'totals': totals,
+            'stages': stages
+        }
+
+
+class MetricsRegistry:
+    """Process-wide cumulative counters, labelled by stage and section."""
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, counter: str, scope: Scope, value: float) -> None:
+        """Add a value to a cumulative counter."""
+        key = (counter, *scope)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def totals(self) -> Dict[str, float]:
+        """Return each counter summed over all stages and sections."""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for (counter, _, _), value in self._values.items():
+                totals[counter] = totals.get(counter, 0) + value
+        return totals
+
+    def to_prometheus(self) -> str:
+        """Render every counter in the Prometheus text exposition format."""
+        with self._lock:
+            values = dict(self._values)
+
+        lines = []
+        for counter, description in COUNTERS.items():
+            name = f"persona_{counter}_total"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for (key, stage, section), value in sorted(values.items()):
+                if key == counter:
+                    lines.append(f'{name}{{stage="{stage}",section="{section}"}} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def record(counter: str, value: float = 1) -> None:
+    """Add to a counter in the current stage/section of the current run."""
+    scope = _current_scope.get()
+    REGISTRY.add(counter, scope, value)
+    run = _current_run.get()
+    if run is not None:
+        run.add(scope, counter, value)
+
+
+@contextmanager
+def track_run(label: str) -> Iterator[RunMetrics]:
+    """Collect the metrics recorded inside the block into a new RunMetrics."""
+    run = RunMetrics(label)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Attribute the metrics recorded inside the block to a pipeline stage."""
+    with _track_scope((stage, '')):
+        yield
+
+
+@contextmanager
+def track_section(section: str) -> Iterator[None]:
+    """Attribute the metrics recorded inside the block to a section of the current stage."""
+    with _track_scope((_current_scope.get()[0], section)):
+        yield
+
+
+@contextmanager
+def _track_scope(scope: Scope) -> Iterator[None]:
+    """Switch the current scope and record the block's wall time in it."""
+    token = _current_scope.set(scope)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record('wall_seconds', time.perf_counter() - start)
+        _current_scope.reset(token)
+
+
+def propagate_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Bind a callable to a copy of the current run and scope, for submitting to worker threads."""
+    return functools.partial(contextvars.copy_context().run, func)
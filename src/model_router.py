@@ -0,0 +1,101 @@
+"""
+Model Router Module
+Routes each named prompt to a model tier (fast map/extraction prompts, pro
+synthesis prompts) and escalates to a larger tier when a cheaper model's
+output fails validation.
+"""
+
+import logging
+from typing import Dict, List, Any, Callable, Optional
+
+from config import (
+    LLM_MODELS, LLM_MODEL_ROUTES, LLM_DEFAULT_TIER, LLM_ESCALATION_TIER, LLM_MIN_RESPONSE_CHARS
+)
+from src.llm_cache import LLMCache
+from src.llm_utils import LazyChatModel, PromptTemplate, invoke_cached
+from src.metrics import record
+
+
+class ModelRouter:
+    """Maps prompt names to chat models through a configurable tier table."""
+
+    def __init__(self, models: Optional[Dict[str, Any]] = None,
+                 routes: Optional[Dict[str, str]] = None,
+                 default_tier: str = LLM_DEFAULT_TIER,
+                 escalation_tier: Optional[str] = LLM_ESCALATION_TIER,
+                 min_response_chars: int = LLM_MIN_RESPONSE_CHARS):
+        """
+        Initialize the router.
+
+        Args:
+            models: Chat model per tier (defaults to a LazyChatModel per LLM_MODELS entry)
+            routes: Tier per prompt name; unlisted prompts use default_tier
+            default_tier: Tier of prompts missing from routes
+            escalation_tier: Tier that re-answers prompts whose response from
+                another tier fails validation or errors; None to disable
+            min_response_chars: Shorter responses fail validation
+        """
+        self.logger = logging.getLogger(__name__)
+        self.models = models if models is not None else {
+            tier: LazyChatModel(model=model, temperature=0.3) for tier, model in LLM_MODELS.items()
+        }
+        self.routes = LLM_MODEL_ROUTES if routes is None else routes
+        self.default_tier = default_tier
+        self.escalation_tier = escalation_tier if escalation_tier in self.models else None
+        self.min_response_chars = min_response_chars
+
+    @classmethod
+    def single(cls, llm: Any) -> 'ModelRouter':
+        """Send every prompt to one model, without escalation (e.g. fakes or replaying models)."""
+        return cls(models={'default': llm}, routes={}, default_tier='default', escalation_tier=None)
+
+    def tier(self, name: str) -> str:
+        """Return the tier a prompt is routed to."""
+        tier = self.routes.get(name, self.default_tier)
+        return tier if tier in self.models else self.default_tier
+
+    def cascade(self, name: str) -> List[Any]:
+        """Return the models to try for a prompt, cheapest first."""
+        tier = self.tier(name)
+        chain = [self.models[tier]]
+        if self.escalation_tier and self.escalation_tier != tier:
+            chain.append(self.models[self.escalation_tier])
+        return chain
+
+    def invoke(self, name: str, prompt: PromptTemplate, cache: Optional[LLMCache] = None,
+               validate: Optional[Callable[[str], bool]] = None, **kwargs) -> str:
+        """
+        Invoke the models routed for a prompt, escalating until a response is valid.
+
+        Args:
+            name: Prompt name looked up in the routing table
+            prompt: Prompt template to render
+            cache: Response cache, or None to always call the model
+            validate: Optional check in addition to the minimum response length
+            **kwargs: Template variables
+
+        Returns:
+            The first valid response text, or the last tier's response
+        """
+        def is_valid(response: str) -> bool:
+            return len(response.strip()) >= self.min_response_chars and (validate is None or validate(response))
+
+        chain = self.cascade(name)
+        for i, llm in enumerate(chain):
+            last = i == len(chain) - 1
+            try:
+                response = invoke_cached(llm, prompt, cache, is_valid, **kwargs)
+            except Exception as e:
+                if last:
+                    raise
+                reason = f"failed: {str(e)}"
+            else:
+                if last or is_valid(response):
+                    return response
+                reason = "failed validation"
+
+            record('llm_escalations')
+            self.logger.warning(
+                f"Prompt '{name}' on {getattr(llm, 'model', 'model')} {reason}; "
+                f"escalating to {getattr(chain[i + 1], 'model', 'next tier')}"
+            )
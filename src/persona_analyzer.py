@@ -1,61 +1,226 @@
+import hashlib
+import json
 import logging
-from typing import Dict, List, Any
-from collections import Counter
-import re
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Tuple
 
-from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from config import (
+    LLM_MAX_IN_FLIGHT, INTEREST_CHUNK_TOKEN_BUDGET,
+    INCREMENTAL_ANALYSIS, ANALYSIS_DIR
+)
+from src.aggregates import ActivityAggregate
+from src.llm_cache import LLMCache, get_llm_cache
+from src.llm_utils import PromptTemplate
+from src.metrics import propagate_context, track_section
+from src.model_router import ModelRouter
+from src.storage import JsonStore
+from src.utils import pack_by_token_budget
 
-from config import GOOGLE_API_KEY
+
+# Bump when prompts or persisted state change so stale results are recomputed
+ANALYSIS_STATE_VERSION = 1
 
 
 class PersonaAnalyzer:
-    def __init__(self):
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                 interest_token_budget: int = INTEREST_CHUNK_TOKEN_BUDGET,
+                 cache: Optional[LLMCache] = None, use_cache: bool = True,
+                 analysis_store: Optional[JsonStore] = None,
+                 llm: Optional[Any] = None, router: Optional[ModelRouter] = None):
         self.logger = logging.getLogger(__name__)
-        self.llm = ChatGoogleGenerativeAI(
-            google_api_key=GOOGLE_API_KEY,
-            model="models/gemini-1.5-pro",
-            temperature=0.3
+        self.router = router or (ModelRouter.single(llm) if llm else ModelRouter())
+        self.max_in_flight = max_in_flight
+        self.interest_token_budget = interest_token_budget
+        # use_cache=False disables caching even when LLM_CACHE_ENABLED is set
+        self.cache = (cache if cache is not None else get_llm_cache()) if use_cache else None
+        self.analysis_store = analysis_store or JsonStore(ANALYSIS_DIR)
+        self._llm_slots = threading.BoundedSemaphore(max_in_flight)
+
+    def analyze_user_content(self, user_data: Dict[str, Any],
+                             incremental: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Analyze a user's posts and comments.
+
+        Args:
+            user_data: Scraped user data
+            incremental: Reuse the persisted analysis for this user, updating the
+                running aggregates with new items and re-running only the LLM
+                sections whose input content changed (defaults to INCREMENTAL_ANALYSIS)
+
+        Returns:
+            Dictionary of analysis results
+        """
+        if incremental is None:
+            incremental = INCREMENTAL_ANALYSIS
+
+        state = self._load_state(user_data['username']) if incremental else None
+        aggregate, item_ids = self._update_aggregate(user_data, state)
+        previous_sections = state['sections'] if state else {}
+
+        llm_sections: Dict[str, Tuple[Callable[[Any], str], Any]] = {
+            'interests': (self._analyze_interests, self._interest_content(user_data)),
+            'personality': (self._analyze_personality, self._personality_content(user_data)),
+            'demographics': (self._analyze_demographics, self._demographic_content(user_data))
+        }
+
+        # The LLM-backed analyses are independent, so dispatch them together and
+        # compute the deterministic statistics while they are in flight.
+        sections = {}
+        with ThreadPoolExecutor(max_workers=len(llm_sections)) as executor:
+            futures = {}
+            for name, (analyze, content) in llm_sections.items():
+                fingerprint = self._fingerprint(content)
+                previous = previous_sections.get(name)
+                if previous and previous['fingerprint'] == fingerprint:
+                    self.logger.debug(f"Reusing {name} analysis; its input is unchanged")
+                    sections[name] = previous
+                else:
+                    futures[name] = (fingerprint, executor.submit(
+                        propagate_context(self._run_section), name, analyze, content
+                    ))
+
+            statistics = self._analyze_statistics(aggregate)
+
+            for name, (fingerprint, future) in futures.items():
+                try:
+                    sections[name] = {'fingerprint': fingerprint, 'result': future.result()}
+                except Exception as e:
+                    self.logger.error(f"Error in {name} analysis: {str(e)}")
+                    sections[name] = {'fingerprint': None, 'result': f"Error in {name} analysis"}
+
+        if incremental:
+            self.analysis_store.save(user_data['username'], {
+                'version': ANALYSIS_STATE_VERSION,
+                'item_ids': sorted(item_ids),
+                'aggregate': aggregate.to_dict(),
+                'sections': {name: section for name, section in sections.items()
+                             if section['fingerprint'] is not None}
+            })
+
+        return self._build_results(
+            statistics,
+            {name: section['result'] for name, section in sections.items()},
+            [name for name, section in sections.items() if section['fingerprint'] is None]
         )
 
-    def analyze_user_content(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_user_activity(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze a user without any LLM call, for fast persona mode.
+
+        The LLM-written analyses are replaced by a ranking of the subreddit
+        interest categories and a summary of the lexicon-based style metrics.
+
+        Args:
+            user_data: Scraped user data
+
+        Returns:
+            Dictionary of analysis results, shaped like analyze_user_content's
+        """
+        aggregate = ActivityAggregate.from_user_data(user_data)
+        statistics = self._analyze_statistics(aggregate)
+        return self._build_results(statistics, {
+            'interests': self._summarize_interests(aggregate, statistics['subreddit_interests']),
+            'personality': self._summarize_style(aggregate, statistics),
+            'demographics': "Not inferred in fast mode (no LLM analysis)"
+        }, [])
+
+    def _analyze_statistics(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
+        """Compute the deterministic analyses shared by the LLM and fast modes."""
         return {
-            'basic_stats': self._analyze_basic_stats(user_data),
-            'interests': self._analyze_interests(user_data),
-            'personality_traits': self._analyze_personality(user_data),
-            'behavioral_patterns': self._analyze_behavior(user_data),
-            'communication_style': self._analyze_communication(user_data),
-            'demographic_hints': self._analyze_demographics(user_data),
-            'citations': {}
+            'basic_stats': self._analyze_basic_stats(aggregate),
+            'behavioral_patterns': self._analyze_behavior(aggregate),
+            'communication_style': self._analyze_communication(aggregate),
+            'subreddit_interests': self._categorize_subreddits(aggregate),
+            'communication_patterns': self._analyze_communication_patterns(aggregate),
+            'activity_timezone': self._infer_timezone(aggregate)
         }
 
-    def _analyze_basic_stats(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        posts = user_data['posts']
-        comments = user_data['comments']
-        total_activity = len(posts) + len(comments)
-        post_to_comment_ratio = len(posts) / len(comments) if comments else float('inf')
-
-        subreddits = [p['subreddit'] for p in posts] + [c['subreddit'] for c in comments]
-        subreddit_counts = Counter(subreddits)
+    def _build_results(self, statistics: Dict[str, Any], texts: Dict[str, str],
+                       failed_sections: List[str]) -> Dict[str, Any]:
+        """Combine the deterministic statistics with the interest, personality and demographic texts."""
+        return {
+            'basic_stats': statistics['basic_stats'],
+            'interests': {
+                'interest_analysis': texts['interests'],
+                'subreddit_interests': statistics['subreddit_interests']
+            },
+            'personality_traits': {
+                'personality_analysis': texts['personality'],
+                'communication_patterns': statistics['communication_patterns']
+            },
+            'behavioral_patterns': statistics['behavioral_patterns'],
+            'communication_style': statistics['communication_style'],
+            'demographic_hints': {
+                'demographic_analysis': texts['demographics'],
+                'activity_timezone': statistics['activity_timezone']
+            },
+            'citations': {},
+            'failed_sections': failed_sections
+        }
 
-        activity_times = [datetime.fromtimestamp(p['created_utc']) for p in posts] + \
-                         [datetime.fromtimestamp(c['created_utc']) for c in comments]
+    def _load_state(self, username: str) -> Optional[Dict[str, Any]]:
+        """Load the persisted analysis state for a user if it is current."""
+        state = self.analysis_store.load(username)
+        if state and state.get('version') == ANALYSIS_STATE_VERSION:
+            return state
+        return None
+
+    def _update_aggregate(self, user_data: Dict[str, Any],
+                          state: Optional[Dict[str, Any]]) -> Tuple[ActivityAggregate, set]:
+        """Fold only unseen items into the persisted aggregate, rebuilding it if items disappeared."""
+        item_ids = {p['id'] for p in user_data['posts']} | {c['id'] for c in user_data['comments']}
+
+        if state:
+            known_ids = set(state['item_ids'])
+            if known_ids <= item_ids:
+                aggregate = ActivityAggregate.from_dict(state['aggregate'])
+                aggregate.add_items(
+                    [p for p in user_data['posts'] if p['id'] not in known_ids],
+                    [c for c in user_data['comments'] if c['id'] not in known_ids]
+                )
+                return aggregate, item_ids
+
+        return ActivityAggregate.from_user_data(user_data), item_ids
+
+    def _fingerprint(self, content: Any) -> str:
+        """Hash the content slice consumed by an LLM section."""
+        return hashlib.sha256(json.dumps(content).encode('utf-8')).hexdigest()
+
+    def _run_section(self, name: str, analyze: Callable[[Any], str], content: Any) -> str:
+        """Run one LLM-backed analysis, attributing its metrics to the section."""
+        with track_section(name):
+            return analyze(content)
+
+    def _invoke_llm(self, name: str, prompt: PromptTemplate, **kwargs) -> str:
+        """Invoke the prompt's routed model through the response cache, bounded by the max-in-flight limit."""
+        with self._llm_slots:
+            return self.router.invoke(f"analysis.{name}", prompt, self.cache, **kwargs)
+
+    def _analyze_basic_stats(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
+        posts = aggregate.post_count
+        comments = aggregate.comment_count
 
         return {
-            'total_posts': len(posts),
-            'total_comments': len(comments),
-            'total_activity': total_activity,
-            'post_to_comment_ratio': post_to_comment_ratio,
-            'top_subreddits': dict(subreddit_counts.most_common(10)),
-            'activity_pattern': self._analyze_activity_pattern(activity_times)
+            'total_posts': posts,
+            'total_comments': comments,
+            'total_activity': posts + comments,
+            'post_to_comment_ratio': posts / comments if comments else float('inf'),
+            'top_subreddits': dict(aggregate.subreddit_counts.most_common(10)),
+            'activity_pattern': self._analyze_activity_pattern(aggregate)
         }
 
-    def _analyze_interests(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        all_content = [f"POST: {p['title']} {p['content']}" for p in user_data['posts']] + \
-                      [f"COMMENT: {c['body']}" for c in user_data['comments']]
+    def _interest_content(self, user_data: Dict[str, Any]) -> List[str]:
+        # Oldest-first so new activity only changes the final packed chunks
+        items = sorted(
+            [(p['created_utc'], f"POST: {p['title']} {p['content']}") for p in user_data['posts']] +
+            [(c['created_utc'], f"COMMENT: {c['body']}") for c in user_data['comments']],
+            key=lambda item: item[0]
+        )
+        return [text for _, text in items]
 
-        prompt = PromptTemplate(
+    def _analyze_interests(self, all_content: List[str]) -> str:
+        map_prompt = PromptTemplate(
             input_variables=["content"],
             template="""
             Analyze the following Reddit posts and comments to identify the user's interests and hobbies.
@@ -73,30 +238,72 @@ class PersonaAnalyzer:
             """
         )
 
-        content_chunks = [all_content[i:i+8] for i in range(0, len(all_content), 8)]
-        interest_analyses = []
+        content_chunks = [
+            chunk for chunk in pack_by_token_budget(all_content, self.interest_token_budget)
+            if len(chunk) > 100
+        ]
+
+        # Map: analyze each packed chunk in parallel
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            futures = [executor.submit(propagate_context(self._invoke_llm), 'interests_chunk', map_prompt, content=chunk)
+                       for chunk in content_chunks]
+
+        partial_analyses = []
+        for future in futures:
+            try:
+                partial_analyses.append(future.result())
+            except Exception as e:
+                self.logger.error(f"Error analyzing interests: {str(e)}")
+
+        # Reduce: merge the partial results into a single profile
+        if not content_chunks:
+            return "Insufficient content for interest analysis"
+        if not partial_analyses:
+            raise RuntimeError("All interest analysis calls failed")
+        if len(partial_analyses) == 1:
+            return partial_analyses[0]
+        return self._merge_interest_analyses(partial_analyses)
+
+    def _merge_interest_analyses(self, partial_analyses: List[str]) -> str:
+        """Merge per-chunk interest analyses into one deduplicated interest profile."""
+        reduce_prompt = PromptTemplate(
+            input_variables=["analyses"],
+            template="""
+            The following are partial analyses of one Reddit user's interests, each based on a different slice of their posts and comments.
 
-        for chunk in content_chunks:
-            chunk_content = "\n".join(chunk)
-            if len(chunk_content) > 100:
-                try:
-                    if len(chunk_content) > 8000:
-                        chunk_content = chunk_content[:8000] + "..."
-                    formatted_prompt = prompt.format(content=chunk_content)
-                    analysis = self.llm.invoke(formatted_prompt)
-                    interest_analyses.append(analysis)
-                except Exception as e:
-                    self.logger.error(f"Error analyzing interests: {str(e)}")
+            Partial analyses:
+            {analyses}
 
-        return {
-            'interest_analysis': interest_analyses,
-            'subreddit_interests': self._categorize_subreddits(user_data)
-        }
+            Merge them into a single interest profile with these categories:
+            1. Main interests/hobbies
+            2. Professional interests
+            3. Entertainment preferences
+            4. Lifestyle interests
 
-    def _analyze_personality(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+            Deduplicate overlapping findings, keep the most telling specific examples, and rank interests within each category by how often they appear.
+            """
+        )
+
+        analyses = "\n\n".join(
+            f"--- Analysis {i} ---\n{analysis}" for i, analysis in enumerate(partial_analyses, 1)
+        )
+
+        try:
+            return self._invoke_llm('interests_merge', reduce_prompt, analyses=analyses)
+        except Exception as e:
+            self.logger.error(f"Error merging interest analyses: {str(e)}")
+            return analyses
+
+    def _personality_content(self, user_data: Dict[str, Any]) -> str:
         recent_content = [f"POST: {p['title']} {p['content']}" for p in user_data['posts'][:15]] + \
                          [f"COMMENT: {c['body']}" for c in user_data['comments'][:25]]
 
+        content_text = "\n".join(recent_content)
+        if len(content_text) > 8000:
+            content_text = content_text[:8000] + "..."
+        return content_text
+
+    def _analyze_personality(self, content_text: str) -> str:
         prompt = PromptTemplate(
             input_variables=["content"],
             template="""
@@ -124,28 +331,20 @@ class PersonaAnalyzer:
             """
         )
 
-        try:
-            content_text = "\n".join(recent_content)
-            if len(content_text) > 100:
-                if len(content_text) > 8000:
-                    content_text = content_text[:8000] + "..."
-                formatted_prompt = prompt.format(content=content_text)
-                personality_analysis = self.llm.invoke(formatted_prompt)
-            else:
-                personality_analysis = "Insufficient content for personality analysis"
-        except Exception as e:
-            self.logger.error(f"Error analyzing personality: {str(e)}")
-            personality_analysis = "Error in personality analysis"
+        if len(content_text) <= 100:
+            return "Insufficient content for personality analysis"
+        return self._invoke_llm('personality', prompt, content=content_text)
 
-        return {
-            'personality_analysis': personality_analysis,
-            'communication_patterns': self._analyze_communication_patterns(user_data)
-        }
-
-    def _analyze_demographics(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _demographic_content(self, user_data: Dict[str, Any]) -> str:
         demo_content = [f"POST: {p['title']} {p['content']}" for p in user_data['posts'][:8]] + \
                        [f"COMMENT: {c['body']}" for c in user_data['comments'][:15]]
 
+        content_text = "\n".join(demo_content)
+        if len(content_text) > 6000:
+            content_text = content_text[:6000] + "..."
+        return content_text
+
+    def _analyze_demographics(self, content_text: str) -> str:
         prompt = PromptTemplate(
             input_variables=["content"],
             template="""
@@ -166,116 +365,65 @@ class PersonaAnalyzer:
             """
         )
 
-        try:
-            content_text = "\n".join(demo_content)
-            if len(content_text) > 100:
-                if len(content_text) > 6000:
-                    content_text = content_text[:6000] + "..."
-                formatted_prompt = prompt.format(content=content_text)
-                demographic_analysis = self.llm.invoke(formatted_prompt)
-            else:
-                demographic_analysis = "Insufficient content for demographic analysis"
-        except Exception as e:
-            self.logger.error(f"Error analyzing demographics: {str(e)}")
-            demographic_analysis = "Error in demographic analysis"
+        if len(content_text) <= 100:
+            return "Insufficient content for demographic analysis"
+        return self._invoke_llm('demographics', prompt, content=content_text)
 
-        return {
-            'demographic_analysis': demographic_analysis,
-            'activity_timezone': self._infer_timezone(user_data)
-        }
+    # Deterministic helpers, computed from the running aggregate
 
-    # All other helper methods remain unchanged below...
-
-    
-    def _analyze_behavior(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_behavior(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze behavioral patterns."""
-        posts = user_data['posts']
-        comments = user_data['comments']
-        
+        posts = aggregate.post_count
+        comments = aggregate.comment_count
+
         # Engagement patterns
-        avg_post_score = sum(post['score'] for post in posts) / len(posts) if posts else 0
-        avg_comment_score = sum(comment['score'] for comment in comments) / len(comments) if comments else 0
-        
-        # Content patterns
-        question_posts = len([p for p in posts if '?' in p['title']])
-        long_posts = len([p for p in posts if len(p['content']) > 500])
-        
-        # Interaction patterns
-        reply_comments = len([c for c in comments if c['parent_id'].startswith('t1_')])
-        
+        avg_post_score = aggregate.post_score_sum / posts if posts else 0
+        avg_comment_score = aggregate.comment_score_sum / comments if comments else 0
+
         return {
             'engagement_metrics': {
                 'avg_post_score': avg_post_score,
                 'avg_comment_score': avg_comment_score,
-                'question_posts': question_posts,
-                'long_posts': long_posts,
-                'reply_comments': reply_comments
+                'question_posts': aggregate.question_posts,
+                'long_posts': aggregate.long_posts,
+                'reply_comments': aggregate.reply_comments
             },
-            'content_style': self._analyze_content_style(user_data),
-            'interaction_style': self._analyze_interaction_style(user_data)
+            'content_style': self._analyze_content_style(aggregate),
+            'interaction_style': self._analyze_interaction_style(aggregate)
         }
-    
-    def _analyze_communication(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+
+    def _analyze_communication(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze communication style."""
-        all_text = []
-        
-        for post in user_data['posts']:
-            all_text.append(post['title'] + " " + post['content'])
-        
-        for comment in user_data['comments']:
-            all_text.append(comment['body'])
-        
-        combined_text = " ".join(all_text)
-        
-        # Basic text analysis
-        word_count = len(combined_text.split())
-        sentence_count = len(re.findall(r'[.!?]+', combined_text))
+        word_count = aggregate.word_count
+        sentence_count = aggregate.sentence_count
         avg_words_per_sentence = word_count / sentence_count if sentence_count > 0 else 0
-        
-        # Emoji and punctuation usage
-        emoji_count = len(re.findall(r'[😀-🿿]', combined_text))
-        exclamation_count = combined_text.count('!')
-        question_count = combined_text.count('?')
-        
+
         return {
             'text_metrics': {
                 'total_words': word_count,
                 'avg_words_per_sentence': avg_words_per_sentence,
-                'emoji_usage': emoji_count,
-                'exclamation_usage': exclamation_count,
-                'question_usage': question_count
+                'emoji_usage': aggregate.emoji_count,
+                'exclamation_usage': aggregate.exclamation_count,
+                'question_usage': aggregate.question_count
             },
-            'language_style': self._analyze_language_style(combined_text)
+            'language_style': self._analyze_language_style(aggregate)
         }
-    
-    
-    def _analyze_activity_pattern(self, activity_times: List[datetime]) -> Dict[str, Any]:
+
+    def _analyze_activity_pattern(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze activity patterns."""
-        if not activity_times:
+        if not aggregate.hour_counts:
             return {}
-        
-        hours = [dt.hour for dt in activity_times]
-        days = [dt.weekday() for dt in activity_times]
-        
-        hour_counts = Counter(hours)
-        day_counts = Counter(days)
-        
+
         return {
-            'peak_hours': dict(hour_counts.most_common(5)),
-            'peak_days': dict(day_counts.most_common(7)),
-            'activity_consistency': len(set(hours)) / 24  # Spread across hours
+            'peak_hours': dict(aggregate.hour_counts.most_common(5)),
+            'peak_days': dict(aggregate.day_counts.most_common(7)),
+            'activity_consistency': len(aggregate.hour_counts) / 24  # Spread across hours
         }
-    
-    def _categorize_subreddits(self, user_data: Dict[str, Any]) -> Dict[str, List[str]]:
+
+    def _categorize_subreddits(self, aggregate: ActivityAggregate) -> Dict[str, List[str]]:
         """Categorize subreddits by interest areas."""
-        subreddits = []
-        for post in user_data['posts']:
-            subreddits.append(post['subreddit'])
-        for comment in user_data['comments']:
-            subreddits.append(comment['subreddit'])
-        
-        subreddit_counts = Counter(subreddits)
-        
+        subreddits = aggregate.subreddits()
+
         # Expanded categorization
         categories = {
             'Technology': ['programming', 'python', 'javascript', 'MachineLearning', 'technology', 'coding', 'webdev'],
@@ -287,109 +435,138 @@ class PersonaAnalyzer:
             'Finance': ['investing', 'personalfinance', 'stocks', 'cryptocurrency', 'financialindependence'],
             'Career': ['jobs', 'careeradvice', 'entrepreneur', 'cscareerquestions']
         }
-        
+
         categorized = {}
         for category, keywords in categories.items():
-            categorized[category] = [sub for sub in subreddit_counts.keys() 
+            categorized[category] = [sub for sub in subreddits
                                    if any(keyword.lower() in sub.lower() for keyword in keywords)]
-        
+
         return categorized
-    
-    def _analyze_communication_patterns(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+
+    def _summarize_interests(self, aggregate: ActivityAggregate,
+                             categories: Dict[str, List[str]]) -> str:
+        """Rank the subreddit interest categories by the user's activity in them."""
+        ranked = sorted(
+            ((sum(aggregate.subreddit_counts[sub] for sub in subs), category, subs)
+             for category, subs in categories.items() if subs),
+            key=lambda entry: entry[0],
+            reverse=True
+        )
+        if not ranked:
+            return "No interest categories matched the user's communities"
+
+        lines = [
+            f"{i}. {category}: {', '.join(f'r/{sub}' for sub in subs)} ({count} posts/comments)"
+            for i, (count, category, subs) in enumerate(ranked, 1)
+        ]
+        return "Interests by subreddit category:\n" + "\n".join(lines)
+
+    def _summarize_style(self, aggregate: ActivityAggregate, statistics: Dict[str, Any]) -> str:
+        """Describe the communication style from the formal/informal lexicon and text metrics."""
+        text_metrics = statistics['communication_style']['text_metrics']
+        language = statistics['communication_style']['language_style']
+        patterns = statistics['communication_patterns']
+
+        markers = aggregate.formal_count + aggregate.informal_count
+        if not markers:
+            tone = "neutral"
+        elif aggregate.formal_count >= 2 * aggregate.informal_count:
+            tone = "formal"
+        elif aggregate.informal_count >= 2 * aggregate.formal_count:
+            tone = "casual"
+        else:
+            tone = "mixed"
+
+        verbosity = patterns['verbosity_score']
+        if verbosity > 400:
+            length = "detailed"
+        elif verbosity > 100:
+            length = "moderate"
+        else:
+            length = "brief"
+
+        words = text_metrics['total_words']
+        expressive = text_metrics['exclamation_usage'] + text_metrics['emoji_usage']
+        expressiveness = expressive * 100 / words if words else 0
+
+        return "\n".join([
+            "Communication style (lexicon-based):",
+            f"- Tone: {tone} ({aggregate.formal_count} formal vs {aggregate.informal_count} informal markers)",
+            f"- Length: {length} (avg {patterns['avg_post_length']:.0f} chars per post, "
+            f"{patterns['avg_comment_length']:.0f} per comment, "
+            f"{text_metrics['avg_words_per_sentence']:.1f} words per sentence)",
+            f"- Expressiveness: {expressiveness:.1f} exclamations/emojis per 100 words",
+            f"- Questions asked: {text_metrics['question_usage']}",
+            f"- Vocabulary diversity: {language['vocabulary_diversity']:.2f}",
+            f"- Prefers {patterns['engagement_preference']}"
+        ])
+
+    def _analyze_communication_patterns(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze communication patterns."""
-        posts = user_data['posts']
-        comments = user_data['comments']
-        
         # Length analysis
-        post_lengths = [len(post['content']) for post in posts if post['content']]
-        comment_lengths = [len(comment['body']) for comment in comments]
-        
-        avg_post_length = sum(post_lengths) / len(post_lengths) if post_lengths else 0
-        avg_comment_length = sum(comment_lengths) / len(comment_lengths) if comment_lengths else 0
-        
+        avg_post_length = (aggregate.post_length_sum / aggregate.nonempty_posts
+                           if aggregate.nonempty_posts else 0)
+        avg_comment_length = (aggregate.comment_length_sum / aggregate.comment_count
+                              if aggregate.comment_count else 0)
+
         return {
             'avg_post_length': avg_post_length,
             'avg_comment_length': avg_comment_length,
             'verbosity_score': (avg_post_length + avg_comment_length) / 2,
-            'engagement_preference': 'posts' if len(posts) > len(comments) else 'comments'
+            'engagement_preference': 'posts' if aggregate.post_count > aggregate.comment_count else 'comments'
         }
-    
-    def _analyze_content_style(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+
+    def _analyze_content_style(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze content style."""
-        posts = user_data['posts']
-        
-        # Content type analysis
-        text_posts = len([p for p in posts if p['is_self']])
-        link_posts = len([p for p in posts if not p['is_self']])
-        
-        # Title analysis
-        question_titles = len([p for p in posts if '?' in p['title']])
-        caps_titles = len([p for p in posts if p['title'].isupper()])
-        
         return {
             'content_types': {
-                'text_posts': text_posts,
-                'link_posts': link_posts
+                'text_posts': aggregate.text_posts,
+                'link_posts': aggregate.post_count - aggregate.text_posts
             },
             'title_patterns': {
-                'question_titles': question_titles,
-                'caps_titles': caps_titles
+                'question_titles': aggregate.question_posts,
+                'caps_titles': aggregate.caps_titles
             }
         }
-    
-    def _analyze_interaction_style(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+
+    def _analyze_interaction_style(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze interaction style."""
-        comments = user_data['comments']
-        
-        # Response patterns
-        direct_replies = len([c for c in comments if c['parent_id'].startswith('t1_')])
-        post_replies = len([c for c in comments if c['parent_id'].startswith('t3_')])
-        
+        comments = aggregate.comment_count
+
         return {
             'response_patterns': {
-                'direct_replies': direct_replies,
-                'post_replies': post_replies,
-                'interaction_ratio': direct_replies / len(comments) if comments else 0
+                'direct_replies': aggregate.reply_comments,
+                'post_replies': aggregate.post_replies,
+                'interaction_ratio': aggregate.reply_comments / comments if comments else 0
             }
         }
-    
-    def _analyze_language_style(self, text: str) -> Dict[str, Any]:
+
+    def _analyze_language_style(self, aggregate: ActivityAggregate) -> Dict[str, Any]:
         """Analyze language style."""
         # Basic language metrics
-        words = text.split()
-        unique_words = len(set(words))
-        vocabulary_diversity = unique_words / len(words) if words else 0
-        
+        total_words = aggregate.word_count
+        unique_words = len(aggregate.vocabulary)
+        vocabulary_diversity = unique_words / total_words if total_words else 0
+
         # Formality indicators
-        formal_words = ['therefore', 'however', 'furthermore', 'nevertheless', 'consequently']
-        informal_words = ['lol', 'haha', 'omg', 'btw', 'tbh', 'ngl', 'fr']
-        
-        formal_count = sum(text.lower().count(word) for word in formal_words)
-        informal_count = sum(text.lower().count(word) for word in informal_words)
-        
+        formal_count = aggregate.formal_count
+        informal_count = aggregate.informal_count
+
         return {
             'vocabulary_diversity': vocabulary_diversity,
             'formality_score': formal_count / (formal_count + informal_count + 1),
-            'total_words': len(words),
+            'total_words': total_words,
             'unique_words': unique_words
         }
-    
-    def _infer_timezone(self, user_data: Dict[str, Any]) -> str:
+
+    def _infer_timezone(self, aggregate: ActivityAggregate) -> str:
         """Infer timezone from activity patterns."""
-        activity_times = []
-        
-        for post in user_data['posts']:
-            activity_times.append(datetime.fromtimestamp(post['created_utc']))
-        for comment in user_data['comments']:
-            activity_times.append(datetime.fromtimestamp(comment['created_utc']))
-        
-        if not activity_times:
+        if not aggregate.hour_counts:
             return "Unknown"
-        
+
         # Simple heuristic based on peak activity hours
-        hours = [dt.hour for dt in activity_times]
-        peak_hour = Counter(hours).most_common(1)[0][0]
-        
+        peak_hour = aggregate.hour_counts.most_common(1)[0][0]
+
         # Very basic timezone inference
         if 6 <= peak_hour <= 12:
             return "Likely US Eastern/Central"
@@ -398,4 +575,4 @@ class PersonaAnalyzer:
         elif 20 <= peak_hour <= 23:
             return "Likely European"
         else:
-            return "Unknown pattern"
\ No newline at end of file
+            return "Unknown pattern"
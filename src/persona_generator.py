@@ -1,49 +1,297 @@
+import json
 import logging
 from datetime import datetime
-from typing import List, Dict, Any
-
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-
-from config import GOOGLE_API_KEY
+from typing import List, Dict, Any, Callable, Optional
+
+from config import LLM_MAX_IN_FLIGHT, LLM_MODELS, SINGLE_CALL_GENERATION
+from src.llm_cache import LLMCache, get_llm_cache
+from src.llm_utils import LazyChatModel, PromptTemplate, invoke_cached
+from src.metrics import track_section
+from src.model_router import ModelRouter
+from src.prompt_context import PromptContextSerializer
+from src.scheduler import TaskGraph, run_dag
+
+
+# Sections requested in single-call mode, with the guidance each one's own prompt gives
+PERSONA_SECTIONS = {
+    'personal_info': "Estimated age range (be conservative), possible occupation/status, location hints, "
+                     "user archetype (e.g., Lurker, Contributor, Expert) and tier classification, "
+                     "with uncertainty levels",
+    'personality': "Scores (1-10) for Introvert/Extrovert, Intuition/Sensing, Feeling/Thinking and "
+                   "Perceiving/Judging with explanations, 3-5 key traits, communication style and "
+                   "social behavior patterns",
+    'behavior': "Daily/weekly habits, online behavior, content consumption, social interaction "
+                "and engagement preferences",
+    'motivations': "Scores (1-10) with brief explanations for convenience, wellness, speed, preferences, "
+                   "comfort, dietary needs, social connection, achievement, learning and entertainment",
+    'frustrations': "Specific frustrations with technology, time management, information overload, "
+                    "social interactions, content quality and platform limitations",
+    'goals': "Short-term goals, long-term aspirations, immediate needs, desired outcomes and "
+             "success metrics, consistent with the motivations"
+}
+
+PERSONA_SECTIONS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        name: {'type': 'string', 'description': description}
+        for name, description in PERSONA_SECTIONS.items()
+    },
+    'required': list(PERSONA_SECTIONS)
+}
+
+UNAVAILABLE_CONTENT = "Unable to generate content"
 
 
 class PersonaGenerator:
-    def __init__(self):
+    def __init__(self, max_in_flight: int = LLM_MAX_IN_FLIGHT, cache: Optional[LLMCache] = None,
+                 use_cache: bool = True, serializer: Optional[PromptContextSerializer] = None,
+                 llm: Optional[Any] = None, structured_llm: Optional[Any] = None,
+                 router: Optional[ModelRouter] = None):
         self.logger = logging.getLogger(__name__)
-        self.llm = ChatGoogleGenerativeAI(
-            google_api_key=GOOGLE_API_KEY,
-            model="models/gemini-1.5-pro",
-            temperature=0.3
+        self.router = router or (ModelRouter.single(llm) if llm else ModelRouter())
+        self.structured_llm = structured_llm or LazyChatModel(
+            model=LLM_MODELS['pro'],
+            temperature=0.3,
+            response_mime_type="application/json",
+            response_schema=PERSONA_SECTIONS_SCHEMA
         )
-
-    def generate_persona(self, analysis: Dict[str, Any], user_data: Dict[str, Any]) -> str:
-        personal_info = self._generate_personal_info(analysis, user_data)
-        personality_section = self._generate_personality_section(analysis)
-        behavior_section = self._generate_behavior_section(analysis)
-        motivations_section = self._generate_motivations_section(analysis)
-        frustrations_section = self._generate_frustrations_section(analysis)
-        goals_section = self._generate_goals_section(analysis)
+        self.max_in_flight = max_in_flight
+        # use_cache=False disables caching even when LLM_CACHE_ENABLED is set
+        self.cache = (cache if cache is not None else get_llm_cache()) if use_cache else None
+        self.serializer = serializer or PromptContextSerializer()
+
+    def generate_persona(self, analysis: Dict[str, Any], user_data: Dict[str, Any],
+                         single_call: Optional[bool] = None,
+                         completed: Optional[Dict[str, Dict[str, Any]]] = None,
+                         on_section: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
+        """
+        Generate the persona text.
+
+        Args:
+            analysis: Analysis results
+            user_data: Scraped user data
+            single_call: Request all sections in one structured-output call
+                (defaults to SINGLE_CALL_GENERATION)
+            completed: Sections finished by an earlier run; they are reused, not regenerated
+            on_section: Called with the name and content of each newly generated
+                section that is complete (e.g. to checkpoint it)
+
+        Returns:
+            Formatted persona
+        """
+        if single_call is None:
+            single_call = SINGLE_CALL_GENERATION
+
+        if single_call and not completed:
+            sections = self._generate_sections_single_call(analysis, user_data, on_section)
+        else:
+            # Once some sections exist, only the remaining ones are requested, each with its own prompt
+            sections = run_dag(
+                self._section_tasks(analysis, user_data, completed, on_section),
+                max_workers=self.max_in_flight
+            )
         citations = self._generate_citations(analysis, user_data)
 
         return self._format_persona(
             username=user_data['username'],
-            personal_info=personal_info,
-            personality=personality_section,
-            behavior=behavior_section,
-            motivations=motivations_section,
-            frustrations=frustrations_section,
-            goals=goals_section,
+            personal_info=sections['personal_info'],
+            personality=sections['personality'],
+            behavior=sections['behavior'],
+            motivations=sections['motivations'],
+            frustrations=sections['frustrations'],
+            goals=sections['goals'],
             citations=citations
         )
 
-    def _invoke_prompt(self, prompt: PromptTemplate, **kwargs) -> str:
+    def generate_fast_persona(self, analysis: Dict[str, Any], user_data: Dict[str, Any]) -> str:
+        """
+        Generate the persona text without any LLM call.
+
+        Only the deterministic sections are rendered: personal information,
+        lexicon-based style, behavior with activity patterns and engagement
+        metrics, category-based interests and citations. Motivations,
+        frustrations and goals need the LLM and are left out.
+
+        Args:
+            analysis: Analysis results (see PersonaAnalyzer.analyze_user_activity)
+            user_data: Scraped user data
+
+        Returns:
+            Formatted persona
+        """
+        sections = {
+            name: self._build_section(name, text, analysis, user_data)
+            for name, text in self._fast_section_texts(analysis).items()
+        }
+        return self._format_persona(
+            username=user_data['username'],
+            citations=self._generate_citations(analysis, user_data),
+            interests=analysis['interests']['interest_analysis'],
+            fast=True,
+            **sections
+        )
+
+    def _fast_section_texts(self, analysis: Dict[str, Any]) -> Dict[str, str]:
+        """Describe the deterministic persona sections from the analysis statistics."""
+        stats = analysis['basic_stats']
+        behavior = analysis['behavioral_patterns']
+        content_types = behavior['content_style']['content_types']
+        responses = behavior['interaction_style']['response_patterns']
+
+        return {
+            'personal_info': (
+                f"Archetype: {self._classify_archetype(analysis)}\n"
+                f"Activity timezone: {analysis['demographic_hints']['activity_timezone']}"
+            ),
+            'personality': analysis['personality_traits']['personality_analysis'],
+            'behavior': (
+                f"{stats['total_posts']} posts ({content_types['text_posts']} text, "
+                f"{content_types['link_posts']} link) and {stats['total_comments']} comments\n"
+                f"Replies to comments: {responses['direct_replies']}, replies to posts: "
+                f"{responses['post_replies']} (interaction ratio {responses['interaction_ratio']:.2f})"
+            )
+        }
+
+    def _section_tasks(self, analysis: Dict[str, Any], user_data: Dict[str, Any],
+                       completed: Optional[Dict[str, Dict[str, Any]]] = None,
+                       on_section: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> TaskGraph:
+        """Build the section dependency graph; sections without dependencies run concurrently."""
+        tasks = {
+            'personal_info': (lambda deps: self._generate_personal_info(analysis, user_data), []),
+            'personality': (lambda deps: self._generate_personality_section(analysis), []),
+            'behavior': (lambda deps: self._generate_behavior_section(analysis), []),
+            'motivations': (lambda deps: self._generate_motivations_section(analysis), []),
+            'frustrations': (lambda deps: self._generate_frustrations_section(analysis), []),
+            'goals': (
+                lambda deps: self._generate_goals_section(analysis, deps['motivations']),
+                ['motivations']
+            )
+        }
+        completed = completed or {}
+        return {
+            name: (
+                (lambda deps, section=completed[name]: section) if name in completed
+                else self._tracked(name, func, on_section),
+                deps
+            )
+            for name, (func, deps) in tasks.items()
+        }
+
+    def _tracked(self, name: str, func: Callable[[Dict[str, Any]], Any],
+                 on_section: Optional[Callable[[str, Dict[str, Any]], None]] = None
+                 ) -> Callable[[Dict[str, Any]], Any]:
+        """Wrap a section task so its metrics are attributed to the section."""
+        def run(deps: Dict[str, Any]) -> Any:
+            with track_section(name):
+                section = func(deps)
+            if on_section and self._is_complete(section):
+                on_section(name, section)
+            return section
+        return run
+
+    def _is_complete(self, section: Dict[str, Any]) -> bool:
+        """Return whether a section was generated, rather than degraded after an LLM failure."""
+        return UNAVAILABLE_CONTENT not in section.values()
+
+    def _generate_sections_single_call(self, analysis: Dict[str, Any], user_data: Dict[str, Any],
+                                       on_section: Optional[Callable[[str, Dict[str, Any]], None]] = None
+                                       ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate all sections with one structured-output call.
+
+        Sections missing or invalid in the response are regenerated with their
+        own prompts, keeping the dependency order of the section graph.
+        """
+        prompt = PromptTemplate(
+            input_variables=["username", "stats", "demographics", "interests",
+                             "personality", "communication", "patterns", "sections"],
+            template="""
+            You are a user persona analyst. Based on the following Reddit user analysis, write every section of a user persona:
+
+            Username: {username}
+            Statistics: {stats}
+            Demographics: {demographics}
+            Interests: {interests}
+            Personality: {personality}
+            Communication: {communication}
+            Behavioral Patterns: {patterns}
+
+            Sections to write:
+            {sections}
+
+            Be conservative in your estimates and specific in your descriptions. Respond with a JSON object
+            with one string field per section, each formatted as clear, structured text.
+            """
+        )
+
+        with track_section('single_call'):
+            text = self._invoke_prompt(
+                'single_call',
+                prompt,
+                llm=self.structured_llm,
+                validate=lambda response: bool(self._parse_sections(response)),
+                username=user_data['username'],
+                stats=analysis['basic_stats'],
+                demographics=analysis['demographic_hints'],
+                interests=analysis['interests'],
+                personality=analysis['personality_traits'],
+                communication=analysis['communication_style'],
+                patterns=analysis['behavioral_patterns'],
+                sections='\n'.join(f"- {name}: {guidance}" for name, guidance in PERSONA_SECTIONS.items())
+            )
+
+        sections = {
+            name: self._build_section(name, section_text, analysis, user_data)
+            for name, section_text in self._parse_sections(text).items()
+        }
+        if on_section:
+            for name, section in sections.items():
+                on_section(name, section)
+
+        tasks = self._section_tasks(analysis, user_data, on_section=on_section)
+        missing = [name for name in tasks if name not in sections]
+        if missing:
+            self.logger.warning(f"Single-call generation incomplete, regenerating sections: {missing}")
+            fallback = {
+                name: (
+                    lambda deps, generate=tasks[name][0]: generate({**sections, **deps}),
+                    [dep for dep in tasks[name][1] if dep in missing]
+                )
+                for name in missing
+            }
+            sections.update(run_dag(fallback, max_workers=self.max_in_flight))
+
+        return sections
+
+    def _parse_sections(self, text: str) -> Dict[str, str]:
+        """Parse a single-call response, keeping only sections with non-empty text."""
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+
+        return {
+            name: data[name].strip() for name in PERSONA_SECTIONS
+            if isinstance(data.get(name), str) and data[name].strip()
+        }
+
+    def _invoke_prompt(self, name: str, prompt: PromptTemplate, llm: Optional[Any] = None,
+                       validate: Optional[Callable[[str], bool]] = None, **kwargs) -> str:
+        """Invoke a persona prompt on its routed model, or on llm when one is given."""
+        context, report = self.serializer.build(**kwargs)
+        self.logger.debug(
+            f"Prompt context: {report['total_tokens']} tokens {report['blocks']}"
+            f" (deduplicated: {report['deduplicated']}, truncated: {report['truncated']})"
+        )
         try:
-            content = prompt.format(**kwargs)
-            return self.llm.invoke(content)
+            if llm is not None:
+                return invoke_cached(llm, prompt, self.cache, validate, **context)
+            return self.router.invoke(f"persona.{name}", prompt, self.cache, validate, **context)
         except Exception as e:
             self.logger.error(f"LLM invocation failed: {str(e)}")
-            return "Unable to generate content"
+            return UNAVAILABLE_CONTENT
 
     def _generate_personal_info(self, analysis: Dict[str, Any], user_data: Dict[str, Any]) -> Dict[str, Any]:
         prompt = PromptTemplate(
@@ -68,18 +316,15 @@ class PersonaGenerator:
         )
 
         personal_info = self._invoke_prompt(
+            'personal_info',
             prompt,
             username=user_data['username'],
-            stats=str(analysis['basic_stats']),
-            demographics=str(analysis['demographic_hints']),
-            interests=str(analysis['interests'])
+            stats=analysis['basic_stats'],
+            demographics=analysis['demographic_hints'],
+            interests=analysis['interests']
         )
 
-        return {
-            'generated_info': personal_info,
-            'activity_level': self._classify_activity_level(analysis['basic_stats']),
-            'primary_communities': list(analysis['basic_stats']['top_subreddits'].keys())[:3]
-        }
+        return self._build_section('personal_info', personal_info, analysis, user_data)
 
     def _generate_personality_section(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         prompt = PromptTemplate(
@@ -106,16 +351,13 @@ class PersonaGenerator:
         )
 
         traits = self._invoke_prompt(
+            'personality',
             prompt,
             analysis=analysis['personality_traits']['personality_analysis'],
-            communication=str(analysis['communication_style'])
+            communication=analysis['communication_style']
         )
 
-        return {
-            'traits': traits,
-            'communication_style': analysis['communication_style'],
-            'social_patterns': analysis['behavioral_patterns']
-        }
+        return self._build_section('personality', traits, analysis)
 
     def _generate_behavior_section(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         prompt = PromptTemplate(
@@ -138,16 +380,13 @@ class PersonaGenerator:
         )
 
         behavior = self._invoke_prompt(
+            'behavior',
             prompt,
-            patterns=str(analysis['behavioral_patterns']),
-            stats=str(analysis['basic_stats'])
+            patterns=analysis['behavioral_patterns'],
+            stats=analysis['basic_stats']
         )
 
-        return {
-            'description': behavior,
-            'activity_patterns': analysis['basic_stats']['activity_pattern'],
-            'engagement_metrics': analysis['behavioral_patterns']['engagement_metrics']
-        }
+        return self._build_section('behavior', behavior, analysis)
 
     def _generate_motivations_section(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         prompt = PromptTemplate(
@@ -175,15 +414,13 @@ class PersonaGenerator:
         )
 
         motivations = self._invoke_prompt(
+            'motivations',
             prompt,
-            interests=str(analysis['interests']),
-            personality=str(analysis['personality_traits'])
+            interests=analysis['interests'],
+            personality=analysis['personality_traits']
         )
 
-        return {
-            'analysis': motivations,
-            'primary_drivers': self._extract_primary_motivations(analysis)
-        }
+        return self._build_section('motivations', motivations, analysis)
 
     def _generate_frustrations_section(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         prompt = PromptTemplate(
@@ -207,17 +444,16 @@ class PersonaGenerator:
         )
 
         frustrations = self._invoke_prompt(
+            'frustrations',
             prompt,
-            behavior=str(analysis['behavioral_patterns']),
-            communication=str(analysis['communication_style'])
+            behavior=analysis['behavioral_patterns'],
+            communication=analysis['communication_style']
         )
 
-        return {
-            'analysis': frustrations,
-            'behavioral_indicators': self._extract_frustration_indicators(analysis)
-        }
+        return self._build_section('frustrations', frustrations, analysis)
 
-    def _generate_goals_section(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_goals_section(self, analysis: Dict[str, Any],
+                                motivations: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         prompt = PromptTemplate(
             input_variables=["interests", "motivations"],
             template="""
@@ -238,15 +474,51 @@ class PersonaGenerator:
         )
 
         goals = self._invoke_prompt(
+            'goals',
             prompt,
-            interests=str(analysis['interests']),
-            motivations=str(analysis.get('motivations', {}))
+            interests=analysis['interests'],
+            motivations=motivations['analysis'] if motivations else analysis.get('motivations', {})
         )
 
-        return {
-            'analysis': goals,
-            'priority_areas': self._identify_priority_areas(analysis)
-        }
+        return self._build_section('goals', goals, analysis)
+
+    def _build_section(self, name: str, text: str, analysis: Dict[str, Any],
+                       user_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Combine a section's generated text with its deterministic fields."""
+        if name == 'personal_info':
+            return {
+                'generated_info': text,
+                'activity_level': self._classify_activity_level(analysis['basic_stats']),
+                'primary_communities': list(analysis['basic_stats']['top_subreddits'].keys())[:3]
+            }
+        if name == 'personality':
+            return {
+                'traits': text,
+                'communication_style': analysis['communication_style'],
+                'social_patterns': analysis['behavioral_patterns']
+            }
+        if name == 'behavior':
+            return {
+                'description': text,
+                'activity_patterns': analysis['basic_stats']['activity_pattern'],
+                'engagement_metrics': analysis['behavioral_patterns']['engagement_metrics']
+            }
+        if name == 'motivations':
+            return {
+                'analysis': text,
+                'primary_drivers': self._extract_primary_motivations(analysis)
+            }
+        if name == 'frustrations':
+            return {
+                'analysis': text,
+                'behavioral_indicators': self._extract_frustration_indicators(analysis)
+            }
+        if name == 'goals':
+            return {
+                'analysis': text,
+                'priority_areas': self._identify_priority_areas(analysis)
+            }
+        raise ValueError(f"Unknown persona section: {name}")
 
     
 
@@ -336,6 +608,20 @@ class PersonaGenerator:
         else:
             return "Minimal"
     
+    def _classify_archetype(self, analysis: Dict[str, Any]) -> str:
+        """Classify the user archetype from activity volume and interaction style."""
+        stats = analysis['basic_stats']
+        responses = analysis['behavioral_patterns']['interaction_style']['response_patterns']
+
+        if stats['total_activity'] <= 20:
+            return "Lurker"
+        elif stats['total_posts'] > stats['total_comments']:
+            return "Creator"
+        elif responses['interaction_ratio'] >= 0.5:
+            return "Conversationalist"
+        else:
+            return "Contributor"
+    
     def _extract_primary_motivations(self, analysis: Dict[str, Any]) -> List[str]:
         """Extract primary motivations from analysis."""
         interests = analysis['interests']
@@ -376,11 +662,38 @@ class PersonaGenerator:
     
     def _format_persona(self, username: str, personal_info: Dict[str, Any], 
                        personality: Dict[str, Any], behavior: Dict[str, Any],
-                       motivations: Dict[str, Any], frustrations: Dict[str, Any],
-                       goals: Dict[str, Any], citations: Dict[str, Any]) -> str:
-        """Format the complete persona."""
+                       citations: Dict[str, Any], motivations: Optional[Dict[str, Any]] = None,
+                       frustrations: Optional[Dict[str, Any]] = None, goals: Optional[Dict[str, Any]] = None,
+                       interests: Optional[str] = None, fast: bool = False) -> str:
+        """
+        Format the complete persona.
+
+        In fast mode the LLM-only sections (motivations, frustrations, goals) are
+        replaced by the category-based interests and a single note.
+        """
         
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        if fast:
+            inferred_sections = f"""## INTERESTS
+{interests}
+
+Not inferred in fast mode: age, occupation, location, motivations, frustrations and goals."""
+        else:
+            inferred_sections = f"""## MOTIVATIONS
+{motivations['analysis']}
+
+Primary Drivers: {', '.join(motivations['primary_drivers'])}
+
+## FRUSTRATIONS
+{frustrations['analysis']}
+
+Behavioral Indicators: {', '.join(frustrations['behavioral_indicators'])}
+
+## GOALS & NEEDS
+{goals['analysis']}
+
+Priority Areas: {', '.join(goals['priority_areas'])}"""
         
         persona = f"""
 # USER PERSONA: {username}
@@ -405,20 +718,7 @@ Primary Communities: {', '.join(personal_info['primary_communities'])}
 ### Engagement Metrics
 {self._format_engagement_metrics(behavior['engagement_metrics'])}
 
-## MOTIVATIONS
-{motivations['analysis']}
-
-Primary Drivers: {', '.join(motivations['primary_drivers'])}
-
-## FRUSTRATIONS
-{frustrations['analysis']}
-
-Behavioral Indicators: {', '.join(frustrations['behavioral_indicators'])}
-
-## GOALS & NEEDS
-{goals['analysis']}
-
-Priority Areas: {', '.join(goals['priority_areas'])}
+{inferred_sections}
 
 ## CITATIONS & EVIDENCE
 
@@ -432,7 +732,7 @@ Priority Areas: {', '.join(goals['priority_areas'])}
 {self._format_citations(citations.get('personality', []))}
 
 ---
-Generated by Reddit User Persona Generator (Powered by Google Gemini)
+Generated by Reddit User Persona Generator ({'Fast mode, no LLM' if fast else 'Powered by Google Gemini'})
 """
         
         return persona
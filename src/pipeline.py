@@ -0,0 +1,300 @@
+"""
+Pipeline Module
+Runs scrape -> analyze -> generate with one shared set of clients, for a
+single user or for a batch of users across a bounded worker pool, and
+records per-run metrics for each user. Stage outputs are checkpointed so an
+interrupted run resumes from the last completed stage or persona section.
+In fast mode personas are built without LLM calls, except for promoted users.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional
+
+from config import (
+    BATCH_WORKERS, REDDIT_CONCURRENCY, LLM_CONCURRENCY, PROMETHEUS_METRICS_FILE, RESUME_FROM_CHECKPOINT,
+    FAST_PERSONA_MODE
+)
+from src.checkpoint import CheckpointStore, content_hash
+from src.metrics import REGISTRY, track_run, track_stage
+from src.reddit_scraper import RedditScraper
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator, PERSONA_SECTIONS
+from src.single_flight import SingleFlight
+
+
+# Part of the single-flight key; bump when a change alters the personas produced for the same data
+PIPELINE_VERSION = 1
+
+
+class NoUserDataError(Exception):
+    """Raised when a user has no public posts or comments."""
+
+
+class PersonaPipeline:
+    """Generates personas while reusing a single scraper, analyzer and generator."""
+
+    def __init__(self, output_dir: str = 'output',
+                 reddit_concurrency: int = REDDIT_CONCURRENCY,
+                 llm_concurrency: int = LLM_CONCURRENCY,
+                 scraper: Optional[Any] = None,
+                 analyzer: Optional[PersonaAnalyzer] = None,
+                 generator: Optional[PersonaGenerator] = None,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 resume: bool = RESUME_FROM_CHECKPOINT,
+                 single_flight: Optional[SingleFlight] = None,
+                 fast: bool = FAST_PERSONA_MODE,
+                 promoted: Optional[Iterable[str]] = None):
+        """
+        Initialize the shared clients and per-backend concurrency limits.
+
+        Args:
+            output_dir: Directory where persona files are written
+            reddit_concurrency: Maximum users being scraped at once
+            llm_concurrency: Maximum users in the analyze/generate stages at once
+            scraper: Data source with a scrape_user_data(username) method
+                (defaults to a live RedditScraper)
+            analyzer: Analyzer to use (defaults to a new PersonaAnalyzer)
+            generator: Generator to use (defaults to a new PersonaGenerator)
+            checkpoints: Store for stage and section checkpoints (defaults to CHECKPOINT_DIR)
+            resume: Reuse checkpoints of an earlier, interrupted run instead of discarding them
+            single_flight: Coordinator sharing in-flight work between identical requests
+                (defaults to one using SINGLE_FLIGHT_DIR)
+            fast: Build personas from the deterministic analyzers only, without LLM calls
+            promoted: Users that still get the full LLM pipeline in fast mode
+        """
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = output_dir
+        self.scraper = scraper or RedditScraper()
+        self.analyzer = analyzer or PersonaAnalyzer()
+        self.generator = generator or PersonaGenerator()
+        self.checkpoints = checkpoints or CheckpointStore()
+        self.resume = resume
+        self.single_flight = single_flight or SingleFlight()
+        self.fast = fast
+        self.promoted = {username.lower() for username in promoted or ()}
+        self._reddit_slots = threading.Semaphore(reddit_concurrency)
+        self._llm_slots = threading.Semaphore(llm_concurrency)
+
+    def process_user(self, username: str) -> Dict[str, Any]:
+        """
+        Generate and save the persona for one user.
+
+        Concurrent requests for the same user share one scrape, and one analysis
+        and generation per scraped data fingerprint, in this process and in
+        other processes using the same single-flight directory.
+
+        Args:
+            username: Reddit username
+
+        Returns:
+            Dictionary with the output and metrics report paths and per-stage
+            timings in seconds
+        """
+        if not self.resume:
+            self.checkpoints.clear(username)
+
+        with track_run(username) as metrics:
+            user_data = self.single_flight.do(
+                SingleFlight.make_key('scrape', username, PIPELINE_VERSION),
+                lambda: self._scrape(username)
+            )
+            if self.fast and username.lower() not in self.promoted:
+                generated = self._generate_fast(username, user_data)
+            else:
+                data_hash = content_hash(user_data)
+                generated = self.single_flight.do(
+                    SingleFlight.make_key('persona', username, data_hash, PIPELINE_VERSION),
+                    lambda: self._analyze_and_generate(username, user_data, data_hash)
+                )
+
+        output_file = os.path.join(self.output_dir, f"{username}_persona.txt")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(generated['persona'])
+
+        report = metrics.to_dict()
+        metrics_file = os.path.join(self.output_dir, f"{username}_metrics.json")
+        with open(metrics_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.logger.debug(f"Run totals for {username}: {report['totals']}")
+
+        if generated['complete']:
+            self.checkpoints.clear(username)
+        else:
+            self.logger.warning(
+                f"Persona for {username} has degraded sections; keeping checkpoints "
+                f"so the next run only redoes those"
+            )
+
+        return {
+            'output_file': output_file,
+            'metrics_file': metrics_file,
+            'timings': {stage: metrics.seconds(stage) for stage in ('scrape', 'analyze', 'generate')}
+        }
+
+    def _scrape(self, username: str) -> Dict[str, Any]:
+        """Scrape a user, or resume from the scrape checkpoint."""
+        scrape_hash = content_hash({'username': username})
+        user_data = self.checkpoints.load(username, 'scrape', scrape_hash)
+        if user_data is not None:
+            self.logger.info(f"Step 1: Resuming {username} from the scrape checkpoint")
+            return user_data
+
+        self.logger.info(f"Step 1: Scraping Reddit data for {username}...")
+        with track_stage('scrape'), self._reddit_slots:
+            user_data = self.scraper.scrape_user_data(username)
+
+        if not user_data['posts'] and not user_data['comments']:
+            raise NoUserDataError(
+                "No data found for user. User might be private or non-existent."
+            )
+        # Partial scrapes (a listing ended with an error) are fetched again on resume
+        if user_data['metadata'].get('complete', True):
+            self.checkpoints.save(username, 'scrape', scrape_hash, user_data)
+        return user_data
+
+    def _generate_fast(self, username: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze a user and build the persona without LLM calls."""
+        self.logger.info(f"Step 2: Building fast persona for {username}...")
+        with track_stage('analyze'):
+            analysis_results = self.analyzer.analyze_user_activity(user_data)
+        with track_stage('generate'):
+            persona = self.generator.generate_fast_persona(analysis_results, user_data)
+        return {'persona': persona, 'complete': True}
+
+    def _analyze_and_generate(self, username: str, user_data: Dict[str, Any],
+                              analysis_hash: str) -> Dict[str, Any]:
+        """
+        Analyze a user and generate the persona, resuming from checkpoints.
+
+        Returns:
+            Dictionary with the persona text and whether every analysis and
+            persona section completed without LLM failures
+        """
+        with self._llm_slots:
+            analysis_results = self.checkpoints.load(username, 'analyze', analysis_hash)
+            if analysis_results is not None:
+                self.logger.info(f"Step 2: Resuming {username} from the analysis checkpoint")
+            else:
+                self.logger.info(f"Step 2: Analyzing content for {username}...")
+                with track_stage('analyze'):
+                    analysis_results = self.analyzer.analyze_user_content(user_data)
+                # Analyses degraded by LLM errors are redone on the next run
+                if not analysis_results.get('failed_sections'):
+                    self.checkpoints.save(username, 'analyze', analysis_hash, analysis_results)
+
+            sections_hash = content_hash([analysis_hash, analysis_results])
+            completed = self.checkpoints.load(username, 'generate', sections_hash) or {}
+            generated = dict(completed)
+
+            def on_section(name: str, section: Dict[str, Any]) -> None:
+                generated[name] = section
+                self.checkpoints.save_section(username, sections_hash, name, section)
+
+            if completed:
+                self.logger.info(
+                    f"Step 3: Generating persona for {username}, "
+                    f"resuming {len(completed)} sections from the checkpoint..."
+                )
+            else:
+                self.logger.info(f"Step 3: Generating persona for {username}...")
+            with track_stage('generate'):
+                persona = self.generator.generate_persona(
+                    analysis_results, user_data, completed=completed, on_section=on_section
+                )
+
+        return {
+            'persona': persona,
+            'complete': len(generated) == len(PERSONA_SECTIONS) and not analysis_results.get('failed_sections')
+        }
+
+    def export_metrics(self, path: Optional[str] = None) -> str:
+        """
+        Write the cumulative counters of this process in Prometheus text format.
+
+        Args:
+            path: Output file (defaults to PROMETHEUS_METRICS_FILE in the output directory)
+
+        Returns:
+            Path of the written file
+        """
+        path = path or os.path.join(self.output_dir, PROMETHEUS_METRICS_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(REGISTRY.to_prometheus())
+        return path
+
+    def run_batch(self, usernames: Iterable[str], workers: int = BATCH_WORKERS) -> Dict[str, Any]:
+        """
+        Generate personas for many users and write a batch summary.
+
+        Args:
+            usernames: Usernames to process
+            workers: Number of users processed concurrently
+
+        Returns:
+            Summary with per-user results, success/failure counts and stage timings
+        """
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._process_batch_user, username): username
+                for username in usernames
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                self.logger.info(
+                    f"[{len(results)}/{len(futures)}] {result['username']}: {result['status']}"
+                )
+
+        succeeded = [r for r in results if r['status'] == 'success']
+        summary = {
+            'started_at': started_at,
+            'total_seconds': time.perf_counter() - start,
+            'total_users': len(results),
+            'succeeded': len(succeeded),
+            'failed': len(results) - len(succeeded),
+            'stage_seconds': self._summarize_timings(succeeded),
+            'results': sorted(results, key=lambda r: r['username'])
+        }
+
+        summary_file = os.path.join(self.output_dir, 'batch_summary.json')
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        self.export_metrics()
+        self.logger.info(
+            f"Batch finished: {summary['succeeded']} succeeded, "
+            f"{summary['failed']} failed. Summary: {summary_file}"
+        )
+
+        return summary
+
+    def _process_batch_user(self, username: str) -> Dict[str, Any]:
+        """Process one batch user, capturing failures instead of raising."""
+        try:
+            result = self.process_user(username)
+            return {'username': username, 'status': 'success', **result}
+        except Exception as e:
+            self.logger.error(f"Error generating persona for {username}: {str(e)}")
+            return {'username': username, 'status': 'failed', 'error': str(e)}
+
+    def _summarize_timings(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate per-stage timings across successful users."""
+        summary = {}
+        for stage in ('scrape', 'analyze', 'generate'):
+            values = [r['timings'][stage] for r in results if stage in r['timings']]
+            if values:
+                summary[stage] = {
+                    'total': sum(values),
+                    'mean': sum(values) / len(values),
+                    'max': max(values)
+                }
+        return summary
@@ -0,0 +1,146 @@
+"""
+Prompt Context Module
+Serializes analysis data into compact, stable, token-budgeted prompt blocks.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+
+from config import PROMPT_CONTEXT_TOKEN_BUDGET
+from src.llm_utils import message_text
+from src.utils import estimate_tokens
+
+
+# Text passages at least this long are emitted once per prompt
+DEDUPLICATE_MIN_CHARS = 200
+
+
+class PromptContextSerializer:
+    """Turns analysis values into compact text blocks that fit a per-prompt token budget."""
+
+    def __init__(self, token_budget: int = PROMPT_CONTEXT_TOKEN_BUDGET):
+        """
+        Initialize the serializer.
+
+        Args:
+            token_budget: Maximum estimated tokens for all blocks of one prompt
+        """
+        self.token_budget = token_budget
+
+    def build(self, **values: Any) -> Tuple[Dict[str, str], Dict[str, Any]]:
+        """
+        Serialize the values for one prompt.
+
+        Long text passages already emitted in an earlier block are replaced by a
+        reference, then the largest blocks are trimmed until the total fits the
+        token budget.
+
+        Args:
+            **values: Prompt variables (analysis dicts, text, numbers)
+
+        Returns:
+            Tuple of (serialized prompt variables, report with per-block token counts)
+        """
+        blocks: Dict[str, str] = {}
+        deduplicated: List[str] = []
+        seen: Dict[str, str] = {}
+
+        for name, value in values.items():
+            blocks[name] = self.serialize(value, seen=seen, label=name)
+            if '(same as ' in blocks[name]:
+                deduplicated.append(name)
+
+        truncated = self._fit_budget(blocks)
+        block_tokens = {name: estimate_tokens(text) for name, text in blocks.items()}
+
+        return blocks, {
+            'blocks': block_tokens,
+            'total_tokens': sum(block_tokens.values()),
+            'deduplicated': deduplicated,
+            'truncated': truncated
+        }
+
+    def serialize(self, value: Any, indent: int = 0, seen: Optional[Dict[str, str]] = None,
+                  label: str = '') -> str:
+        """
+        Serialize a value into a compact, stable, human-readable text form.
+
+        Args:
+            value: Value to serialize
+            indent: Nesting level for dict/list items
+            seen: Long passages already emitted, mapped to where they appeared;
+                repeats are replaced with a reference
+            label: Name of the block being serialized, recorded in seen
+        """
+        if isinstance(value, dict):
+            return self._serialize_dict(value, indent, seen, label)
+        if isinstance(value, (list, tuple, set)):
+            return self._serialize_list(list(value), indent, seen, label)
+        if isinstance(value, float):
+            return self._format_float(value)
+
+        text = message_text(value).strip()
+        if seen is not None and len(text) > DEDUPLICATE_MIN_CHARS:
+            if text in seen:
+                return f"(same as {seen[text]} above)"
+            seen[text] = label
+        return text
+
+    def _serialize_dict(self, value: Dict[str, Any], indent: int,
+                        seen: Optional[Dict[str, str]], label: str) -> str:
+        """Serialize a dict as 'key: value' lines, nesting by indentation and skipping empty values."""
+        pad = '  ' * indent
+        lines = []
+        for key, item in value.items():
+            if item is None or (isinstance(item, (dict, list, tuple, set, str)) and not item):
+                continue
+            if isinstance(item, dict) or (isinstance(item, (list, tuple)) and
+                                          any(isinstance(i, dict) for i in item)):
+                nested = self.serialize(item, indent + 1, seen, f"{label}.{key}")
+                if nested:
+                    lines.append(f"{pad}{key}:\n{nested}")
+            else:
+                text = self.serialize(item, seen=seen, label=f"{label}.{key}")
+                if '\n' in text:
+                    text = '\n' + '\n'.join(f"{pad}  {line}" for line in text.splitlines())
+                lines.append(f"{pad}{key}: {text}")
+        return '\n'.join(lines)
+
+    def _serialize_list(self, value: List[Any], indent: int,
+                        seen: Optional[Dict[str, str]], label: str) -> str:
+        """Serialize scalar lists inline and lists of dicts as bullet items."""
+        if not any(isinstance(item, dict) for item in value):
+            return ', '.join(self.serialize(item, seen=seen, label=label) for item in value)
+
+        pad = '  ' * indent
+        items = []
+        for item in value:
+            text = self.serialize(item, indent + 1, seen, label).strip()
+            if text:
+                items.append(f"{pad}- {text}")
+        return '\n'.join(items)
+
+    def _format_float(self, value: float) -> str:
+        """Format floats with at most two decimals."""
+        if value != value or value in (float('inf'), float('-inf')):
+            return str(value)
+        return f"{value:.2f}".rstrip('0').rstrip('.')
+
+    def _fit_budget(self, blocks: Dict[str, str]) -> List[str]:
+        """Trim the largest blocks so the total fits the budget; returns the trimmed block names."""
+        sizes = {name: estimate_tokens(text) for name, text in blocks.items()}
+        if sum(sizes.values()) <= self.token_budget:
+            return []
+
+        # Water-filling: small blocks keep their size, large ones share what is left
+        truncated = []
+        remaining = self.token_budget
+        names = sorted(blocks, key=lambda name: sizes[name])
+        for position, name in enumerate(names):
+            share = remaining // (len(names) - position)
+            if sizes[name] > share:
+                blocks[name] = blocks[name][:max(share * 4 - 3, 0)] + "..."
+                truncated.append(name)
+                remaining -= share
+            else:
+                remaining -= sizes[name]
+        return truncated
@@ -0,0 +1,120 @@
+"""
+Rate Limiter Module
+Token-bucket rate limiting shared by every client that uses the same credential.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Any, Mapping, Optional
+
+
+class RateLimiter:
+    """Token bucket that throttles HTTP requests and honours API quota headers."""
+
+    def __init__(self, rate: float, capacity: float, name: str = 'default'):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+            name: Identifier used in logs and metrics
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.total_wait = 0.0
+        self.quota_remaining: Optional[float] = None
+        self.quota_reset_at: Optional[float] = None
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until it is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate, self._blocked_until - now)
+            self.requests += 1
+            self.total_wait += wait
+
+        if wait > 0:
+            self.logger.debug(f"Rate limiter '{self.name}' waiting {wait:.2f}s")
+            time.sleep(wait)
+
+        return wait
+
+    def available(self) -> float:
+        """Return the tokens that can be taken right now without waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return 0.0 if now < self._blocked_until else max(self._tokens, 0.0)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Synchronise the bucket with X-Ratelimit-Remaining/Reset response headers."""
+        remaining = headers.get('x-ratelimit-remaining')
+        reset = headers.get('x-ratelimit-reset')
+        if remaining is None or reset is None:
+            return
+
+        try:
+            remaining = float(remaining)
+            reset = float(reset)
+        except ValueError:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.quota_remaining = remaining
+            self.quota_reset_at = time.time() + reset
+            # Never hold more tokens than the server says we have left
+            self._tokens = min(self._tokens, remaining)
+            if remaining < 1:
+                self._blocked_until = max(self._blocked_until, now + reset)
+                self.logger.warning(
+                    f"Quota exhausted for '{self.name}', pausing {reset:.1f}s until reset"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return rate limiter metrics."""
+        with self._lock:
+            return {
+                'name': self.name,
+                'requests': self.requests,
+                'total_wait_seconds': round(self.total_wait, 3),
+                'quota_remaining': self.quota_remaining,
+                'quota_reset_at': self.quota_reset_at
+            }
+
+    def _refill(self, now: float) -> None:
+        """Add tokens earned since the last update. Caller must hold the lock."""
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, rate: float, capacity: float) -> RateLimiter:
+    """Return the shared rate limiter for a credential, creating it on first use."""
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(rate, capacity, name=key)
+        return _limiters[key]
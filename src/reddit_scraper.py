@@ -3,36 +3,67 @@ Reddit Scraper Module
 Handles scraping of Reddit user data including posts and comments.
 """
 
-import praw
-import time
 import logging
-from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
 from datetime import datetime
 
 from config import (
-    REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET, REDDIT_USER_AGENT,
-    MAX_POSTS, MAX_COMMENTS, REQUEST_DELAY
+    MAX_POSTS, MAX_COMMENTS,
+    CONCURRENT_SCRAPING, INCREMENTAL_SCRAPING, SNAPSHOT_DIR, USE_OVERVIEW_LISTING,
+    OVERVIEW_PAGE_SIZE
 )
+from src.credential_pool import CredentialPool
+from src.metrics import propagate_context
+from src.storage import JsonStore
+
+# Fullname prefixes of listing items, used to resume a listing after an item
+LISTING_KINDS = {'submissions': 't3', 'comments': 't1'}
 
 
 class RedditScraper:
     """Scrapes Reddit user data including posts and comments."""
     
-    def __init__(self):
-        """Initialize Reddit API client."""
+    def __init__(self, snapshot_store: Optional[JsonStore] = None, reddit: Optional[Any] = None,
+                 max_posts: int = MAX_POSTS, max_comments: int = MAX_COMMENTS,
+                 requestor_class: Optional[type] = None, requestor_kwargs: Optional[Dict[str, Any]] = None,
+                 pool: Optional[CredentialPool] = None):
+        """
+        Initialize the Reddit client pool and the per-user snapshot store.
+
+        Args:
+            snapshot_store: Store for per-user snapshots (defaults to SNAPSHOT_DIR)
+            reddit: Reddit client to use instead of the configured credential pool
+            max_posts: Maximum posts fetched per user
+            max_comments: Maximum comments fetched per user
+            requestor_class: RateLimitedRequestor subclass used by the pool's praw.Reddit clients
+            requestor_kwargs: Extra keyword arguments for the requestors
+            pool: Credential pool to use (defaults to one client per configured credential)
+        """
         self.logger = logging.getLogger(__name__)
-        self.reddit = praw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_CLIENT_SECRET,
-            user_agent=REDDIT_USER_AGENT
-        )
+        self.snapshot_store = snapshot_store or JsonStore(SNAPSHOT_DIR)
+        self.max_posts = max_posts
+        self.max_comments = max_comments
+        if pool is None:
+            pool = (CredentialPool.from_clients([reddit]) if reddit is not None
+                    else CredentialPool.from_config(requestor_class=requestor_class,
+                                                    requestor_kwargs=requestor_kwargs))
+        self.pool = pool
     
-    def scrape_user_data(self, username: str) -> Dict[str, Any]:
+    def scrape_user_data(self, username: str, concurrent: Optional[bool] = None,
+                         incremental: Optional[bool] = None,
+                         overview: Optional[bool] = None) -> Dict[str, Any]:
         """
         Scrape all posts and comments for a given Reddit user.
         
         Args:
             username: Reddit username
+            concurrent: Fetch posts and comments in parallel
+                (defaults to CONCURRENT_SCRAPING)
+            incremental: Only fetch items newer than the stored snapshot and
+                merge them into it (defaults to INCREMENTAL_SCRAPING)
+            overview: Fetch posts and comments together from the raw overview
+                listing instead of two PRAW listings (defaults to USE_OVERVIEW_LISTING)
             
         Returns:
             Dictionary containing user data with posts and comments
@@ -48,39 +79,241 @@ class RedditScraper:
             }
         }
         
+        if concurrent is None:
+            concurrent = CONCURRENT_SCRAPING
+        if incremental is None:
+            incremental = INCREMENTAL_SCRAPING
+        if overview is None:
+            overview = USE_OVERVIEW_LISTING
+        
+        snapshot = self.snapshot_store.load(username) if incremental else None
+        known_post_ids = {p['id'] for p in snapshot['posts']} if snapshot else set()
+        known_comment_ids = {c['id'] for c in snapshot['comments']} if snapshot else set()
+        
         try:
-            user = self.reddit.redditor(username)
+            if snapshot:
+                self.logger.info(
+                    f"Refreshing snapshot for user: {username} "
+                    f"({len(known_post_ids)} posts, {len(known_comment_ids)} comments known)"
+                )
+            
+            if overview:
+                self.logger.info(f"Scraping overview listing for user: {username}")
+                posts, comments, complete = self._scrape_overview(username, known_post_ids, known_comment_ids)
+            elif concurrent:
+                # Each listing borrows its own client from the pool, so with several
+                # credentials both are fetched at full speed
+                self.logger.info(f"Scraping posts and comments concurrently for user: {username}")
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    posts_future = executor.submit(
+                        propagate_context(self._scrape_posts), username, known_post_ids
+                    )
+                    comments_future = executor.submit(
+                        propagate_context(self._scrape_comments), username, known_comment_ids
+                    )
+                    posts, posts_complete = posts_future.result()
+                    comments, comments_complete = comments_future.result()
+                complete = posts_complete and comments_complete
+            else:
+                # Scrape posts
+                self.logger.info(f"Scraping posts for user: {username}")
+                posts, posts_complete = self._scrape_posts(username, known_post_ids)
+                
+                # Scrape comments
+                self.logger.info(f"Scraping comments for user: {username}")
+                comments, comments_complete = self._scrape_comments(username, known_comment_ids)
+                complete = posts_complete and comments_complete
+            
+            if snapshot:
+                user_data['metadata']['new_posts'] = len(posts)
+                user_data['metadata']['new_comments'] = len(comments)
+                posts = self._merge_items(posts, snapshot['posts'], self.max_posts, 'posts', username)
+                comments = self._merge_items(
+                    comments, snapshot['comments'], self.max_comments, 'comments', username
+                )
             
-            # Scrape posts
-            self.logger.info(f"Scraping posts for user: {username}")
-            posts = self._scrape_posts(user)
             user_data['posts'] = posts
             user_data['metadata']['total_posts'] = len(posts)
-            
-            # Scrape comments
-            self.logger.info(f"Scraping comments for user: {username}")
-            comments = self._scrape_comments(user)
             user_data['comments'] = comments
             user_data['metadata']['total_comments'] = len(comments)
+            user_data['metadata']['complete'] = complete
             
             self.logger.info(
                 f"Scraped {len(posts)} posts and {len(comments)} comments"
             )
+            self.logger.debug(f"Credential pool stats: {self.pool.stats()}")
             
         except Exception as e:
             self.logger.error(f"Error scraping user data: {str(e)}")
             raise
         
+        # A walk that ended with an error has a gap below the newest items; saving it
+        # would make the next incremental run stop at those items and never fill the gap
+        if not complete:
+            self.logger.warning(
+                f"Listing for {username} ended with an error; returning partial data "
+                f"without updating the snapshot"
+            )
+        elif incremental and (posts or comments):
+            self.snapshot_store.save(username, user_data)
+        
         return user_data
     
-    def _scrape_posts(self, user) -> List[Dict[str, Any]]:
-        """Scrape user posts."""
+    def _merge_items(self, new_items: List[Dict[str, Any]], known_items: List[Dict[str, Any]],
+                     limit: int, kind: str, username: str) -> List[Dict[str, Any]]:
+        """
+        Merge newly fetched items into snapshot items, newest first.
+
+        A fetch that reached the limit may have stopped before the first known
+        item, leaving a gap between the new items and the snapshot. The fetched
+        items are then exactly what a full scrape returns, so they replace the
+        snapshot items instead of being merged onto them.
+        """
+        if len(new_items) >= limit:
+            self.logger.info(
+                f"Fetched {len(new_items)} new {kind} for {username} without reaching the snapshot; "
+                f"replacing its {kind} with a full scrape"
+            )
+            return new_items
+
+        new_ids = {item['id'] for item in new_items}
+        merged = new_items + [item for item in known_items if item['id'] not in new_ids]
+        merged.sort(key=lambda item: item['created_utc'], reverse=True)
+        return merged
+    
+    def _scrape_overview(self, username: str, known_post_ids: Set[str],
+                         known_comment_ids: Set[str]
+                         ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], bool]:
+        """
+        Scrape posts and comments together from the user's overview listing.
+
+        Pages of up to 100 items are requested as raw JSON and parsed straight into
+        post/comment dicts, without building PRAW model objects.
+
+        Returns:
+            Posts, comments and whether the walk finished without an error
+        """
+        posts = []
+        comments = []
+        posts_done = False
+        comments_done = False
+        after = None
+
+        try:
+            while not (posts_done and comments_done):
+                params = {'limit': OVERVIEW_PAGE_SIZE, 'sort': 'new', 'raw_json': 1}
+                if after:
+                    params['after'] = after
+                listing = self._request(
+                    method='GET', path=f"user/{username}/overview", params=params
+                )
+                children = listing['data']['children']
+
+                for child in children:
+                    data = child['data']
+                    if child['kind'] == 't3' and not posts_done:
+                        if data['id'] in known_post_ids:
+                            posts_done = True
+                        else:
+                            posts.append(self._parse_post(data))
+                            posts_done = len(posts) >= self.max_posts
+                    elif child['kind'] == 't1' and not comments_done:
+                        if data['id'] in known_comment_ids:
+                            comments_done = True
+                        else:
+                            comments.append(self._parse_comment(data))
+                            comments_done = len(comments) >= self.max_comments
+
+                after = listing['data'].get('after')
+                if not children or not after:
+                    break
+
+        except Exception as e:
+            self.logger.error(f"Error scraping overview: {str(e)}")
+            return posts, comments, False
+
+        return posts, comments, True
+
+    def _parse_post(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert raw submission JSON into a post dict."""
+        return {
+            'id': data['id'],
+            'title': data['title'],
+            'content': data.get('selftext', ''),
+            'subreddit': data['subreddit'],
+            'created_utc': data['created_utc'],
+            'score': data['score'],
+            'upvote_ratio': data.get('upvote_ratio'),
+            'num_comments': data.get('num_comments', 0),
+            'url': data.get('url'),
+            'is_self': data.get('is_self', False)
+        }
+
+    def _parse_comment(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert raw comment JSON into a comment dict."""
+        return {
+            'id': data['id'],
+            'body': data['body'],
+            'subreddit': data['subreddit'],
+            'created_utc': data['created_utc'],
+            'score': data['score'],
+            'parent_id': data['parent_id'],
+            'link_id': data['link_id'],
+            'is_submitter': data.get('is_submitter', False)
+        }
+
+    def _request(self, **kwargs) -> Any:
+        """Send a raw API request through the least-loaded client, moving on if it gets quarantined."""
+        for attempt in range(len(self.pool) + 1):
+            with self.pool.client() as client:
+                try:
+                    return client.reddit.request(**kwargs)
+                except Exception:
+                    if not client.quarantined or attempt == len(self.pool):
+                        raise
+                    self.logger.warning(f"Retrying request on another client after {client.name} was quarantined")
+
+    def _listing(self, username: str, kind: str, limit: int) -> Iterator[Any]:
+        """
+        Iterate a user's submissions or comments listing, newest first.
+
+        The listing is fetched with the least-loaded client; if that client is
+        quarantined part-way, the listing resumes after the last item on another.
+        """
+        fetched = 0
+        after = None
+        switches = 0
+        while True:
+            with self.pool.client() as client:
+                params = {'after': after} if after else {}
+                listing = getattr(client.reddit.redditor(username), kind).new(
+                    limit=limit - fetched, params=params
+                )
+                try:
+                    for item in listing:
+                        fetched += 1
+                        after = f"{LISTING_KINDS[kind]}_{item.id}"
+                        yield item
+                    return
+                except Exception:
+                    switches += 1
+                    if not client.quarantined or switches > len(self.pool):
+                        raise
+                    self.logger.warning(
+                        f"Resuming {kind} of {username} on another client after {client.name} was quarantined"
+                    )
+
+    def _scrape_posts(self, username: str,
+                      known_ids: Optional[Set[str]] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Scrape user posts, stopping at the first already-known post; also return whether the walk finished."""
         posts = []
         count = 0
         
         try:
-            for post in user.submissions.new(limit=MAX_POSTS):
-                if count >= MAX_POSTS:
+            for post in self._listing(username, 'submissions', self.max_posts):
+                if count >= self.max_posts:
+                    break
+                if known_ids and post.id in known_ids:
                     break
                 
                 post_data = {
@@ -99,22 +332,23 @@ class RedditScraper:
                 posts.append(post_data)
                 count += 1
                 
-                # Rate limiting
-                time.sleep(REQUEST_DELAY)
-                
         except Exception as e:
             self.logger.error(f"Error scraping posts: {str(e)}")
+            return posts, False
         
-        return posts
+        return posts, True
     
-    def _scrape_comments(self, user) -> List[Dict[str, Any]]:
-        """Scrape user comments."""
+    def _scrape_comments(self, username: str,
+                         known_ids: Optional[Set[str]] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """Scrape user comments, stopping at the first already-known comment; also return whether the walk finished."""
         comments = []
         count = 0
         
         try:
-            for comment in user.comments.new(limit=MAX_COMMENTS):
-                if count >= MAX_COMMENTS:
+            for comment in self._listing(username, 'comments', self.max_comments):
+                if count >= self.max_comments:
+                    break
+                if known_ids and comment.id in known_ids:
                     break
                 
                 comment_data = {
@@ -131,10 +365,8 @@ class RedditScraper:
                 comments.append(comment_data)
                 count += 1
                 
-                # Rate limiting
-                time.sleep(REQUEST_DELAY)
-                
         except Exception as e:
             self.logger.error(f"Error scraping comments: {str(e)}")
+            return comments, False
         
-        return comments
\ No newline at end of file
+        return comments, True
@@ -0,0 +1,73 @@
+"""
+Scheduler Module
+Runs a small dependency graph of tasks, executing independent tasks concurrently.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Tuple
+
+from src.metrics import propagate_context
+
+
+# Task name -> (callable receiving the results of its dependencies, dependency names)
+TaskGraph = Dict[str, Tuple[Callable[[Dict[str, Any]], Any], List[str]]]
+
+
+def validate_graph(tasks: TaskGraph) -> None:
+    """Raise ValueError if a task depends on an unknown task or the graph has a cycle."""
+    for name, (_, dependencies) in tasks.items():
+        for dependency in dependencies:
+            if dependency not in tasks:
+                raise ValueError(f"Task '{name}' depends on unknown task '{dependency}'")
+
+    visiting, done = set(), set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle detected at task '{name}'")
+        visiting.add(name)
+        for dependency in tasks[name][1]:
+            visit(dependency)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in tasks:
+        visit(name)
+
+
+def run_dag(tasks: TaskGraph, max_workers: int = 4) -> Dict[str, Any]:
+    """
+    Run every task as soon as all of its dependencies have finished.
+
+    Args:
+        tasks: Mapping of task name to (callable, dependency names). Each callable
+            receives a dict with the results of its dependencies.
+        max_workers: Maximum number of tasks running at once
+
+    Returns:
+        Dictionary mapping task name to its result. The first task exception is
+        re-raised after running tasks have finished.
+    """
+    validate_graph(tasks)
+
+    results: Dict[str, Any] = {}
+    pending = dict(tasks)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            ready = [name for name, (_, dependencies) in pending.items()
+                     if all(dependency in results for dependency in dependencies)]
+            for name in ready:
+                func, dependencies = pending.pop(name)
+                dependency_results = {dependency: results[dependency] for dependency in dependencies}
+                running[executor.submit(propagate_context(func), dependency_results)] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                results[name] = future.result()
+
+    return results
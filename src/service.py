@@ -0,0 +1,251 @@
+"""
+Service Module
+Long-running HTTP service that keeps one warm pipeline and processes persona
+jobs from an internal queue.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+
+from config import SERVICE_WORKERS, SERVICE_MAX_JOBS
+from src.llm_gateway import get_llm_gateway
+from src.metrics import REGISTRY
+from src.pipeline import PersonaPipeline
+from src.utils import validate_reddit_url, validate_username, extract_username_from_url
+
+
+FINISHED_STATUSES = ('succeeded', 'failed')
+
+
+class PersonaService:
+    """Queues persona jobs and runs them on a fixed pool of workers sharing one pipeline."""
+
+    def __init__(self, pipeline: PersonaPipeline, workers: int = SERVICE_WORKERS,
+                 max_jobs: int = SERVICE_MAX_JOBS):
+        """
+        Initialize the service and start its workers.
+
+        Args:
+            pipeline: Pipeline whose scraper, analyzer and generator stay warm across jobs
+            workers: Number of jobs processed at once
+            max_jobs: Finished jobs kept for polling before the oldest are dropped
+        """
+        self.logger = logging.getLogger(__name__)
+        self.pipeline = pipeline
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._changed = threading.Condition()
+
+        self._workers = [
+            threading.Thread(target=self._work, name=f"persona-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, username: str) -> Dict[str, Any]:
+        """Queue a persona job and return it."""
+        job = {
+            'id': uuid.uuid4().hex,
+            'username': username,
+            'status': 'queued',
+            'submitted_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        with self._changed:
+            self.jobs[job['id']] = job
+            self._prune()
+        self._queue.put(job['id'])
+        self.logger.info(f"Queued job {job['id']} for {username}")
+        return dict(job)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of a job, or None if it is unknown."""
+        with self._changed:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait(self, job_id: str, known_status: Optional[str], timeout: float) -> Optional[Dict[str, Any]]:
+        """Block until a job's status differs from known_status or the timeout expires."""
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self.jobs.get(job_id, {}).get('status') != known_status, timeout=timeout
+            )
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Count jobs by status and report the LLM gateway's load."""
+        with self._changed:
+            counts: Dict[str, int] = {}
+            for job in self.jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'jobs': counts,
+            'queue_depth': self._queue.qsize(),
+            'workers': len(self._workers),
+            'llm_gateway': get_llm_gateway().stats()
+        }
+
+    def _work(self) -> None:
+        """Worker loop: process queued jobs with the shared pipeline."""
+        while True:
+            job_id = self._queue.get()
+            job = self.get(job_id)
+            if job is None:
+                continue
+
+            self._update(job_id, status='running', started_at=datetime.now().isoformat())
+            try:
+                result = self.pipeline.process_user(job['username'])
+                self._update(job_id, status='succeeded', result=result)
+            except Exception as e:
+                self.logger.error(f"Job {job_id} for {job['username']} failed: {str(e)}")
+                self._update(job_id, status='failed', error=str(e))
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        """Update a job and wake up anyone waiting on it."""
+        with self._changed:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            if job['status'] in FINISHED_STATUSES:
+                job['finished_at'] = datetime.now().isoformat()
+            self._changed.notify_all()
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond max_jobs (caller holds the lock)."""
+        finished: List[str] = [job_id for job_id, job in self.jobs.items()
+                               if job['status'] in FINISHED_STATUSES]
+        for job_id in finished[:max(len(self.jobs) - self.max_jobs, 0)]:
+            del self.jobs[job_id]
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API over a PersonaService.
+
+    POST /jobs                  {"username": ...} or {"url": ...} -> 202 with the job
+    GET  /jobs/<id>             job status and result
+    GET  /jobs/<id>/persona     generated persona text
+    GET  /jobs/<id>/events      server-sent events on every status change
+    GET  /health, GET /metrics  service stats, Prometheus counters
+    """
+
+    service: PersonaService
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/jobs':
+            return self._send_json(404, {'error': 'not found'})
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': 'invalid JSON body'})
+        if not isinstance(body, dict):
+            return self._send_json(400, {'error': 'JSON body must be an object'})
+
+        username = body.get('username')
+        url = body.get('url')
+        if url:
+            if not isinstance(url, str) or not validate_reddit_url(url):
+                return self._send_json(400, {'error': 'invalid Reddit URL'})
+            username = extract_username_from_url(url)
+        if not username:
+            return self._send_json(400, {'error': "provide 'username' or 'url'"})
+        # The username becomes part of file names, store keys and API paths
+        if not isinstance(username, str) or not validate_username(username):
+            return self._send_json(400, {'error': 'invalid Reddit username'})
+
+        self._send_json(202, self.service.submit(username))
+
+    def do_GET(self):
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+
+        if parts == ['health']:
+            return self._send_json(200, self.service.stats())
+        if parts == ['metrics']:
+            return self._send(200, 'text/plain; version=0.0.4', REGISTRY.to_prometheus().encode('utf-8'))
+        if len(parts) < 2 or parts[0] != 'jobs':
+            return self._send_json(404, {'error': 'not found'})
+
+        job = self.service.get(parts[1])
+        if job is None:
+            return self._send_json(404, {'error': 'unknown job'})
+
+        if len(parts) == 2:
+            return self._send_json(200, job)
+        if parts[2:] == ['persona']:
+            return self._send_persona(job)
+        if parts[2:] == ['events']:
+            return self._stream_events(job)
+        self._send_json(404, {'error': 'not found'})
+
+    def _send_persona(self, job: Dict[str, Any]) -> None:
+        if job['status'] != 'succeeded':
+            return self._send_json(409, {'error': f"job is {job['status']}"})
+        output_file = job['result']['output_file']
+        if not os.path.exists(output_file):
+            return self._send_json(410, {'error': 'persona file no longer exists'})
+        with open(output_file, 'rb') as f:
+            self._send(200, 'text/plain; charset=utf-8', f.read())
+
+    def _stream_events(self, job: Dict[str, Any]) -> None:
+        """Stream the job as server-sent events until it finishes."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+
+        status = None
+        while job is not None:
+            if job['status'] != status:
+                status = job['status']
+                self.wfile.write(f"event: {status}\ndata: {json.dumps(job)}\n\n".encode('utf-8'))
+            else:
+                self.wfile.write(b": keep-alive\n\n")
+            self.wfile.flush()
+            if status in FINISHED_STATUSES:
+                break
+            job = self.service.wait(job['id'], status, timeout=15)
+
+    def _send_json(self, status: int, data: Dict[str, Any]) -> None:
+        self._send(status, 'application/json', json.dumps(data).encode('utf-8'))
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.getLogger(__name__).debug(f"{self.address_string()} - {format % args}")
+
+
+def serve(service: PersonaService, host: str, port: int) -> None:
+    """Serve the HTTP API until interrupted."""
+    handler = type('BoundServiceRequestHandler', (ServiceRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    logging.getLogger(__name__).info(f"Persona service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
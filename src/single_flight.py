@@ -0,0 +1,164 @@
+"""
+Single-Flight Module
+Coalesces concurrent identical computations so they run once and share the
+result, between threads of one process and across processes on one host.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalesce within this process only
+    fcntl = None
+
+from config import SINGLE_FLIGHT_DIR, SINGLE_FLIGHT_RESULT_TTL
+from src.metrics import record
+
+
+class _Call:
+    """An in-flight computation that followers in the same process wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs a computation once per key while it is in flight.
+
+    Threads asking for a key that is already being computed in this process wait
+    for it and receive the same result or exception. Across processes, the
+    leader holds an exclusive lock file for the key and publishes its result to
+    a shared SQLite table, where processes that waited on the lock pick it up.
+    Results must be JSON-serializable.
+    """
+
+    def __init__(self, directory: Optional[str] = SINGLE_FLIGHT_DIR,
+                 result_ttl: float = SINGLE_FLIGHT_RESULT_TTL):
+        """
+        Initialize the coordinator.
+
+        Args:
+            directory: Directory for lock files and shared results; None to
+                coalesce within this process only
+            result_ttl: Seconds a published result is served to duplicate requests
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory if fcntl is not None else None
+        self.result_ttl = result_ttl
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._conn = sqlite3.connect(
+                os.path.join(self.directory, 'results.sqlite'), timeout=30, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a key from JSON-serializable parts."""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Return func(), sharing one execution among concurrent callers with the same key.
+
+        Args:
+            key: Identity of the computation (see make_key)
+            func: Computation to run if no identical one is in flight
+
+        Returns:
+            The computation's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self.logger.debug(f"Waiting on in-flight computation {key[:12]}")
+            call.done.wait()
+            record('single_flight_shared')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_exclusive(key, func)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _run_exclusive(self, key: str, func: Callable[[], Any]) -> Any:
+        """Run func under the key's lock file, reusing a result another process just published."""
+        if not self.directory:
+            return func()
+
+        lock_path = os.path.join(self.directory, f"{key}.lock")
+        while True:
+            f = open(lock_path, 'a')
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                # The previous holder removes the file when done; lock the current one instead
+                if os.path.exists(lock_path) and os.stat(lock_path).st_ino == os.fstat(f.fileno()).st_ino:
+                    break
+            except BaseException:
+                f.close()
+                raise
+            f.close()
+
+        try:
+            shared = self._load_result(key)
+            if shared is not None:
+                self.logger.debug(f"Reusing result of computation {key[:12]} from another process")
+                record('single_flight_shared')
+                return json.loads(shared)
+
+            result = func()
+            self._store_result(key, result)
+            return result
+        finally:
+            os.remove(lock_path)
+            f.close()
+
+    def _load_result(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT result FROM results WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.result_ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _store_result(self, key: str, result: Any) -> None:
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), now)
+            )
+            self._conn.execute("DELETE FROM results WHERE created_at <= ?", (now - self.result_ttl,))
+            self._conn.commit()
@@ -0,0 +1,56 @@
+"""
+Storage Module
+Simple JSON file store used for per-user snapshots and persisted results.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, Any, Optional
+
+from src.utils import sanitize_filename
+
+
+class JsonStore:
+    """Stores one JSON document per key in a directory."""
+
+    def __init__(self, base_dir: str):
+        """Initialize the store, creating its directory if needed."""
+        self.logger = logging.getLogger(__name__)
+        self.base_dir = base_dir
+        os.makedirs(base_dir, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """Return the file path for a key."""
+        return os.path.join(self.base_dir, f"{sanitize_filename(key)}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load the document for a key, or None if it does not exist or is unreadable."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable file {path}: {str(e)}")
+            return None
+
+    def save(self, key: str, data: Dict[str, Any]) -> None:
+        """Atomically write the document for a key."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.base_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        """Remove the document for a key if it exists."""
+        path = self.path(key)
+        if os.path.exists(path):
+            os.remove(path)
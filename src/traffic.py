@@ -0,0 +1,286 @@
+"""
+Traffic Module
+Records Reddit HTTP responses and LLM prompt/response pairs from a real run into a
+compact archive, and replays them with the original (optionally scaled) latencies.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+import praw
+import requests
+from langchain_core.messages import AIMessage
+from prawcore import Requestor
+
+from config import LLM_MODELS, REDDIT_USER_AGENT
+from src.checkpoint import CheckpointStore
+from src.llm_cache import LLMCache
+from src.llm_utils import message_text
+from src.metrics import record
+from src.model_router import ModelRouter
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator
+from src.credential_pool import RateLimitedRequestor
+from src.reddit_scraper import RedditScraper
+from src.single_flight import SingleFlight
+from src.storage import JsonStore
+
+
+TRAFFIC_ARCHIVE_VERSION = 1
+
+# Credentials that must never reach a (shareable) archive
+SECRET_HEADERS = ('authorization', 'proxy-authorization', 'set-cookie', 'cookie')
+SECRET_BODY_FIELDS = ('access_token', 'refresh_token')
+REDACTED = 'REDACTED'
+
+
+class ReplayMissError(LookupError):
+    """Raised when a replayed request or prompt is not in the archive."""
+
+
+class TrafficArchive:
+    """Gzipped JSON archive of HTTP and LLM exchanges, keyed by request and served in recorded order."""
+
+    def __init__(self, path: str):
+        """Open an archive, loading its exchanges if the file exists."""
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.exchanges: Dict[str, Dict[str, List[Dict[str, Any]]]] = {'http': {}, 'llm': {}}
+        self._positions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != TRAFFIC_ARCHIVE_VERSION:
+                raise ValueError(f"Unsupported traffic archive version in {path}")
+            self.exchanges = data['exchanges']
+
+    def add(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        """Append an exchange for a request key."""
+        with self._lock:
+            self.exchanges[kind].setdefault(key, []).append(entry)
+
+    def next(self, kind: str, key: str) -> Dict[str, Any]:
+        """
+        Return the next recorded exchange for a request key.
+
+        Repeated requests are served in recorded order; once exhausted the last
+        exchange is served again.
+        """
+        with self._lock:
+            entries = self.exchanges[kind].get(key)
+            if not entries:
+                raise ReplayMissError(f"No recorded {kind} exchange for {key[:120]}")
+            position = self._positions.get(f"{kind}:{key}", 0)
+            self._positions[f"{kind}:{key}"] = position + 1
+            return entries[min(position, len(entries) - 1)]
+
+    def save(self) -> None:
+        """Write the archive atomically."""
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            data = {'version': TRAFFIC_ARCHIVE_VERSION, 'exchanges': self.exchanges}
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self.logger.info(
+            f"Saved traffic archive {self.path}: {len(self.exchanges['http'])} HTTP and "
+            f"{len(self.exchanges['llm'])} LLM request keys"
+        )
+
+
+def redact_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Replace the values of credential headers."""
+    return {name: REDACTED if name.lower() in SECRET_HEADERS else value for name, value in headers.items()}
+
+
+def redact_body(body: str) -> str:
+    """Replace OAuth tokens in a JSON response body, keeping its shape for replay."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(data, dict) or not any(field in data for field in SECRET_BODY_FIELDS):
+        return body
+    return json.dumps({key: REDACTED if key in SECRET_BODY_FIELDS else value for key, value in data.items()})
+
+
+def http_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Build the archive key of an HTTP request."""
+    query = '&'.join(f"{key}={value}" for key, value in sorted((params or {}).items()))
+    return f"{method.upper()} {url}?{query}"
+
+
+def llm_key(prompt: Any) -> str:
+    """Build the archive key of an LLM prompt."""
+    return hashlib.sha256(str(prompt).encode('utf-8')).hexdigest()
+
+
+class RecordingRequestor(RateLimitedRequestor):
+    """Rate-limited requestor that also records every response and its latency."""
+
+    def __init__(self, *args, archive: TrafficArchive, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+
+    def request(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        response = super().request(method, url, *args, **kwargs)
+        # The latency includes any rate-limiter wait, reproducing the original timeline.
+        # The OAuth token response and credential headers are redacted; replay never uses them
+        self.archive.add('http', http_key(method, url, kwargs.get('params')), {
+            'status': response.status_code,
+            'headers': redact_headers(dict(response.headers)),
+            'body': redact_body(response.text),
+            'latency': time.perf_counter() - start
+        })
+        return response
+
+
+class ReplayRequestor(Requestor):
+    """Requestor that serves recorded responses instead of calling Reddit."""
+
+    def __init__(self, *args, archive: TrafficArchive, latency_scale: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive = archive
+        self.latency_scale = latency_scale
+
+    def request(self, method, url, *args, **kwargs):
+        entry = self.archive.next('http', http_key(method, url, kwargs.get('params')))
+        record('reddit_requests')
+        time.sleep(entry['latency'] * self.latency_scale)
+
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.headers.update(entry['headers'])
+        response.headers.pop('Content-Encoding', None)
+        response._content = entry['body'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = url
+        return response
+
+
+class RecordingLLM:
+    """Wraps a chat model, recording every prompt with its response (or error) and latency."""
+
+    def __init__(self, llm: Any, archive: TrafficArchive):
+        self.llm = llm
+        self.archive = archive
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def invoke(self, prompt: Any, **kwargs) -> Any:
+        start = time.perf_counter()
+        try:
+            response = self.llm.invoke(prompt, **kwargs)
+        except Exception as e:
+            # Errors are replayed too, so quota retries happen as they did originally
+            self.archive.add('llm', llm_key(prompt), {
+                'error': f"{type(e).__name__}: {e}", 'latency': time.perf_counter() - start
+            })
+            raise
+
+        self.archive.add('llm', llm_key(prompt), {
+            'content': message_text(response),
+            'usage': getattr(response, 'usage_metadata', None),
+            'latency': time.perf_counter() - start
+        })
+        return response
+
+
+class ReplayLLM:
+    """Chat model stand-in that serves recorded responses."""
+
+    def __init__(self, archive: TrafficArchive, latency_scale: float = 1.0,
+                 model: str = 'replay', temperature: float = 0.3):
+        self.archive = archive
+        self.latency_scale = latency_scale
+        self.model = model
+        self.temperature = temperature
+
+    def invoke(self, prompt: Any, **kwargs) -> AIMessage:
+        entry = self.archive.next('llm', llm_key(prompt))
+        time.sleep(entry['latency'] * self.latency_scale)
+        if 'error' in entry:
+            raise RuntimeError(entry['error'])
+        return AIMessage(content=entry['content'], usage_metadata=entry['usage'])
+
+
+def create_traffic_components(archive: TrafficArchive, replay: bool,
+                              latency_scale: float = 1.0) -> Dict[str, Any]:
+    """
+    Build a scraper, analyzer and generator that record to or replay from an archive.
+
+    Both modes start from empty snapshot/analysis/checkpoint stores, a per-run
+    in-memory LLM cache and a private single-flight directory, so a replay issues
+    exactly the requests the recording saw. The stores live in a temporary
+    directory that the caller removes with state_dir.cleanup() when the run ends.
+
+    Args:
+        archive: Traffic archive to record into or replay from
+        replay: Serve traffic from the archive instead of the network
+        latency_scale: Multiplier for recorded latencies when replaying (0 = no delay)
+
+    Returns:
+        Dictionary with 'scraper', 'analyzer', 'generator', 'checkpoints', 'single_flight'
+        and 'state_dir' (the tempfile.TemporaryDirectory holding the stores)
+    """
+    state_dir = tempfile.TemporaryDirectory(prefix='persona_traffic_')
+    snapshot_store = JsonStore(os.path.join(state_dir.name, 'scraped_data'))
+    analysis_store = JsonStore(os.path.join(state_dir.name, 'analysis'))
+    cache = LLMCache(':memory:')
+    checkpoints = CheckpointStore(JsonStore(os.path.join(state_dir.name, 'checkpoints')))
+    single_flight = SingleFlight(os.path.join(state_dir.name, 'single_flight'))
+
+    if replay:
+        reddit = praw.Reddit(
+            client_id='replay',
+            client_secret='replay',
+            user_agent=REDDIT_USER_AGENT,
+            requestor_class=ReplayRequestor,
+            requestor_kwargs={'archive': archive, 'latency_scale': latency_scale}
+        )
+        # One replaying model per tier, so escalations replay as they were recorded
+        router = ModelRouter(models={
+            tier: ReplayLLM(archive, latency_scale, model=model) for tier, model in LLM_MODELS.items()
+        })
+        return {
+            'scraper': RedditScraper(snapshot_store=snapshot_store, reddit=reddit),
+            'analyzer': PersonaAnalyzer(cache=cache, analysis_store=analysis_store, router=router),
+            'generator': PersonaGenerator(
+                cache=cache, router=router, structured_llm=ReplayLLM(archive, latency_scale)
+            ),
+            'checkpoints': checkpoints,
+            'single_flight': single_flight,
+            'state_dir': state_dir
+        }
+
+    scraper = RedditScraper(
+        snapshot_store=snapshot_store,
+        requestor_class=RecordingRequestor,
+        requestor_kwargs={'archive': archive}
+    )
+    router = ModelRouter()
+    router.models = {tier: RecordingLLM(llm, archive) for tier, llm in router.models.items()}
+    analyzer = PersonaAnalyzer(cache=cache, analysis_store=analysis_store, router=router)
+    generator = PersonaGenerator(cache=cache, router=router)
+    generator.structured_llm = RecordingLLM(generator.structured_llm, archive)
+    return {
+        'scraper': scraper,
+        'analyzer': analyzer,
+        'generator': generator,
+        'checkpoints': checkpoints,
+        'single_flight': single_flight,
+        'state_dir': state_dir
+    }
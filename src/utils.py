@@ -5,7 +5,7 @@ Utility functions for the Reddit User Persona Generator.
 import logging
 import os
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 
 from typing import Optional
 
@@ -45,12 +45,37 @@ def create_output_directories(base_dir: str) -> None:
         os.makedirs(directory, exist_ok=True)
 
 
+def validate_username(username: str) -> bool:
+    """Validate a Reddit username (3-20 letters, digits, '_' or '-')."""
+    return bool(re.match(r'^[A-Za-z0-9_-]{3,20}$', username))
+
+
 def extract_username_from_url(url: str) -> Optional[str]:
     """Extract username from Reddit URL."""
     match = re.search(r'/user/([^/]+)', url)
     return match.group(1) if match else None
 
 
+def parse_user_list(lines: Iterable[str]) -> List[str]:
+    """Parse usernames, u/usernames or profile URLs (one per line) into unique usernames."""
+    usernames = []
+    seen = set()
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('u/'):
+            username = line[2:]
+        elif '/' in line:
+            username = extract_username_from_url(line)
+        else:
+            username = line
+        if username and username not in seen:
+            seen.add(username)
+            usernames.append(username)
+    return usernames
+
+
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file system usage."""
     # Remove invalid characters
@@ -87,6 +112,40 @@ def chunk_text(text: str, max_length: int = 4000) -> List[str]:
     return chunks
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a text (roughly 4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def pack_by_token_budget(items: List[str], max_tokens: int, separator: str = "\n") -> List[str]:
+    """
+    Pack text items into as few chunks as possible without exceeding a token budget.
+
+    Items larger than the budget on their own are truncated to fit.
+    """
+    max_chars = max_tokens * 4
+    chunks = []
+    current = []
+    current_length = 0
+
+    for item in items:
+        if len(item) > max_chars:
+            item = item[:max_chars - 3] + "..."
+        added_length = len(item) + (len(separator) if current else 0)
+        if current and current_length + added_length > max_chars:
+            chunks.append(separator.join(current))
+            current = []
+            current_length = 0
+            added_length = len(item)
+        current.append(item)
+        current_length += added_length
+
+    if current:
+        chunks.append(separator.join(current))
+
+    return chunks
+
+
 def calculate_similarity(text1: str, text2: str) -> float:
     """Calculate basic text similarity."""
     # Simple implementation using word overlap
@@ -0,0 +1,103 @@
+"""
+Tests for building user data from NDJSON dumps.
+"""
+
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.archive_source import ArchiveIndex, ArchiveSource
+
+
+def write_dump(path, records):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + '\n')
+    return str(path)
+
+
+def post(author, id, created_utc=1_700_000_000):
+    return {'author': author, 'id': id, 'title': f"Post {id}", 'selftext': 'text',
+            'subreddit': 'python', 'created_utc': created_utc, 'score': 1}
+
+
+def comment(author, id, created_utc=1_700_000_000):
+    return {'author': author, 'id': id, 'body': f"Comment {id}", 'subreddit': 'python',
+            'created_utc': created_utc, 'score': 1, 'link_id': 't3_x'}
+
+
+def test_indexed_source_serves_other_threads(tmp_path):
+    dump = write_dump(tmp_path / 'RC.ndjson', [comment('alice', 'c1'), comment('bob', 'c2')])
+    index = ArchiveIndex(str(tmp_path / 'index.sqlite'))
+    source = ArchiveSource([dump])
+    source.build_index(index)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        users = list(executor.map(source.scrape_user_data, ['alice', 'bob']))
+
+    assert [[c['id'] for c in user['comments']] for user in users] == [['c1'], ['c2']]
+
+
+def test_non_object_and_malformed_lines_are_skipped(tmp_path):
+    dump = write_dump(tmp_path / 'RC.ndjson', [
+        '[1, 2]', '"alice"', 'null', '42', '{not json', '{"author": null, "body": "x"}',
+        comment('alice', 'c1')
+    ])
+    source = ArchiveSource([dump])
+
+    assert [c['id'] for c in source.scrape_user_data('alice')['comments']] == ['c1']
+
+    source.build_index(ArchiveIndex(str(tmp_path / 'index.sqlite')))
+    assert [c['id'] for c in source.scrape_user_data('alice')['comments']] == ['c1']
+
+
+def test_records_without_a_valid_id_or_timestamp_are_skipped(tmp_path):
+    no_id = post('alice', 'p0')
+    del no_id['id']
+    no_timestamp = comment('alice', 'c0')
+    del no_timestamp['created_utc']
+    source = ArchiveSource([
+        write_dump(tmp_path / 'RS.ndjson', [no_id, post('alice', 'p1', created_utc='yesterday'), post('alice', 'p2')]),
+        write_dump(tmp_path / 'RC.ndjson', [no_timestamp, comment('alice', 'c1', created_utc=None), comment('alice', 'c2')])
+    ])
+
+    user_data = source.scrape_user_data('alice')
+
+    assert [p['id'] for p in user_data['posts']] == ['p2']
+    assert [c['id'] for c in user_data['comments']] == ['c2']
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_authors_match_case_insensitively(tmp_path, indexed):
+    dumps = [
+        write_dump(tmp_path / 'RS.ndjson', [post('Alice', 'p1', 1), post('bob', 'p2', 2)]),
+        write_dump(tmp_path / 'RC.ndjson', [comment('ALICE', 'c1', 3), comment('alice', 'c2', 4)])
+    ]
+    source = ArchiveSource(dumps)
+    if indexed:
+        source.build_index(ArchiveIndex(str(tmp_path / 'index.sqlite')))
+
+    user_data = source.scrape_user_data('aLiCe')
+
+    assert user_data['username'] == 'aLiCe'
+    assert [p['id'] for p in user_data['posts']] == ['p1']
+    assert [c['id'] for c in user_data['comments']] == ['c2', 'c1']
+
+    source.preload(['Bob'])
+    assert [p['id'] for p in source.scrape_user_data('BOB')['posts']] == ['p2']
+
+
+def test_index_from_an_older_version_is_rebuilt(tmp_path):
+    dump = write_dump(tmp_path / 'RC.ndjson', [comment('Alice', 'c1')])
+    path = str(tmp_path / 'index.sqlite')
+    ArchiveIndex(path).replace(dump, [('Alice', 0)])
+    with sqlite3.connect(path) as conn:
+        conn.execute("PRAGMA user_version = 0")
+
+    index = ArchiveIndex(path)
+    assert not index.is_indexed(dump)
+    source = ArchiveSource([dump])
+    source.build_index(index)
+    assert [c['id'] for c in source.scrape_user_data('alice')['comments']] == ['c1']
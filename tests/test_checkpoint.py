@@ -0,0 +1,110 @@
+"""
+Tests for checkpoints and resuming the pipeline from them.
+"""
+
+import json
+import threading
+
+from benchmarks.fakes import FakeLLM, make_user_data
+from src.checkpoint import CheckpointStore, content_hash
+from src.llm_cache import LLMCache
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator, UNAVAILABLE_CONTENT
+from src.pipeline import PersonaPipeline
+from src.single_flight import SingleFlight
+from src.storage import JsonStore
+
+
+class StaticScraper:
+    """Data source serving one fixed user."""
+
+    def __init__(self, user_data):
+        self.user_data = user_data
+
+    def scrape_user_data(self, username):
+        return self.user_data
+
+
+class SectionFailingLLM(FakeLLM):
+    """Fake LLM that fails the prompts containing a marker and counts every prompt."""
+
+    def __init__(self, fail_marker=None):
+        super().__init__(latency=0)
+        self.fail_marker = fail_marker
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt, **kwargs):
+        with self._lock:
+            self.prompts.append(str(prompt))
+        if self.fail_marker and self.fail_marker in str(prompt):
+            raise ValueError("Simulated section failure")
+        return super().invoke(prompt, **kwargs)
+
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({'a': 1, 'b': [1, 2]}) == content_hash({'b': [1, 2], 'a': 1})
+
+
+def test_content_hash_matches_json_round_trip():
+    data = {'peak_hours': {17: 3, 9: 5, 10: 1}, 'ratio': float('inf'), 'nested': [{2: 'x'}]}
+    assert content_hash(data) == content_hash(json.loads(json.dumps(data)))
+
+
+def test_checkpoint_load_requires_matching_input_hash(tmp_path):
+    store = CheckpointStore(JsonStore(str(tmp_path)))
+    store.save('alice', 'analyze', 'hash1', {'value': 1})
+
+    assert store.load('alice', 'analyze', 'hash1') == {'value': 1}
+    assert store.load('alice', 'analyze', 'hash2') is None
+    assert store.load('bob', 'analyze', 'hash1') is None
+
+
+def test_checkpoint_expires_after_max_age(tmp_path):
+    store = CheckpointStore(JsonStore(str(tmp_path)), max_age=-1)
+    store.save('alice', 'scrape', 'hash', {'value': 1})
+
+    assert store.load('alice', 'scrape', 'hash') is None
+
+
+def test_save_section_accumulates_and_clear_removes(tmp_path):
+    store = CheckpointStore(JsonStore(str(tmp_path)))
+    store.save_section('alice', 'hash', 'personality', {'traits': 'x'})
+    store.save_section('alice', 'hash', 'goals', {'analysis': 'y'})
+
+    assert set(store.load('alice', 'generate', 'hash')) == {'personality', 'goals'}
+
+    store.clear('alice')
+    assert store.load('alice', 'generate', 'hash') is None
+
+
+def test_rerun_regenerates_only_the_failed_section(tmp_path):
+    user_data = make_user_data('alice', 200, seed=1)
+    checkpoints = CheckpointStore(JsonStore(str(tmp_path / 'checkpoints')))
+
+    def run(generator_llm):
+        pipeline = PersonaPipeline(
+            str(tmp_path),
+            scraper=StaticScraper(user_data),
+            analyzer=PersonaAnalyzer(
+                cache=LLMCache(':memory:'), analysis_store=JsonStore(str(tmp_path / 'analysis')),
+                llm=FakeLLM(latency=0)
+            ),
+            generator=PersonaGenerator(cache=LLMCache(':memory:'), llm=generator_llm),
+            checkpoints=checkpoints,
+            single_flight=SingleFlight(directory=None)
+        )
+        return pipeline.process_user('alice')
+
+    failing = SectionFailingLLM(fail_marker='Short-term goals')
+    result = run(failing)
+    with open(result['output_file'], encoding='utf-8') as f:
+        assert UNAVAILABLE_CONTENT in f.read()
+    assert len(failing.prompts) == 6
+
+    rerun = SectionFailingLLM()
+    result = run(rerun)
+    assert len(rerun.prompts) == 1
+    assert 'Short-term goals' in rerun.prompts[0]
+    with open(result['output_file'], encoding='utf-8') as f:
+        assert UNAVAILABLE_CONTENT not in f.read()
@@ -0,0 +1,95 @@
+"""
+Tests for the Reddit credential pool and its rate-limited requestor.
+"""
+
+import sys
+import time
+import types
+
+import pytest
+import requests
+
+from src.credential_pool import CredentialPool, CredentialPoolExhaustedError, RateLimitedRequestor
+from src.rate_limiter import RateLimiter
+
+
+def test_clients_are_built_on_first_use(monkeypatch):
+    built = []
+    fake_praw = types.ModuleType('praw')
+    fake_praw.Reddit = lambda **kwargs: built.append(kwargs) or kwargs['client_id']
+    monkeypatch.setitem(sys.modules, 'praw', fake_praw)
+
+    pool = CredentialPool.from_config(credentials=[('app1', 'secret1'), ('app2', 'secret2')])
+    assert len(pool) == 2
+    assert built == []
+
+    with pool.client() as client:
+        assert client.reddit == client.name
+        assert client.reddit == client.name
+    assert len(built) == 1
+    assert built[0]['client_secret'] == {'app1': 'secret1', 'app2': 'secret2'}[client.name]
+    assert built[0]['requestor_kwargs']['rate_limiter'] is client.rate_limiter
+
+
+class ScriptedSession(requests.Session):
+    """Session that answers requests with (status, headers) pairs in order."""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+
+    def request(self, method, url, **kwargs):
+        status, headers = self.responses.pop(0)
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(headers)
+        response._content = b'{}'
+        return response
+
+
+def make_requestor(responses, rate_limiter, on_response=None):
+    return RateLimitedRequestor('persona-generator-tests', session=ScriptedSession(responses),
+                                rate_limiter=rate_limiter, on_response=on_response)
+
+
+def test_requests_pass_through_the_rate_limiter():
+    limiter = RateLimiter(rate=20, capacity=1)
+    requestor = make_requestor([(200, {})] * 3, limiter)
+
+    start = time.monotonic()
+    for _ in range(3):
+        requestor.request('GET', 'https://oauth.reddit.com/api/v1/me')
+
+    # One token of burst, then one request every 1/20s
+    assert time.monotonic() - start >= 0.09
+    assert limiter.stats()['requests'] == 3
+
+
+def test_quota_headers_update_the_limiter():
+    limiter = RateLimiter(rate=1000, capacity=1000)
+    requestor = make_requestor([(200, {'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '0.1'})], limiter)
+
+    requestor.request('GET', 'https://oauth.reddit.com/api/v1/me')
+
+    assert limiter.stats()['quota_remaining'] == 0
+    assert limiter.available() == 0
+    assert limiter.acquire() > 0.05
+
+
+def test_rejected_client_is_quarantined():
+    pool = CredentialPool.from_clients(['first', 'second'])
+    first = pool.clients[0]
+    requestor = make_requestor([(429, {'x-ratelimit-reset': '60'})], RateLimiter(rate=1000, capacity=1000),
+                               on_response=lambda response: pool.observe(first, response))
+
+    requestor.request('GET', 'https://oauth.reddit.com/api/v1/me')
+
+    assert first.quarantined
+    for _ in range(3):
+        with pool.client() as client:
+            assert client.reddit == 'second'
+
+    pool.observe(pool.clients[1], type('Response', (), {'status_code': 401, 'headers': {}})())
+    with pytest.raises(CredentialPoolExhaustedError):
+        with pool.client():
+            pass
@@ -0,0 +1,49 @@
+"""
+Tests for the LLM-free fast persona.
+"""
+
+import pytest
+
+from benchmarks.fakes import make_user_data
+from src.llm_cache import LLMCache
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator
+from src.storage import JsonStore
+
+
+class NoLLM:
+    def invoke(self, prompt, **kwargs):
+        raise AssertionError("fast mode must not call the LLM")
+
+
+@pytest.fixture
+def persona(tmp_path):
+    user_data = make_user_data('alice', 300, seed=1)
+    analyzer = PersonaAnalyzer(use_cache=False, analysis_store=JsonStore(str(tmp_path)), llm=NoLLM())
+    generator = PersonaGenerator(cache=LLMCache(':memory:'), llm=NoLLM(), structured_llm=NoLLM())
+    analysis = analyzer.analyze_user_activity(user_data)
+    return analysis, generator.generate_fast_persona(analysis, user_data)
+
+
+def test_fast_persona_has_only_deterministic_sections(persona):
+    analysis, text = persona
+
+    for heading in ('## PERSONAL INFORMATION', '## PERSONALITY TRAITS', '## BEHAVIOR & HABITS',
+                    '### Activity Patterns', '### Engagement Metrics', '## INTERESTS',
+                    '## CITATIONS & EVIDENCE'):
+        assert heading in text
+    for heading in ('## MOTIVATIONS', '## FRUSTRATIONS', '## GOALS & NEEDS'):
+        assert heading not in text
+    assert 'Primary Drivers' not in text
+    assert 'Behavioral Indicators' not in text
+    assert text.lower().count('not inferred in fast mode') == 1
+    assert analysis['interests']['interest_analysis'] in text.split('## INTERESTS')[1]
+
+
+def test_engagement_averages_appear_only_in_engagement_metrics(persona):
+    analysis, text = persona
+    before, after = text.split('### Engagement Metrics')
+    engagement, rest = after.split('## INTERESTS')
+
+    assert 'Avg Post Score' in engagement
+    assert 'post score' not in (before + rest).lower()
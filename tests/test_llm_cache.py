@@ -0,0 +1,44 @@
+"""
+Tests for choosing the LLM response cache.
+"""
+
+import pytest
+
+import src.persona_analyzer
+import src.persona_generator
+from benchmarks.fakes import FakeLLM
+from src.llm_cache import LLMCache
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator
+from src.storage import JsonStore
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = LLMCache(':memory:')
+    for module in (src.persona_analyzer, src.persona_generator):
+        monkeypatch.setattr(module, 'get_llm_cache', lambda: cache)
+    return cache
+
+
+def make_components(tmp_path, **kwargs):
+    return [
+        PersonaAnalyzer(analysis_store=JsonStore(str(tmp_path)), llm=FakeLLM(latency=0), **kwargs),
+        PersonaGenerator(llm=FakeLLM(latency=0), **kwargs)
+    ]
+
+
+def test_default_is_the_shared_cache(tmp_path, shared_cache):
+    for component in make_components(tmp_path):
+        assert component.cache is shared_cache
+
+
+def test_explicit_cache_is_used(tmp_path, shared_cache):
+    cache = LLMCache(':memory:')
+    for component in make_components(tmp_path, cache=cache):
+        assert component.cache is cache
+
+
+def test_use_cache_false_disables_caching(tmp_path, shared_cache):
+    for component in make_components(tmp_path, use_cache=False):
+        assert component.cache is None
@@ -0,0 +1,132 @@
+"""
+Tests for the LLM gateway's adaptive concurrency, retries and key rotation.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.llm_gateway import LLMGateway, current_api_key
+
+
+class ScriptedLLM:
+    """LLM that raises the scripted errors in order, then answers."""
+
+    def __init__(self, errors=(), latency=0.0):
+        self.errors = list(errors)
+        self.latency = latency
+        self.keys = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self._lock:
+            self.keys.append(current_api_key.get())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            time.sleep(self.latency)
+            if error:
+                raise error
+            return f"response to {prompt}"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def make_gateway(**kwargs):
+    options = {'api_keys': ['key-a'], 'initial_concurrency': 4, 'max_concurrency': 8,
+               'latency_target': 1.0, 'max_retries': 3, 'base_delay': 0.001, 'max_delay': 0.01}
+    options.update(kwargs)
+    return LLMGateway(**options)
+
+
+def test_quota_errors_are_retried():
+    gateway = make_gateway()
+    llm = ScriptedLLM([RuntimeError("429 Resource exhausted"), RuntimeError("503 unavailable")])
+
+    assert gateway.invoke(llm, 'prompt') == "response to prompt"
+    assert len(llm.keys) == 3
+    assert gateway.stats()['keys'][0]['throttled'] == 2
+
+
+def test_other_errors_are_not_retried():
+    gateway = make_gateway()
+    llm = ScriptedLLM([ValueError("invalid argument")])
+
+    with pytest.raises(ValueError):
+        gateway.invoke(llm, 'prompt')
+    assert len(llm.keys) == 1
+
+
+def test_retries_give_up_after_max_retries():
+    gateway = make_gateway(max_retries=2)
+    llm = ScriptedLLM([RuntimeError("429")] * 5)
+
+    with pytest.raises(RuntimeError, match="429"):
+        gateway.invoke(llm, 'prompt')
+    assert len(llm.keys) == 3
+
+
+def test_fast_calls_grow_the_limit_up_to_the_maximum():
+    gateway = make_gateway(initial_concurrency=1, max_concurrency=3)
+    llm = ScriptedLLM()
+
+    gateway.invoke(llm, 'prompt')
+    assert gateway.stats()['concurrency_limit'] == 2
+    for _ in range(20):
+        gateway.invoke(llm, 'prompt')
+    assert gateway.stats()['concurrency_limit'] == 3
+
+
+def test_slow_calls_do_not_grow_the_limit():
+    gateway = make_gateway(initial_concurrency=1, latency_target=0.0)
+    for _ in range(3):
+        gateway.invoke(ScriptedLLM(latency=0.01), 'prompt')
+    assert gateway.stats()['concurrency_limit'] == 1
+
+
+def test_throttling_halves_the_limit_once_per_round():
+    gateway = make_gateway(initial_concurrency=4, max_retries=0)
+    barrier = threading.Barrier(4, timeout=5)
+
+    class BurstThrottledLLM:
+        def invoke(self, prompt):
+            # All four calls are in flight before any of them is throttled
+            barrier.wait()
+            raise RuntimeError("429 Too Many Requests")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(gateway.invoke, BurstThrottledLLM(), i) for i in range(4)]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert gateway.stats()['concurrency_limit'] == 2
+
+
+def test_in_flight_calls_stay_within_the_limit():
+    gateway = make_gateway(initial_concurrency=2, max_concurrency=2)
+    llm = ScriptedLLM(latency=0.02)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: gateway.invoke(llm, i), range(16)))
+
+    assert llm.max_in_flight == 2
+    assert gateway.stats()['in_flight'] == 0
+
+
+def test_throttled_key_rotates_to_another_key():
+    gateway = make_gateway(api_keys=['key-a', 'key-b'], base_delay=1.0, max_delay=1.0)
+    llm = ScriptedLLM([RuntimeError("429")])
+
+    start = time.monotonic()
+    gateway.invoke(llm, 'prompt')
+
+    # The retry goes straight to the other key instead of waiting out the cooldown
+    assert llm.keys == ['key-a', 'key-b']
+    assert time.monotonic() - start < 0.5
@@ -0,0 +1,45 @@
+"""
+Tests for the token-bucket rate limiter.
+"""
+
+import time
+
+from src.rate_limiter import RateLimiter
+
+
+def test_burst_is_free_then_requests_are_spaced():
+    limiter = RateLimiter(rate=20, capacity=2)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    start = time.monotonic()
+    wait = limiter.acquire()
+
+    assert 0.03 < wait <= 0.05
+    assert time.monotonic() - start >= 0.03
+    assert limiter.stats()['requests'] == 3
+
+
+def test_tokens_refill_up_to_capacity():
+    limiter = RateLimiter(rate=100, capacity=1)
+    limiter.acquire()
+    time.sleep(0.05)
+
+    assert limiter.acquire() == 0
+    assert limiter.acquire() > 0
+
+
+def test_exhausted_quota_pauses_until_reset():
+    limiter = RateLimiter(rate=1000, capacity=1000)
+    limiter.update_from_headers({'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '0.1'})
+
+    assert limiter.acquire() > 0.05
+
+
+def test_malformed_quota_headers_are_ignored():
+    limiter = RateLimiter(rate=1000, capacity=10)
+    limiter.update_from_headers({'x-ratelimit-remaining': 'many', 'x-ratelimit-reset': '1'})
+    limiter.update_from_headers({'x-ratelimit-remaining': '5'})
+
+    assert limiter.stats()['quota_remaining'] is None
+    assert limiter.acquire() == 0
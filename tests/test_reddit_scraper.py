@@ -0,0 +1,92 @@
+"""
+Tests for incremental scraping and snapshots.
+"""
+
+import pytest
+
+from benchmarks.fakes import FakeListing, FakeReddit, make_user_data
+from src.reddit_scraper import RedditScraper
+from src.storage import JsonStore
+
+
+class FlakyReddit(FakeReddit):
+    """FakeReddit whose listings and overview pages raise after a number of items."""
+
+    def __init__(self, users, fail_after=None):
+        super().__init__(users)
+        self.fail_after = fail_after
+
+    def redditor(self, username):
+        redditor = super().redditor(username)
+        if self.fail_after is not None:
+            redditor.submissions = FailingListing(redditor.submissions, self.fail_after)
+            redditor.comments = FailingListing(redditor.comments, self.fail_after)
+        return redditor
+
+    def request(self, method, path, params=None):
+        if self.fail_after is not None and (params or {}).get('after'):
+            raise RuntimeError("HTTP 503")
+        return super().request(method, path, params)
+
+
+class FailingListing(FakeListing):
+    def __init__(self, listing, fail_after):
+        super().__init__(listing.items, listing.to_model, listing.latency)
+        self.fail_after = fail_after
+
+    def new(self, limit=None, params=None):
+        for i, item in enumerate(super().new(limit, params)):
+            if i == self.fail_after:
+                raise RuntimeError("HTTP 503")
+            yield item
+
+
+@pytest.mark.parametrize('overview', [False, True])
+def test_partial_scrape_does_not_update_snapshot(tmp_path, overview):
+    user_data = make_user_data('alice', 400, seed=1)
+    reddit = FlakyReddit({'alice': user_data}, fail_after=50)
+    store = JsonStore(str(tmp_path))
+    scraper = RedditScraper(snapshot_store=store, reddit=reddit, max_posts=500, max_comments=500)
+
+    partial = scraper.scrape_user_data('alice', overview=overview)
+    assert partial['metadata']['complete'] is False
+    assert len(partial['posts']) + len(partial['comments']) < 400
+    assert store.load('alice') is None
+
+    reddit.fail_after = None
+    full = scraper.scrape_user_data('alice', overview=overview)
+    assert full['metadata']['complete'] is True
+    assert len(full['posts']) + len(full['comments']) == 400
+    assert len(store.load('alice')['comments']) == len(user_data['comments'])
+
+
+def test_partial_refresh_keeps_previous_snapshot(tmp_path):
+    user_data = make_user_data('alice', 200, seed=1)
+    reddit = FlakyReddit({'alice': user_data})
+    store = JsonStore(str(tmp_path))
+    scraper = RedditScraper(snapshot_store=store, reddit=reddit, max_posts=500, max_comments=500)
+    scraper.scrape_user_data('alice', concurrent=False)
+    saved = store.load('alice')
+
+    reddit.fail_after = 0
+    scraper.scrape_user_data('alice', concurrent=False)
+
+    assert store.load('alice') == saved
+
+
+@pytest.mark.parametrize('overview', [False, True])
+def test_refresh_that_hits_the_cap_replaces_the_snapshot(tmp_path, overview):
+    user_data = make_user_data('alice', 400, seed=1)
+    old = dict(user_data, posts=user_data['posts'][50:], comments=user_data['comments'][50:])
+    store = JsonStore(str(tmp_path))
+    RedditScraper(snapshot_store=store, reddit=FakeReddit({'alice': old}),
+                  max_posts=500, max_comments=500).scrape_user_data('alice', overview=overview)
+
+    # 50 new items of each kind, but only 20 fit in one refresh
+    scraper = RedditScraper(snapshot_store=store, reddit=FakeReddit({'alice': user_data}),
+                            max_posts=20, max_comments=20)
+    refreshed = scraper.scrape_user_data('alice', overview=overview)
+
+    assert [p['id'] for p in refreshed['posts']] == [p['id'] for p in user_data['posts'][:20]]
+    assert [c['id'] for c in refreshed['comments']] == [c['id'] for c in user_data['comments'][:20]]
+    assert store.load('alice')['posts'] == refreshed['posts']
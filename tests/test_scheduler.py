@@ -0,0 +1,67 @@
+"""
+Tests for the task dependency scheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.scheduler import run_dag
+
+
+def test_tasks_receive_their_dependency_results():
+    results = run_dag({
+        'a': (lambda deps: 1, []),
+        'b': (lambda deps: deps['a'] + 1, ['a']),
+        'c': (lambda deps: deps['a'] * 10, ['a']),
+        'd': (lambda deps: sorted(deps.items()), ['b', 'c'])
+    })
+
+    assert results == {'a': 1, 'b': 2, 'c': 10, 'd': [('b', 2), ('c', 10)]}
+
+
+def test_independent_tasks_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+    tasks = {name: (lambda deps: barrier.wait() is not None, []) for name in 'abc'}
+
+    # Deadlocks (and times out) unless all three tasks run at once
+    assert run_dag(tasks, max_workers=3) == {'a': True, 'b': True, 'c': True}
+
+
+def test_task_waits_for_slow_dependency():
+    finished = []
+
+    def slow(deps):
+        time.sleep(0.05)
+        finished.append('slow')
+        return 'slow'
+
+    def dependent(deps):
+        finished.append('dependent')
+        return deps['slow']
+
+    results = run_dag({'dependent': (dependent, ['slow']), 'slow': (slow, [])})
+
+    assert finished == ['slow', 'dependent']
+    assert results['dependent'] == 'slow'
+
+
+@pytest.mark.parametrize('tasks', [
+    {'a': (lambda deps: None, ['missing'])},
+    {'a': (lambda deps: None, ['b']), 'b': (lambda deps: None, ['a'])}
+])
+def test_invalid_graphs_are_rejected(tasks):
+    with pytest.raises(ValueError):
+        run_dag(tasks)
+
+
+def test_task_exception_is_raised_and_dependents_skipped():
+    ran = []
+
+    def fail(deps):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_dag({'fail': (fail, []), 'after': (lambda deps: ran.append('after'), ['fail'])})
+    assert ran == []
@@ -0,0 +1,86 @@
+"""
+Tests for the HTTP job API.
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.service import ServiceRequestHandler
+
+
+class RecordingService:
+    """Service stand-in that accepts every job without running it."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, username):
+        self.submitted.append(username)
+        return {'id': 'job1', 'username': username, 'status': 'queued'}
+
+
+@pytest.fixture(scope='module')
+def server():
+    service = RecordingService()
+    handler = type('TestHandler', (ServiceRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", service
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api(server):
+    base_url, service = server
+    service.submitted.clear()
+    return base_url, service
+
+
+def post_job(base_url, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    request = urllib.request.Request(f"{base_url}/jobs", data=data, method='POST')
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+@pytest.mark.parametrize('body', [
+    {'username': 'kojied'},
+    {'url': 'https://www.reddit.com/user/kojied/'},
+    {'url': 'https://www.reddit.com/user/kojied/comments/'}
+])
+def test_valid_jobs_are_queued(api, body):
+    base_url, service = api
+    status, job = post_job(base_url, body)
+
+    assert status == 202
+    assert service.submitted == ['kojied']
+
+
+@pytest.mark.parametrize('body', [
+    [],
+    "kojied",
+    b'not json',
+    {},
+    {'username': '../../etc/passwd'},
+    {'username': 'ab'},
+    {'username': 12345},
+    {'url': 'https://example.com/user/kojied'},
+    {'url': ['https://www.reddit.com/user/kojied/']}
+])
+def test_invalid_jobs_are_rejected(api, body):
+    base_url, service = api
+    status, response = post_job(base_url, body)
+
+    assert status == 400
+    assert 'error' in response
+    assert service.submitted == []
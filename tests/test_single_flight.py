@@ -0,0 +1,89 @@
+"""
+Tests for coalescing identical in-flight computations.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.single_flight import SingleFlight
+
+
+def slow_counter(calls, result='done', delay=0.1):
+    def func():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        return result
+    return func
+
+
+def test_concurrent_callers_share_one_execution():
+    single_flight = SingleFlight(directory=None)
+    calls = []
+    func = slow_counter(calls)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(executor.map(lambda _: single_flight.do('key', func), range(5)))
+
+    assert results == ['done'] * 5
+    assert len(calls) == 1
+
+
+def test_different_keys_run_separately():
+    single_flight = SingleFlight(directory=None)
+    calls = []
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(
+            lambda key: single_flight.do(key, slow_counter(calls, result=key)), ['a', 'b']
+        ))
+
+    assert results == ['a', 'b']
+    assert len(calls) == 2
+
+
+def test_followers_receive_the_leaders_exception():
+    single_flight = SingleFlight(directory=None)
+    started = threading.Event()
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, 'key', fail)
+        started.wait(5)
+        follower = executor.submit(single_flight.do, 'key', lambda: 'not run')
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+
+    # Nothing is remembered once the computation has finished
+    assert single_flight.do('key', lambda: 'fresh') == 'fresh'
+
+
+def test_result_is_shared_across_instances_on_one_directory(tmp_path):
+    # Separate instances do not share in-process state, like separate processes
+    first, second = SingleFlight(str(tmp_path)), SingleFlight(str(tmp_path))
+    calls = []
+    func = slow_counter(calls, result={'persona': 'alice'})
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(executor.map(lambda flight: flight.do('key', func), [first, second]))
+
+    assert results == [{'persona': 'alice'}] * 2
+    assert len(calls) == 1
+    assert list(tmp_path.glob('*.lock')) == []
+
+
+def test_published_results_expire(tmp_path):
+    single_flight = SingleFlight(str(tmp_path), result_ttl=-1)
+    calls = []
+
+    single_flight.do('key', slow_counter(calls, delay=0))
+    single_flight.do('key', slow_counter(calls, delay=0))
+
+    assert len(calls) == 2
@@ -0,0 +1,139 @@
+"""
+Tests that startup and cache-hit reruns do not import the heavy dependencies.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.fakes import FakeLLM, make_user_data
+from src.checkpoint import CheckpointStore
+from src.llm_cache import LLMCache
+from src.llm_utils import PromptTemplate
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator
+from src.pipeline import PersonaPipeline
+from src.single_flight import SingleFlight
+from src.storage import JsonStore
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['langchain_core', 'langchain_google_genai', 'pydantic', 'numpy', 'praw']
+
+# Runs main.py with the given arguments and prints the heavy modules it loaded
+MAIN_SCRIPT = """
+import json, runpy, sys
+sys.path.insert(0, {root!r})
+sys.argv = ['main.py'] + {argv!r}
+try:
+    runpy.run_path({main!r}, run_name='__main__')
+except SystemExit:
+    pass
+print(json.dumps([m for m in {modules!r} if m in sys.modules]))
+"""
+
+# Reruns the pipeline for a user whose analysis and LLM responses are all stored
+RERUN_SCRIPT = """
+import json, sys
+sys.path.insert(0, {root!r})
+from src.checkpoint import CheckpointStore
+from src.llm_cache import LLMCache
+from src.persona_analyzer import PersonaAnalyzer
+from src.persona_generator import PersonaGenerator
+from src.pipeline import PersonaPipeline
+from src.single_flight import SingleFlight
+from src.storage import JsonStore
+
+
+class StaticScraper:
+    def scrape_user_data(self, username):
+        with open({user_file!r}, encoding='utf-8') as f:
+            return json.load(f)
+
+
+class UncalledLLM:
+    model = 'fake-llm'
+    temperature = 0.3
+
+    def invoke(self, prompt, **kwargs):
+        raise AssertionError('LLM called on a cache-hit rerun')
+
+
+llm = UncalledLLM()
+PersonaPipeline(
+    {output_dir!r}, scraper=StaticScraper(),
+    analyzer=PersonaAnalyzer(cache=LLMCache({cache_path!r}), analysis_store=JsonStore({analysis_dir!r}), llm=llm),
+    generator=PersonaGenerator(cache=LLMCache({cache_path!r}), llm=llm, structured_llm=llm),
+    checkpoints=CheckpointStore(JsonStore({checkpoint_dir!r})),
+    single_flight=SingleFlight(directory=None)
+).process_user('alice')
+print(json.dumps([m for m in {modules!r} if m in sys.modules]))
+"""
+
+
+class StaticScraper:
+    """Data source serving one fixed user."""
+
+    def __init__(self, user_data):
+        self.user_data = user_data
+
+    def scrape_user_data(self, username):
+        return self.user_data
+
+
+def persona_without_timestamp(path):
+    lines = path.read_text(encoding='utf-8').splitlines()
+    return [line for line in lines if not line.startswith('Generated on:')]
+
+
+def loaded_modules(script, cwd):
+    result = subprocess.run([sys.executable, '-c', script], cwd=cwd, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_invalid_url_exits_before_loading_config_or_pipeline(tmp_path):
+    script = MAIN_SCRIPT.format(
+        root=ROOT, main=os.path.join(ROOT, 'main.py'), argv=['not-a-reddit-url'],
+        modules=HEAVY_MODULES + ['config', 'dotenv', 'src.pipeline']
+    )
+    assert loaded_modules(script, str(tmp_path)) == []
+
+
+def test_cache_hit_rerun_skips_heavy_imports(tmp_path):
+    user_data = make_user_data('alice', 40, seed=3)
+    user_file = tmp_path / 'alice.json'
+    user_file.write_text(json.dumps(user_data), encoding='utf-8')
+    dirs = {name: str(tmp_path / name) for name in ('output', 'analysis', 'checkpoints')}
+    cache_path = str(tmp_path / 'llm_cache.sqlite')
+    os.makedirs(dirs['output'])
+
+    llm = FakeLLM(latency=0)
+    PersonaPipeline(
+        dirs['output'], scraper=StaticScraper(user_data),
+        analyzer=PersonaAnalyzer(cache=LLMCache(cache_path), analysis_store=JsonStore(dirs['analysis']), llm=llm),
+        generator=PersonaGenerator(cache=LLMCache(cache_path), llm=llm, structured_llm=llm),
+        checkpoints=CheckpointStore(JsonStore(dirs['checkpoints'])),
+        single_flight=SingleFlight(directory=None)
+    ).process_user('alice')
+    first = persona_without_timestamp(tmp_path / 'output' / 'alice_persona.txt')
+
+    script = RERUN_SCRIPT.format(
+        root=ROOT, user_file=str(user_file), output_dir=dirs['output'], cache_path=cache_path,
+        analysis_dir=dirs['analysis'], checkpoint_dir=dirs['checkpoints'], modules=HEAVY_MODULES
+    )
+    assert loaded_modules(script, str(tmp_path)) == []
+    assert persona_without_timestamp(tmp_path / 'output' / 'alice_persona.txt') == first
+
+
+def test_prompt_template_renders_like_langchain():
+    from langchain_core.prompts import PromptTemplate as LangChainPromptTemplate
+
+    kwargs = {'username': 'alice', 'stats': {'posts': 3}}
+    template = "User: {username}\nStats: {stats}\nRespond as JSON like {{\"traits\": []}}"
+    ours = PromptTemplate(input_variables=list(kwargs), template=template)
+    theirs = LangChainPromptTemplate(input_variables=list(kwargs), template=template)
+
+    assert ours.format(**kwargs) == theirs.format(**kwargs)
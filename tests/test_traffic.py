@@ -0,0 +1,84 @@
+"""
+Tests for recording Reddit traffic.
+"""
+
+import gzip
+import json
+import os
+
+import requests
+
+from src.rate_limiter import RateLimiter
+from src.traffic import RecordingRequestor, TrafficArchive
+
+
+class FakeSession(requests.Session):
+    """Session that answers every request with a canned response."""
+
+    def __init__(self, body, headers):
+        super().__init__()
+        self.body = body
+        self.response_headers = headers
+
+    def request(self, method, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update(self.response_headers)
+        response._content = self.body.encode('utf-8')
+        response.encoding = 'utf-8'
+        return response
+
+
+def record_response(tmp_path, url, body, headers):
+    archive = TrafficArchive(str(tmp_path / 'traffic.json.gz'))
+    requestor = RecordingRequestor('persona-generator-tests', archive=archive,
+                                   session=FakeSession(body, headers),
+                                   rate_limiter=RateLimiter(rate=1000, capacity=1000))
+    response = requestor.request('POST', url, data={'grant_type': 'client_credentials'})
+    archive.save()
+    with gzip.open(archive.path, 'rt', encoding='utf-8') as f:
+        return response, f.read()
+
+
+def test_token_response_is_redacted(tmp_path):
+    token = {'access_token': 'secret-bearer-token', 'refresh_token': 'secret-refresh-token',
+             'token_type': 'bearer', 'expires_in': 86400, 'scope': '*'}
+    response, saved = record_response(
+        tmp_path, 'https://www.reddit.com/api/v1/access_token', json.dumps(token),
+        {'Content-Type': 'application/json', 'Set-Cookie': 'session=secret-cookie'}
+    )
+
+    # The caller still gets the real token; only the archive is redacted
+    assert response.json()['access_token'] == 'secret-bearer-token'
+    assert 'secret' not in saved
+    exchanges = json.loads(saved)['exchanges']['http']
+    recorded = next(iter(exchanges.values()))[0]
+    assert json.loads(recorded['body'])['expires_in'] == 86400
+    assert recorded['headers']['Content-Type'] == 'application/json'
+
+
+def test_authorization_headers_are_redacted(tmp_path):
+    _, saved = record_response(
+        tmp_path, 'https://oauth.reddit.com/user/alice/about', '{"data": {"name": "alice"}}',
+        {'authorization': 'bearer secret-bearer-token'}
+    )
+
+    assert 'secret' not in saved
+    assert 'alice' in saved
+
+
+def test_save_traffic_removes_the_temporary_state(tmp_path):
+    from main import save_traffic
+    from src.traffic import create_traffic_components
+
+    archive = TrafficArchive(str(tmp_path / 'traffic.json.gz'))
+    components = create_traffic_components(archive, replay=False)
+    components['archive'] = archive
+    state_dir = components['state_dir'].name
+    components['checkpoints'].save('alice', 'scrape', 'hash', {'value': 1})
+    assert os.listdir(state_dir)
+
+    save_traffic(components)
+
+    assert os.path.exists(archive.path)
+    assert not os.path.exists(state_dir)